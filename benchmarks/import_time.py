@@ -0,0 +1,63 @@
+"""Import time of the package entry points, each measured in a fresh interpreter.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--json PATH]
+
+Reports the median cumulative import time per module (from `python -X importtime`) and which heavy
+dependencies got loaded along with it.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "lactate_thresholds",
+    "lactate_thresholds.process",
+    "lactate_thresholds.zones",
+    "lactate_thresholds.batch",
+    "lactate_thresholds.parallel",
+    "lactate_thresholds.plot",
+]
+HEAVY = ["altair", "statsmodels", "scipy", "pwlf"]
+
+_PROBE = "import sys, {module}; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """Cumulative import time in seconds and the heavy dependencies loaded by importing `module`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    return cumulative / 1e6, [m for m in out.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for module in MODULES:
+        runs = [measure(module) for _ in range(args.repeat)]
+        results[module] = {"seconds": statistics.median(r[0] for r in runs), "heavy": runs[0][1]}
+        print(f"{module:32s} {results[module]['seconds']:.3f}s  {', '.join(results[module]['heavy'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
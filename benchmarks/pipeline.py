@@ -0,0 +1,206 @@
+"""Time and memory of every stage of the threshold pipeline.
+
+Usage:
+    python benchmarks/pipeline.py [--sizes 5,10,50,200,500] [--units watt,km/h] [--batch-sizes 1,16,64]
+                                  [--repeat 5] [--json PATH]
+    python benchmarks/pipeline.py --compare BASE.json NEW.json
+
+Each stage is timed `--repeat` times on synthetic tests of every size and unit; the peak memory allocated by
+the stage is measured with tracemalloc in a separate run, so that tracing does not distort the timings. The
+JSON output holds the environment (including the git commit) next to the results, `--compare` prints the
+ratio of median times of two such files.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+import lactate_thresholds as lt
+from lactate_thresholds import methods, plot, zones
+from lactate_thresholds.synthetic import SyntheticCorpus
+
+# Intensity range of a protocol per unit
+RANGES = {"watt": (100.0, 400.0), "km/h": (8.0, 20.0)}
+
+
+def synthetic_test(n_steps: int, unit: str, seed: int = 0) -> pd.DataFrame:
+    """A plausible test with a baseline step followed by `n_steps` steps."""
+    rng = np.random.default_rng(seed)
+    lo, hi = RANGES[unit]
+    intensity = np.linspace(lo, hi, n_steps)
+    rel = (intensity - lo) / (hi - lo)
+    lactate = 0.9 + 0.3 * np.exp(3.2 * rel) + rng.normal(0, 0.15, n_steps)
+    heart_rate = 110 + 80 * rel + rng.normal(0, 1.5, n_steps)
+    return pd.DataFrame(
+        {
+            "step": np.arange(n_steps + 1),
+            "length": np.r_[0, np.full(n_steps, 4)],
+            "intensity": np.r_[0, intensity],
+            "lactate": np.r_[1.0, np.maximum(lactate, 0.5)],
+            "heart_rate": np.r_[80, np.round(heart_rate)],
+        }
+    )
+
+
+def usable_test(n_steps: int, unit: str, max_seed: int = 100) -> pd.DataFrame:
+    """The first synthetic test for which every threshold can be determined, so that all stages run."""
+    for seed in range(max_seed):
+        df = synthetic_test(n_steps, unit, seed)
+        try:
+            res = lt.determine(df)
+        except ValueError:
+            continue
+        if res.lt1_estimate is not None and res.lt2_estimate is not None:
+            return df
+    raise RuntimeError(f"No usable synthetic test with {n_steps} steps in {unit}")
+
+
+def stages(df: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    """The stages of the pipeline, each as a call on the outputs of the previous ones."""
+    dfc = lt.clean_data(df)
+    dfi = methods.interpolate(dfc.copy(), include_baseline=False)
+    res = lt.determine(df)
+
+    return {
+        "clean_data": lambda: lt.clean_data(df),
+        "interpolate": lambda: methods.interpolate(dfc.copy(), include_baseline=False),
+        "determine_ltp": lambda: methods.determine_ltp(dfc, dfi),
+        "determine_mod_dmax": lambda: methods.determine_mod_dmax(dfc, dfi),
+        "determine_loglog": lambda: methods.determine_loglog(dfc, dfi),
+        "determine_baseline": lambda: methods.determine_baseline(dfc, dfi, 0),
+        "determine_obla": lambda: methods.determine_obla(dfi, 4),
+        "determine": lambda: lt.determine(df),
+        "seiler_3_zones": lambda: zones.seiler_3_zones(res),
+        "seiler_5_zones": lambda: zones.seiler_5_zones(res),
+        "friel_7_zones_running": lambda: zones.friel_7_zones_running(res),
+        "lactate_intensity_plot": lambda: plot.lactate_intensity_plot(res).to_dict(),
+        "heart_rate_intensity_plot": lambda: plot.heart_rate_intensity_plot(res).to_dict(),
+        "dashboard_plot": lambda: plot.dashboard_plot(res).to_dict(),
+        "plot_json": lambda: plot.plot_json(res, "dashboard"),
+        "overlay_plot": lambda: plot.overlay_plot([res] * 200).to_dict(),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    func()  # warm up caches and lazy imports
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"median_s": statistics.median(times), "min_s": min(times), "peak_bytes": peak}
+
+
+def run(sizes: List[int], units: List[str], batch_sizes: List[int], repeat: int, n_tests: int) -> List[dict]:
+    results = []
+    for unit in units:
+        for n_steps in sizes:
+            df = usable_test(n_steps, unit)
+            for stage, func in stages(df).items():
+                row = {"stage": stage, "n_steps": n_steps, "unit": unit, "batch_size": None}
+                results.append({**row, **measure(func, repeat)})
+                print(
+                    f"{stage:28s} {unit:5s} {n_steps:4d} steps  {results[-1]['median_s'] * 1e3:9.2f} ms",
+                    file=sys.stderr,
+                )
+
+        # Batches of typical 8 step tests (with baselines, gaps and the odd failure) through the vectorized path
+        sport = {"watt": "cycling", "km/h": "running"}[unit]
+        tests = [df for _, df in SyntheticCorpus(n_tests, seed=0, sports=[sport], min_steps=8, max_steps=8)]
+        for batch_size in batch_sizes:
+            row = {"stage": "determine_many", "n_steps": 8, "unit": unit, "batch_size": batch_size}
+            results.append({**row, **measure(lambda: lt.determine_many(tests, batch_size=batch_size), repeat)})
+            per_test = results[-1]["median_s"] / n_tests * 1e3
+            print(f"{'determine_many':28s} {unit:5s} batch {batch_size:4d}  {per_test:9.2f} ms/test", file=sys.stderr)
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare(base_path: str, new_path: str):
+    def load(path):
+        with open(path) as f:
+            data = json.load(f)
+        return {(r["stage"], r["n_steps"], r["unit"], r["batch_size"]): r for r in data["results"]}
+
+    base, new = load(base_path), load(new_path)
+    print(f"{'stage':28s} {'unit':5s} {'steps':>5s} {'batch':>5s} {'base ms':>10s} {'new ms':>10s} {'ratio':>6s}")
+    for key in sorted(base.keys() & new.keys(), key=str):
+        b, n = base[key]["median_s"], new[key]["median_s"]
+        stage, n_steps, unit, batch_size = key
+        print(f"{stage:28s} {unit:5s} {n_steps:5d} {batch_size or '':>5} {b * 1e3:10.2f} {n * 1e3:10.2f} {n / b:6.2f}")
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_ints, default=[5, 10, 50, 200, 500], help="steps per test")
+    parser.add_argument("--units", default="watt,km/h")
+    parser.add_argument("--batch-sizes", type=_ints, default=[1, 16, 64])
+    parser.add_argument("--n-tests", type=int, default=64, help="tests for the determine_many benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Degenerate fits in the corpus are expected, their warnings would drown the progress lines
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore", RuntimeWarning)
+
+    units = args.units.split(",")
+    unknown = set(units) - set(RANGES)
+    if unknown:
+        parser.error(f"unknown units: {', '.join(sorted(unknown))}")
+
+    results = run(args.sizes, units, args.batch_sizes, args.repeat, args.n_tests)
+    output = {"environment": environment(), "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
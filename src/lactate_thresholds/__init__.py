@@ -1,4 +1,38 @@
-from lactate_thresholds.plot import lactate_intensity_plot
-from lactate_thresholds.process import clean_data, determine, interpolate
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["lactate_intensity_plot", "clean_data", "determine", "interpolate"]
+if TYPE_CHECKING:
+    from lactate_thresholds.batch import determine_many
+    from lactate_thresholds.plot import lactate_intensity_plot
+    from lactate_thresholds.process import clean_data, determine, determine_arrays, interpolate
+
+__all__ = ["lactate_intensity_plot", "clean_data", "determine", "determine_arrays", "determine_many", "interpolate"]
+
+# Loaded on first access, so that importing the package does not pull in pandas, altair and friends
+_LAZY = {
+    "lactate_intensity_plot": "lactate_thresholds.plot",
+    "clean_data": "lactate_thresholds.process",
+    "determine": "lactate_thresholds.process",
+    "determine_arrays": "lactate_thresholds.process",
+    "determine_many": "lactate_thresholds.batch",
+    "interpolate": "lactate_thresholds.process",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+
+    # Submodules, e.g. `lt.plot`, without an explicit import
+    try:
+        return importlib.import_module(f"{__name__}.{name}")
+    except ModuleNotFoundError as e:
+        if e.name != f"{__name__}.{name}":
+            raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -252,15 +252,11 @@ def main():
     hcol1, hcol2 = st.columns([0.7, 0.3])
     with hcol1:
         st.checkbox("Show fit line", key="fit_line", value=True)
-        st.altair_chart(
-            lt.plot.lactate_intensity_plot(results, show_fit_line=st.session_state.fit_line),
-            use_container_width=True,
-        )
-
-        st.altair_chart(
-            lt.plot.heart_rate_intensity_plot(results, show_fit_line=st.session_state.fit_line),
-            use_container_width=True,
-        )
+        for plot in ["lactate", "heart_rate"]:
+            st.vega_lite_chart(
+                spec=lt.plot.plot_spec(results, plot, show_fit_line=st.session_state.fit_line),
+                use_container_width=True,
+            )
 
     if "lt_df" not in st.session_state:
         construct_lt_df()
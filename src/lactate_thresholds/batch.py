@@ -0,0 +1,308 @@
+from typing import Dict, Iterable, List, Literal, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds.fit import CubicFit, fit_cubic_many, horner, invert_cubic
+from lactate_thresholds.methods import loglog_arrays, loglog_data, ltp_arrays, mod_dmax_arrays
+from lactate_thresholds.process import clean_data
+from lactate_thresholds.records import FIELDS, THRESHOLDS, ThresholdRecord, columns_to_array, from_array
+from lactate_thresholds.segmented import fit_breakpoints_many
+from lactate_thresholds.utils import InterpolatedIndex
+
+
+# Columns of `determine_many(curves=True)`: the fitted cubics in the scaled basis of `fit.CubicFit`, the range
+# of the interpolation grid and the highest measured heart rate, enough to evaluate zones without the data
+CURVE_COLUMNS = (
+    ["curve_center", "curve_scale", "curve_lo", "curve_hi"]
+    + [f"curve_lactate_{i}" for i in range(4)]
+    + [f"curve_heart_rate_{i}" for i in range(4)]
+    + ["heart_rate_max"]
+)
+
+
+def split_tests(
+    tests: pd.DataFrame | Iterable[pd.DataFrame],
+    test_id_col: str = "test_id",
+    step_col: str = "step",
+    length_col: str = "length",
+    intensity_col: str = "intensity",
+    lactate_col: str = "lactate",
+    heart_rate_col: str = "heart_rate",
+) -> List[Tuple[object, pd.DataFrame]]:
+    """Turn a long-format frame or a list of frames into (test_id, clean_data) pairs.
+
+    A long-format frame is cleaned once as a whole and then split on `test_id_col`, a list of frames
+    is cleaned frame by frame and numbered by position.
+    """
+    cols = dict(
+        step_col=step_col,
+        length_col=length_col,
+        intensity_col=intensity_col,
+        lactate_col=lactate_col,
+        heart_rate_col=heart_rate_col,
+    )
+
+    if isinstance(tests, pd.DataFrame):
+        if test_id_col not in tests.columns:
+            raise ValueError(f"Column '{test_id_col}' not found in long-format input")
+        ids = tests[test_id_col]
+        dfc = clean_data(tests, **cols)
+        return [(test_id, group.reset_index(drop=True)) for test_id, group in dfc.groupby(ids, sort=False)]
+
+    return [(i, clean_data(df, **cols)) for i, df in enumerate(tests)]
+
+
+def fit_arrays(dfc: pd.DataFrame, include_baseline: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mirror the baseline handling and sorting of `interpolate` on plain arrays."""
+    x = dfc["intensity"].to_numpy(dtype=float).copy()
+    is_baseline = x == 0
+
+    if include_baseline and is_baseline.any():
+        x[is_baseline] = x[1] - (x[2] - x[1])
+        keep = np.ones(len(x), dtype=bool)
+    else:
+        keep = ~is_baseline
+
+    order = np.argsort(x[keep], kind="stable")
+    return (
+        x[keep][order],
+        dfc["lactate"].to_numpy(dtype=float)[keep][order],
+        dfc["heart_rate"].to_numpy(dtype=float)[keep][order],
+    )
+
+
+def _pad(arrays: List[np.ndarray], width: int) -> np.ndarray:
+    out = np.zeros((len(arrays), width))
+    for i, a in enumerate(arrays):
+        out[i, : len(a)] = a
+    return out
+
+
+class _Curves:
+    """Batched twin of `utils.InterpolatedIndex` for the fitted curves of a chunk of tests."""
+
+    def __init__(self, coef, center, scale, grid, grid_mask, lo, hi):
+        self.coef, self.center, self.scale = coef, center, scale
+        self.grid, self.grid_mask = grid, grid_mask
+        self.lo, self.hi = lo, hi
+
+    def at(self, response: int, intensity: np.ndarray) -> np.ndarray:
+        t = (np.clip(intensity, self.lo, self.hi) - self.center) / self.scale
+        return horner(self.coef[:, response], t)
+
+    def intensity_at(self, response: int, value: np.ndarray, grid_values: np.ndarray) -> np.ndarray:
+        t = invert_cubic(
+            self.coef[:, response],
+            value,
+            (self.lo - self.center) / self.scale,
+            (self.hi - self.center) / self.scale,
+        )
+        out = self.center + self.scale * t
+
+        # Never reached on the grid: nearest grid point, like `InterpolatedIndex`
+        missing = np.isnan(out) & ~np.isnan(value)
+        if missing.any():
+            out = np.where(missing, self.nearest(value, grid_values), out)
+        return out
+
+    def nearest(self, value: np.ndarray, grid_values: np.ndarray) -> np.ndarray:
+        """Grid intensity whose `grid_values` entry is closest to `value`, per test; NaN where `value` is."""
+        dist = np.abs(grid_values - value[:, None])
+        dist[~self.grid_mask | np.isnan(dist)] = np.inf
+        out = np.take_along_axis(self.grid, dist.argmin(axis=1)[:, None], axis=1)[:, 0]
+        return np.where(np.isnan(value), np.nan, out)
+
+
+def _measurement(out: dict, name: str, intensity, lactate, heart_rate):
+    out[f"{name}_intensity"] = intensity
+    out[f"{name}_lactate"] = lactate
+    out[f"{name}_heart_rate"] = heart_rate
+
+
+def determine_chunk(
+    chunk: List[Tuple[object, pd.DataFrame]], interpolation_factor: float, include_baseline: bool, curves: bool = False
+) -> Dict[str, np.ndarray]:
+    """One batch of `determine_many`: the thresholds of (test_id, clean_data) pairs fitted together.
+
+    Works on plain arrays throughout, no frames or models are created per test. Returns the columns of the
+    `determine_many` table, see `records.columns_to_array` for the structured array.
+    """
+    n = len(chunk)
+    prepared = [fit_arrays(dfc, include_baseline) for _, dfc in chunk]
+    lengths = np.array([len(p[0]) for p in prepared])
+    width = max(lengths.max(initial=0), 1)
+
+    x = _pad([p[0] for p in prepared], width)
+    y = np.stack([_pad([p[1] for p in prepared], width), _pad([p[2] for p in prepared], width)], axis=-1)
+    mask = np.arange(width)[None, :] < lengths[:, None]
+
+    coef, center, scale = fit_cubic_many(x, y, mask)
+
+    # Same grid as `interpolate`: np.arange(min, max, interpolation_factor) per test
+    lo = np.where(mask, x, np.inf).min(axis=1)
+    hi = np.where(mask, x, -np.inf).max(axis=1)
+    n_grid = np.where(lengths > 0, np.ceil((hi - lo) / interpolation_factor), 0).astype(int)
+    grid_width = max(n_grid.max(initial=0), 1)
+    grid_mask = np.arange(grid_width)[None, :] < n_grid[:, None]
+    grid = np.where(lengths[:, None] > 0, lo[:, None], 0.0) + interpolation_factor * np.arange(grid_width)[None, :]
+
+    t = (grid - center[:, None]) / scale[:, None]
+    grid_lactate = horner(coef[:, None, :, 0], t)
+    grid_heart_rate = horner(coef[:, None, :, 1], t)
+    fitted = _Curves(
+        coef.transpose(0, 2, 1), center, scale, grid, grid_mask, lo, lo + interpolation_factor * (n_grid - 1)
+    )
+
+    out = {"test_id": [test_id for test_id, _ in chunk]}
+    per_test = {name: np.full((n, 3), np.nan) for name in ["ltp1", "ltp2", "mod_dmax", "loglog"]}
+
+    # Share the batch fit rather than refitting it from the grid
+    indexes = {
+        i: InterpolatedIndex.from_arrays(
+            grid[i, : n_grid[i]],
+            grid_lactate[i, : n_grid[i]],
+            grid_heart_rate[i, : n_grid[i]],
+            CubicFit(coef[i], center[i], scale[i]),
+        )
+        for i in range(n)
+        if n_grid[i] >= 2
+    }
+    # The breakpoint searches of the segmented regressions are scored for all tests together
+    ltp_breakpoints = fit_breakpoints_many(
+        [x.intensity for x in indexes.values()], [x.lactate for x in indexes.values()], 2
+    )
+    loglog = [loglog_data(index) for index in indexes.values()]
+    loglog_breakpoints = fit_breakpoints_many([x for x, _ in loglog], [y for _, y in loglog], 1)
+
+    # Reading the thresholds off the breakpoints and ModDMax stay per test, everything else is resolved column-wise
+    for i, index, ltp_bp, loglog_bp in zip(indexes, indexes.values(), ltp_breakpoints, loglog_breakpoints):
+        measured = [chunk[i][1][c].to_numpy(dtype=float) for c in ["intensity", "lactate", "heart_rate"]]
+        for names, method in [
+            (["ltp1", "ltp2"], lambda: ltp_arrays(index, breakpoints=ltp_bp)),
+            (["mod_dmax"], lambda: [mod_dmax_arrays(*measured, index)]),
+            (["loglog"], lambda: [loglog_arrays(index, breakpoints=loglog_bp)]),
+        ]:
+            try:
+                values = method()
+            except ValueError:
+                # Degenerate curve (e.g. no ModDMax root below the maximum intensity): left NaN
+                continue
+            for name, value in zip(names, values):
+                if value is not None:
+                    per_test[name][i] = value
+
+    for name in ["ltp1", "ltp2", "mod_dmax", "loglog"]:
+        _measurement(out, name, *per_test[name].T)
+
+    # Baseline + 0, see `determine_baseline`
+    window = (n_grid * 0.2).astype(int)
+    window_mask = np.arange(grid_width)[None, :] < window[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bsln = np.where(window_mask, grid_lactate, 0.0).sum(axis=1) / window
+    lac_max = np.where(grid_mask, grid_lactate, -np.inf).max(axis=1)
+    lac_min = np.where(grid_mask, grid_lactate, np.inf).min(axis=1)
+    bsln = np.where((bsln > lac_max) | (bsln < lac_min), np.nan, bsln)
+    bsln_intensity = fitted.nearest(bsln, grid_lactate)
+    _measurement(out, "baseline", bsln_intensity, bsln, fitted.at(1, bsln_intensity))
+
+    for obla in [2, 4]:
+        lactate = np.full(n, float(obla))
+        intensity = fitted.intensity_at(0, lactate, grid_lactate)
+        _measurement(out, f"obla_{obla}", intensity, lactate, fitted.at(1, intensity))
+
+    for name, components in [("lt1_estimate", ["ltp1", "loglog"]), ("lt2_estimate", ["ltp2", "mod_dmax"])]:
+        intensity = np.mean([out[f"{c}_intensity"] for c in components], axis=0)
+        _measurement(
+            out,
+            name,
+            np.round(intensity, 1),
+            np.round(fitted.at(0, intensity), 1),
+            np.round(fitted.at(1, intensity), 0),
+        )
+
+    if curves:
+        has_grid = n_grid > 0
+        out["curve_center"], out["curve_scale"] = center, scale
+        out["curve_lo"] = np.where(has_grid, lo, np.nan)
+        out["curve_hi"] = np.where(has_grid, fitted.hi, np.nan)
+        for i in range(4):
+            out[f"curve_lactate_{i}"] = coef[:, i, 0]
+            out[f"curve_heart_rate_{i}"] = coef[:, i, 1]
+        out["heart_rate_max"] = np.array([dfc["heart_rate"].max() for _, dfc in chunk], dtype=float)
+
+    return out
+
+
+def determine_many(
+    tests: pd.DataFrame | Iterable[pd.DataFrame],
+    test_id_col: str = "test_id",
+    step_col: str = "step",
+    length_col: str = "length",
+    intensity_col: str = "intensity",
+    lactate_col: str = "lactate",
+    heart_rate_col: str = "heart_rate",
+    include_baseline: bool = False,
+    interpolation_factor: float = 0.1,
+    batch_size: int = 1024,
+    output: Literal["frame", "array", "records"] = "frame",
+    keep_data: bool = False,
+    curves: bool = False,
+) -> pd.DataFrame | np.ndarray | List[ThresholdRecord]:
+    """Determine thresholds for many tests at once.
+
+    The cubic lactate and heart rate fits of all tests in a batch are solved together with stacked normal
+    equations and the interpolation grids are evaluated as one array. OBLA, baseline and the LT1/LT2
+    estimates are resolved column-wise over that array. The breakpoint searches of the segmented regressions
+    are scored together too, see `segmented.fit_breakpoints_many`, leaving only ModDMax and reading the
+    thresholds off the breakpoints per test.
+
+    Args:
+        tests: A list of measurement DataFrames or one long-format DataFrame holding `test_id_col`.
+        test_id_col (str): Column identifying the test in long-format input.
+        include_baseline (bool): See `determine`.
+        interpolation_factor (float): Step size of the interpolation grid, see `interpolate`.
+        batch_size (int): Number of tests fitted together, bounds the size of the padded arrays.
+        output (str): "frame" for a DataFrame, "array" for a structured array of `records.RESULT_DTYPE` or
+            "records" for a list of `records.ThresholdRecord`.
+        keep_data (bool): Keep the clean data of every test on its record, needed for `ThresholdRecord.to_model`.
+        curves (bool): Add the `CURVE_COLUMNS` describing the fitted curves, from which `zones.zones_many`
+            computes training zones. Frame output only.
+
+    Returns:
+        One row per test with a `test_id` column and `<threshold>_<field>` columns for every threshold of
+        `LactateThresholdResults`. Thresholds that could not be determined are NaN.
+    """
+    if output not in ("frame", "array", "records"):
+        raise ValueError(f"Unknown output '{output}', expected 'frame', 'array' or 'records'")
+    if curves and output != "frame":
+        raise ValueError("The curve columns are only available with output='frame'")
+
+    pairs = split_tests(
+        tests,
+        test_id_col=test_id_col,
+        step_col=step_col,
+        length_col=length_col,
+        intensity_col=intensity_col,
+        lactate_col=lactate_col,
+        heart_rate_col=heart_rate_col,
+    )
+
+    chunks = [
+        determine_chunk(pairs[i : i + batch_size], interpolation_factor, include_baseline, curves)
+        for i in range(0, len(pairs), batch_size)
+    ]
+    if output == "frame":
+        columns = ["test_id"] + [f"{t}_{f}" for t in THRESHOLDS for f in FIELDS] + (CURVE_COLUMNS if curves else [])
+        frames = [pd.DataFrame(chunk)[columns] for chunk in chunks]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    array = np.concatenate([columns_to_array(chunk) for chunk in chunks]) if chunks else columns_to_array({})
+    if output == "array":
+        return array
+
+    records = from_array(array)
+    if keep_data:
+        for record, (_, dfc) in zip(records, pairs):
+            record.clean_data = dfc
+    return records
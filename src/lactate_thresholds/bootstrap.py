@@ -0,0 +1,183 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Literal, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds.batch import FIELDS, THRESHOLDS, determine_chunk, fit_arrays
+from lactate_thresholds.fit import DEGREE, fit_cubic
+from lactate_thresholds.parallel import Backend, make_executor
+from lactate_thresholds.process import clean_data
+
+Resampling = Literal["residual", "case"]
+
+# Degenerate resamples are expected, the warnings of the threshold methods on them would only drown the output
+_logger = logging.getLogger("lactate_thresholds")
+_quiet_lock = threading.Lock()
+_quiet_depth = 0
+_quiet_level = logging.NOTSET
+
+
+@contextmanager
+def _quiet() -> Iterator[None]:
+    """Raise the package logger to ERROR while any bootstrap runs in this process, other loggers are untouched."""
+    global _quiet_depth, _quiet_level
+    with _quiet_lock:
+        if _quiet_depth == 0:
+            _quiet_level = _logger.level
+            _logger.setLevel(logging.ERROR)
+        _quiet_depth += 1
+    try:
+        yield
+    finally:
+        with _quiet_lock:
+            _quiet_depth -= 1
+            if _quiet_depth == 0:
+                _logger.setLevel(_quiet_level)
+
+
+def _quiet_worker():
+    """Initializer of the process pool, whose workers only ever run resamples."""
+    _logger.setLevel(logging.ERROR)
+
+
+def _resample(
+    dfc: pd.DataFrame, kind: Resampling, n: int, include_baseline: bool, rng: np.random.Generator
+) -> List[pd.DataFrame]:
+    """Draw `n` resampled versions of a cleaned test, baseline rows are kept as they are."""
+    is_baseline = dfc["intensity"].to_numpy() == 0
+    baseline, steps = dfc[is_baseline], dfc[~is_baseline]
+    m = len(steps)
+    idx = rng.integers(0, m, size=(n, m))
+
+    if kind == "residual":
+        x, lactate, heart_rate = fit_arrays(dfc, include_baseline)
+        fit = fit_cubic(x, np.column_stack([lactate, heart_rate]))
+        fitted = fit(steps["intensity"].to_numpy(dtype=float))
+        residuals = steps[["lactate", "heart_rate"]].to_numpy(dtype=float) - fitted
+        values = fitted[None, :, :] + residuals[idx]
+
+        out = []
+        for v in values:
+            df = steps.assign(lactate=v[:, 0], heart_rate=v[:, 1])
+            out.append(pd.concat([baseline, df], ignore_index=True))
+        return out
+
+    if kind == "case":
+        out = []
+        for i in idx:
+            # A cubic needs at least 4 distinct intensities, keep the step order so that ModDMax sees a sequence
+            i = np.sort(i)
+            if len(np.unique(steps["intensity"].to_numpy()[i])) <= DEGREE:
+                continue
+            out.append(pd.concat([baseline, steps.iloc[i]], ignore_index=True))
+        return out
+
+    raise ValueError(f"Unknown resampling '{kind}', expected 'residual' or 'case'")
+
+
+def _bootstrap_chunk(chunk: List[pd.DataFrame], interpolation_factor: float, include_baseline: bool) -> np.ndarray:
+    res = determine_chunk(list(enumerate(chunk)), interpolation_factor, include_baseline)
+    return np.column_stack([res[f"{t}_{f}"] for t in THRESHOLDS for f in FIELDS])
+
+
+def _interval(samples: np.ndarray, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    alpha = (1 - confidence) / 2
+    with np.errstate(all="ignore"):
+        valid = ~np.isnan(samples).all(axis=0)
+        lower = np.full(samples.shape[1], np.nan)
+        upper = np.full(samples.shape[1], np.nan)
+        lower[valid], upper[valid] = np.nanquantile(samples[:, valid], [alpha, 1 - alpha], axis=0)
+    return lower, upper
+
+
+def bootstrap(
+    df: pd.DataFrame,
+    step_col: str = "step",
+    length_col: str = "length",
+    intensity_col: str = "intensity",
+    lactate_col: str = "lactate",
+    heart_rate_col: str = "heart_rate",
+    include_baseline: bool = False,
+    resampling: Resampling = "residual",
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    interpolation_factor: float = 0.1,
+    batch_size: int = 100,
+    tol: Optional[float] = None,
+    backend: Backend = "serial",
+    max_workers: Optional[int] = None,
+    chunk_size: int = 25,
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """Bootstrap confidence intervals for every threshold of a test.
+
+    Resamples are evaluated with the batched machinery of `batch.determine_many`: the cubic refits of a batch
+    and the breakpoint searches of the segmented regressions are solved together and only ModDMax runs per
+    resample, spread over the workers of `backend` in chunks of `chunk_size`.
+
+    With `resampling="residual"` the residuals of the cubic fits are resampled onto the fitted curves, which
+    keeps the protocol's intensities. `resampling="case"` resamples whole steps, resamples with fewer than
+    four distinct intensities are skipped.
+
+    Args:
+        df (pd.DataFrame): Measurements of a single test, columns as in `determine`.
+        n_resamples (int): Maximum number of resamples.
+        confidence (float): Coverage of the percentile intervals.
+        batch_size (int): Resamples drawn per round.
+        tol (float, optional): Stop early once no interval width changed by more than this fraction between
+            two rounds. All `n_resamples` are drawn if None.
+        backend (str): "serial", "thread" or "process", see `parallel.make_executor`.
+        seed (int, optional): Seed of the random generator, for reproducible intervals.
+
+    Returns:
+        pd.DataFrame: One row per threshold and field (e.g. ("ltp1", "intensity")) with the point `estimate`,
+        `lower` and `upper` bounds and `n_resamples`, the number of resamples in which it could be determined.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    if batch_size < 1 or chunk_size < 1:
+        raise ValueError("batch_size and chunk_size must be at least 1")
+
+    dfc = clean_data(df, step_col, length_col, intensity_col, lactate_col, heart_rate_col)
+    rng = np.random.default_rng(seed)
+    initializer = _quiet_worker if backend == "process" else None
+    with _quiet(), make_executor(backend, max_workers, initializer=initializer) as executor:
+        estimate = _bootstrap_chunk([dfc], interpolation_factor, include_baseline)[0]
+        samples = np.empty((0, len(estimate)))
+        drawn, widths = 0, None
+        while drawn < n_resamples:
+            n = min(batch_size, n_resamples - drawn)
+            drawn += n
+            resamples = _resample(dfc, resampling, n, include_baseline, rng)
+            chunks = [resamples[i : i + chunk_size] for i in range(0, len(resamples), chunk_size)]
+            results = executor.map(
+                _bootstrap_chunk, chunks, [interpolation_factor] * len(chunks), [include_baseline] * len(chunks)
+            )
+            samples = np.concatenate([samples, *results])
+            if not len(samples):
+                continue
+
+            lower, upper = _interval(samples, confidence)
+            previous, widths = widths, upper - lower
+            if tol is not None and previous is not None:
+                with np.errstate(all="ignore"):
+                    change = np.abs(widths - previous) / np.abs(previous)
+                if np.nanmax(np.where(previous == 0, np.abs(widths), change), initial=0) <= tol:
+                    break
+
+    if not len(samples):
+        raise ValueError("None of the resamples could be fitted")
+
+    index = pd.MultiIndex.from_product([THRESHOLDS, FIELDS], names=["threshold", "field"])
+    return pd.DataFrame(
+        {
+            "estimate": estimate,
+            "lower": lower,
+            "upper": upper,
+            "n_resamples": (~np.isnan(samples)).sum(axis=0),
+        },
+        index=index,
+    )
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds.types import LactateThresholdResults
+
+try:
+    __version__ = version("lactate-thresholds")
+except PackageNotFoundError:
+    __version__ = "0+unknown"
+
+KEY_COLUMNS = ["step", "length", "intensity", "lactate", "heart_rate"]
+
+
+def cache_key(df_clean: pd.DataFrame, params: Dict[str, Any]) -> str:
+    """Content hash of cleaned measurements, method parameters and library version.
+
+    Two tests with identical measurements get the same key regardless of their original column names,
+    dtypes or index.
+    """
+    h = hashlib.sha256()
+    h.update(__version__.encode())
+    h.update(json.dumps(params, sort_keys=True, default=repr).encode())
+    h.update(str(len(df_clean)).encode())
+    for col in KEY_COLUMNS:
+        h.update(np.ascontiguousarray(df_clean[col].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    duplicates: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """Cache for `determine` results: a bounded in-memory LRU, optionally backed by an SQLite file.
+
+    The on-disk tier survives restarts and can be shared between processes. Results are returned as shallow
+    copies, so that e.g. `calc_lt1_lt2_estimates` on a returned result does not alter the cached one.
+
+    Args:
+        maxsize (int): Maximum number of results held in memory.
+        path (str, optional): SQLite file for the on-disk tier, no disk tier if not given.
+    """
+
+    def __init__(self, maxsize: int = 256, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, LactateThresholdResults] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path is not None:
+            with self._connect() as con:
+                con.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def copy(res: LactateThresholdResults) -> LactateThresholdResults:
+        """Shallow copy of a result as the cache hands them out, with its own `extra`."""
+        return res.model_copy(update={"extra": dict(res.extra)})
+
+    def _remember(self, key: str, res: LactateThresholdResults):
+        self._memory[key] = res
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def get(self, key: str) -> Optional[LactateThresholdResults]:
+        with self._lock:
+            res = self._memory.get(key)
+            if res is not None:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return self.copy(res)
+
+        if self.path is not None:
+            with self._connect() as con:
+                row = con.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                res = pickle.loads(row[0])
+                with self._lock:
+                    self._remember(key, res)
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                return self.copy(res)
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, key: str, res: LactateThresholdResults):
+        res = self.copy(res)
+        with self._lock:
+            self._remember(key, res)
+
+        if self.path is not None:
+            blob = pickle.dumps(res, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._connect() as con:
+                con.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, blob))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        if self.path is None:
+            return False
+        with self._connect() as con:
+            return con.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
+
+    def invalidate(self, key: str):
+        """Drop a single result from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.path is not None:
+            with self._connect() as con:
+                con.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def clear(self):
+        """Drop all results from both tiers and reset the statistics."""
+        with self._lock:
+            self._memory.clear()
+            self.stats = CacheStats()
+        if self.path is not None:
+            with self._connect() as con:
+                con.execute("DELETE FROM results")
@@ -0,0 +1,271 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FORMATS = ("csv", "parquet", "jsonl")
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lt_batch",
+        description="Determine lactate thresholds and training zones for many tests.",
+    )
+    parser.add_argument("inputs", nargs="+", help="CSV or Parquet files, one test each unless --test-id-col is given")
+    parser.add_argument("-o", "--output", required=True, help="output file (.csv, .parquet or .jsonl)")
+    parser.add_argument("--format", choices=FORMATS, help="output format, guessed from --output by default")
+    parser.add_argument(
+        "--test-id-col",
+        help="column(s) identifying a test in long-format inputs, comma separated (e.g. athlete_id,test_date)",
+    )
+    parser.add_argument("--step-col", default="step")
+    parser.add_argument("--length-col", default="length")
+    parser.add_argument("--intensity-col", default="intensity")
+    parser.add_argument("--lactate-col", default="lactate")
+    parser.add_argument("--heart-rate-col", default="heart_rate")
+    parser.add_argument("--include-baseline", action="store_true")
+    parser.add_argument("--methods", help="comma separated threshold methods to run, all by default")
+    parser.add_argument(
+        "--zones",
+        help="comma separated zone schemes (see zones.SCHEMES), empty for none (default: all registered schemes)",
+    )
+    parser.add_argument(
+        "--zone-scheme",
+        action="append",
+        default=[],
+        metavar="JSON",
+        help="file defining an extra zone scheme, see zones.register_scheme; can be repeated",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=8, help="tests per task sent to a worker")
+    parser.add_argument("--progress-every", type=float, default=2.0, help="seconds between progress lines")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    return parser
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()] if value else []
+
+
+def _read_file(path: str) -> "pd.DataFrame":
+    import pandas as pd
+
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _tests(args, cols: Dict[str, str], failures: Deque[Tuple[Any, Exception]]) -> Iterator[Tuple[Any, "pd.DataFrame"]]:
+    """Tests from all inputs; files that cannot be read are reported in `failures` instead of raising."""
+    from lactate_thresholds.process import clean_data
+    from lactate_thresholds.reader import read_tests
+
+    id_cols = _split(args.test_id_col)
+    for path in args.inputs:
+        if id_cols:
+            # Tests read before a file turns out broken (e.g. non contiguous test ids) are kept
+            try:
+                yield from read_tests(path, test_id_col=id_cols if len(id_cols) > 1 else id_cols[0], **cols)
+            except Exception as e:
+                failures.append((path, e))
+            continue
+        try:
+            yield path, clean_data(_read_file(path), **cols)
+        except Exception as e:
+            failures.append((path, e))
+
+
+def _columns(zones: Sequence[str]) -> List[str]:
+    from lactate_thresholds.records import RESULT_DTYPE
+    from lactate_thresholds.zones import get_scheme
+
+    columns = ["test_id"] + [name for name in RESULT_DTYPE.names if name != "test_id"]
+    for scheme in zones:
+        for i in range(1, len(get_scheme(scheme).zones) + 1):
+            columns += [f"{scheme}_zone{i}_intensity", f"{scheme}_zone{i}_heart_rate"]
+    return columns + ["error"]
+
+
+def _register_schemes(paths: Sequence[str]):
+    """Register the --zone-scheme files, in the main process and again in every worker."""
+    from lactate_thresholds.zones import register_scheme
+
+    for path in paths:
+        with open(path) as f:
+            register_scheme(json.load(f), replace=True)
+
+
+def _row(test_id: Any, res: Any, zones: Sequence[str]) -> Dict[str, Any]:
+    """Output row of a result or exception, run in the workers so zones are computed in parallel too."""
+    from lactate_thresholds.records import ThresholdRecord
+    from lactate_thresholds.zones import SCHEMES
+
+    test_id = "/".join(map(str, test_id)) if isinstance(test_id, tuple) else str(test_id)
+    if isinstance(res, Exception):
+        return {"test_id": test_id, "error": f"{type(res).__name__}: {res}"}
+
+    values = ThresholdRecord.from_model(res).row()[()]
+    row = {"test_id": test_id}
+    row.update((name, float(values[name])) for name in values.dtype.names if name != "test_id")
+
+    if res.lt1_estimate is not None and res.lt2_estimate is not None:
+        for scheme in zones:
+            table = SCHEMES[scheme](res)
+            for i, (intensity, heart_rate) in enumerate(zip(table["intensity"], table["heart_rate"]), start=1):
+                row[f"{scheme}_zone{i}_intensity"] = intensity
+                row[f"{scheme}_zone{i}_heart_rate"] = heart_rate
+    return row
+
+
+class _Writer:
+    """Streams rows to CSV or JSON lines as they come, or to Parquet in row groups of `buffer_rows`."""
+
+    def __init__(self, path: str, file_format: str, columns: List[str], buffer_rows: int = 10_000):
+        self.file_format = file_format
+        self.columns = columns
+        self.buffer_rows = buffer_rows
+        self._buffer: List[Dict[str, Any]] = []
+
+        if file_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            types = {c: pa.string() if c == "test_id" or "zone" in c or c == "error" else pa.float64() for c in columns}
+            self._schema = pa.schema([(c, types[c]) for c in columns])
+            self._file = pq.ParquetWriter(path, self._schema)
+        else:
+            self._file = open(path, "w", newline="")
+            if file_format == "csv":
+                self._csv = csv.DictWriter(self._file, fieldnames=columns)
+                self._csv.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        if self.file_format == "csv":
+            self._csv.writerow(row)
+        elif self.file_format == "jsonl":
+            clean = {k: None if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()}
+            self._file.write(json.dumps(clean) + "\n")
+        else:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.buffer_rows:
+                self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if self._buffer:
+            table = pa.Table.from_pylist(self._buffer, schema=self._schema)
+            self._file.write_table(table)
+            self._buffer = []
+
+    def close(self):
+        if self.file_format == "parquet":
+            self._flush()
+        self._file.close()
+
+
+class _Progress:
+    def __init__(self, every: float, quiet: bool):
+        self.every, self.quiet = every, quiet
+        self.start = self.last = time.perf_counter()
+        self.done = self.failed = 0
+
+    def update(self, failed: bool):
+        self.done += 1
+        self.failed += failed
+        now = time.perf_counter()
+        if not self.quiet and now - self.last >= self.every:
+            self.last = now
+            print(f"{self.done} tests, {self.failed} failed, {self.rate:.1f} tests/s", file=sys.stderr)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of the `lt_batch` script."""
+    args = _parser().parse_args(argv)
+
+    from lactate_thresholds.zones import SCHEMES
+
+    for path in args.zone_scheme:
+        try:
+            _register_schemes([path])
+        except (OSError, ValueError) as e:
+            _parser().error(f"cannot load zone scheme '{path}': {e}")
+
+    zones = list(SCHEMES) if args.zones is None else _split(args.zones)
+    unknown = set(zones) - set(SCHEMES)
+    if unknown:
+        _parser().error(f"unknown zone schemes: {', '.join(sorted(unknown))}")
+    file_format = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if file_format not in FORMATS:
+        _parser().error(f"cannot tell the output format of '{args.output}', use --format")
+
+    from lactate_thresholds.parallel import determine_iter, make_executor
+
+    cols = dict(
+        step_col=args.step_col,
+        length_col=args.length_col,
+        intensity_col=args.intensity_col,
+        lactate_col=args.lactate_col,
+        heart_rate_col=args.heart_rate_col,
+    )
+    failures: Deque[Tuple[Any, Exception]] = deque()
+    executor = make_executor(
+        "serial" if args.jobs <= 1 else "process",
+        args.jobs,
+        initializer=partial(_register_schemes, args.zone_scheme),
+    )
+    results = determine_iter(
+        _tests(args, cols, failures),
+        backend=executor,
+        max_workers=args.jobs,
+        chunk_size=args.chunk_size,
+        return_exceptions=True,
+        postprocess=partial(_row, zones=zones),
+        include_baseline=args.include_baseline,
+        methods=_split(args.methods) or None,
+    )
+
+    progress = _Progress(args.progress_every, args.quiet)
+    writer = _Writer(args.output, file_format, _columns(zones))
+
+    def emit(test_id: Any, row: Any):
+        # Exceptions include e.g. a zone scheme that cannot handle the curve, the test fails rather than the run
+        writer.write(_row(test_id, row, zones) if isinstance(row, Exception) else row)
+        progress.update(isinstance(row, Exception))
+
+    try:
+        for test_id, res in results:
+            emit(test_id, res)
+            while failures:
+                emit(*failures.popleft())
+        while failures:
+            emit(*failures.popleft())
+    finally:
+        writer.close()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - progress.start
+        print(
+            f"Done: {progress.done} tests, {progress.failed} failed in {elapsed:.1f}s ({progress.rate:.1f} tests/s)",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+from numpy.polynomial.polynomial import Polynomial
+
+DEGREE = 3
+
+
+def horner(coef: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate polynomials with Horner's method.
+
+    Args:
+        coef (np.ndarray): Coefficients ordered from the constant upwards, along the second to last axis when
+            batched, i.e. shape (..., degree + 1) or (..., degree + 1, n_responses).
+        t (np.ndarray): Points to evaluate, broadcast against the leading axes of `coef`.
+    """
+    out = np.zeros(np.broadcast_shapes(t.shape, coef[..., -1].shape), dtype=np.result_type(coef, t))
+    for i in range(coef.shape[-1] - 1, -1, -1):
+        out = out * t + coef[..., i]
+    return out
+
+
+@dataclass(frozen=True)
+class CubicFit:
+    """Least squares cubic fit of one or more responses against intensity.
+
+    Intensity is mapped onto [-1, 1] before building the design matrix, so the fit stays well conditioned
+    for watt-scale intensities where the raw third power runs into the tens of millions.
+    """
+
+    coef: np.ndarray  # (DEGREE + 1, n_responses), scaled basis
+    center: float
+    scale: float
+
+    def scaled(self, x: np.ndarray) -> np.ndarray:
+        return (np.asarray(x, dtype=float) - self.center) / self.scale
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """Predict all responses at `x`, returns shape (len(x), n_responses)."""
+        t = self.scaled(x)
+        return horner(self.coef.T, t[:, None]) if t.ndim else horner(self.coef.T, t)
+
+    def polynomial(self, response: int = 0) -> Polynomial:
+        """The fitted curve of one response as a numpy `Polynomial` in intensity units."""
+        return Polynomial(
+            self.coef[:, response],
+            domain=[self.center - self.scale, self.center + self.scale],
+            window=[-1, 1],
+        )
+
+    def derivative(self, response: int = 0, order: int = 1) -> Polynomial:
+        """Derivative of the fitted curve of one response with respect to intensity."""
+        return self.polynomial(response).deriv(order)
+
+    def invert(self, value: np.ndarray | float, lo: float, hi: float, response: int = 0) -> np.ndarray:
+        """Intensity within [lo, hi] at which `response` reaches `value`, see `invert_cubic`."""
+        t = invert_cubic(self.coef[:, response], value, self.scaled(lo), self.scaled(hi))
+        return self.center + self.scale * t
+
+
+@dataclass(frozen=True)
+class FittedCurves(CubicFit):
+    """All fitted curves of one test, fitted once by `interpolate` and shared by the threshold methods.
+
+    Next to the cubic lactate (response 0) and heart rate (response 1) curves, holds the straight line heart
+    rate model that reports the heart rate of ModDMax, fitted on all but the first step.
+    """
+
+    heart_rate_line: np.ndarray = None  # (intercept, slope)
+
+    def predict_heart_rate(self, x: np.ndarray) -> np.ndarray:
+        """Heart rate at `x` from the straight line model, rounded to whole beats."""
+        return predict_line(self.heart_rate_line, x)
+
+
+def fit_line(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Least squares straight line, returns (intercept, slope)."""
+    x = np.asarray(x, dtype=float)
+    V = np.column_stack([np.ones_like(x), x])
+    coef, *_ = np.linalg.lstsq(V, np.asarray(y, dtype=float), rcond=None)
+    return coef
+
+
+def predict_line(coef: np.ndarray, x: np.ndarray) -> np.ndarray:
+    return np.round(coef[0] + coef[1] * np.asarray(x, dtype=float), 0)
+
+
+def fit_cubic(x: np.ndarray, y: np.ndarray) -> CubicFit:
+    """Fit a 3rd degree polynomial for all columns of `y` with a single least squares solve.
+
+    Args:
+        x (np.ndarray): Intensity values, shape (n,).
+        y (np.ndarray): Responses, shape (n,) or (n, n_responses).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+
+    center = (x.max() + x.min()) / 2
+    scale = (x.max() - x.min()) / 2 or 1.0
+
+    V = np.vander((x - center) / scale, DEGREE + 1, increasing=True)
+    coef, *_ = np.linalg.lstsq(V, y, rcond=None)
+
+    return CubicFit(coef=coef, center=center, scale=scale)
+
+
+def fit_curves(
+    intensity: np.ndarray,
+    lactate: np.ndarray,
+    heart_rate: np.ndarray,
+    line_intensity: np.ndarray,
+    line_heart_rate: np.ndarray,
+) -> FittedCurves:
+    """Fit the cubic curves of a test and the straight heart rate line, see `FittedCurves`.
+
+    The line has its own points as it keeps the steps the cubic fit may drop, e.g. the baseline.
+    """
+    cubic = fit_cubic(intensity, np.column_stack([lactate, heart_rate]))
+    return FittedCurves(cubic.coef, cubic.center, cubic.scale, fit_line(line_intensity, line_heart_rate))
+
+
+def fit_cubic_many(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit a 3rd degree polynomial to many tests at once via stacked normal equations.
+
+    Args:
+        x (np.ndarray): Padded intensities, shape (n_tests, n_points).
+        y (np.ndarray): Padded responses, shape (n_tests, n_points, n_responses).
+        mask (np.ndarray): Boolean mask of valid (non padding) points, shape (n_tests, n_points).
+
+    Returns:
+        Tuple of coefficients in the scaled basis (n_tests, 4, n_responses), ordered from the constant
+        upwards, together with the per-test center and scale used to map intensity onto [-1, 1].
+    """
+    lo = np.where(mask, x, np.inf).min(axis=1)
+    hi = np.where(mask, x, -np.inf).max(axis=1)
+    center = (lo + hi) / 2
+    scale = (hi - lo) / 2
+    scale[~np.isfinite(scale) | (scale == 0)] = 1.0
+
+    t = np.where(mask, (x - center[:, None]) / scale[:, None], 0.0)
+    V = t[..., None] ** np.arange(DEGREE + 1)
+    Vw = V * mask[..., None]
+
+    gram = np.einsum("nmi,nmj->nij", Vw, V)
+    rhs = np.einsum("nmi,nmk->nik", Vw, y)
+    coef = np.linalg.pinv(gram) @ rhs
+
+    return coef, center, scale
+
+
+def cubic_roots(coef: np.ndarray, value: np.ndarray | float = 0.0) -> np.ndarray:
+    """Real roots of `p(t) = value` for (batches of) polynomials of at most 3rd degree.
+
+    Roots are the eigenvalues of the companion matrices, solved for the whole batch in one call. Entries
+    whose cubic term vanishes fall back to the quadratic or linear closed form.
+
+    Args:
+        coef (np.ndarray): Coefficients ordered from the constant upwards, shape (..., 4).
+        value (np.ndarray | float): Right hand side, broadcast against the leading axes of `coef`.
+
+    Returns:
+        np.ndarray: Shape (..., 3) with the real roots, NaN padded.
+    """
+    coef = np.asarray(coef, dtype=float)
+    value = np.asarray(value, dtype=float)
+    shape = np.broadcast_shapes(coef.shape[:-1], value.shape)
+
+    a = np.broadcast_to(coef, shape + (DEGREE + 1,)).copy()
+    a[..., 0] -= value
+    size = np.abs(a).max(axis=-1)
+    tol = 1e-12 * np.where(size > 0, size, 1.0)
+
+    roots = np.full(shape + (DEGREE,), np.nan, dtype=complex)
+
+    is_cubic = np.abs(a[..., 3]) > tol
+    if is_cubic.any():
+        c = a[is_cubic]
+        companion = np.zeros((len(c), 3, 3))
+        companion[:, 1, 0] = 1.0
+        companion[:, 2, 1] = 1.0
+        companion[:, :, 2] = -c[:, :3] / c[:, 3:]
+        roots[is_cubic] = np.linalg.eigvals(companion)
+
+    rest = ~is_cubic
+    if rest.any():
+        c = a[rest]
+        a0, a1, a2 = c[:, 0], c[:, 1], c[:, 2]
+        is_quadratic = np.abs(a2) > tol[rest]
+        is_linear = ~is_quadratic & (np.abs(a1) > tol[rest])
+        disc = np.sqrt((a1**2 - 4 * a2 * a0).astype(complex))
+        denom = np.where(is_quadratic, 2 * a2, 1.0)
+
+        r = np.full((len(c), 3), np.nan, dtype=complex)
+        r[:, 0] = np.where(is_quadratic, (-a1 + disc) / denom, np.nan)
+        r[:, 1] = np.where(is_quadratic, (-a1 - disc) / denom, np.nan)
+        r[:, 2] = np.where(is_linear, -a0 / np.where(is_linear, a1, 1.0), np.nan)
+        roots[rest] = r
+
+    is_real = np.abs(roots.imag) <= 1e-6 * np.maximum(1.0, np.abs(roots.real))
+    return np.where(is_real, roots.real, np.nan)
+
+
+def invert_cubic(coef: np.ndarray, value: np.ndarray | float, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Solve `p(t) = value` on [lo, hi] and pick the highest crossing.
+
+    The highest crossing lies on the final monotone branch of the curve, i.e. it is the point from which on
+    the curve stays on one side of `value`. This is the one that matters for thresholds such as OBLA, an
+    early dip of the lactate curve should not produce a spurious low intensity. NaN if there is no crossing.
+    """
+    roots = cubic_roots(coef, value)
+    lo = np.asarray(lo, dtype=float)[..., None]
+    hi = np.asarray(hi, dtype=float)[..., None]
+    eps = 1e-9 * np.maximum(1.0, np.abs(hi - lo))
+    roots = np.where((roots >= lo - eps) & (roots <= hi + eps), roots, -np.inf)
+
+    best = roots.max(axis=-1)
+    return np.where(np.isfinite(best), np.clip(best, lo[..., 0], hi[..., 0]), np.nan)
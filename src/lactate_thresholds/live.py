@@ -0,0 +1,178 @@
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds import registry
+from lactate_thresholds.fit import DEGREE, CubicFit
+from lactate_thresholds.methods import interpolate, interpolation_step
+from lactate_thresholds.types import LactateThresholdResults
+
+
+def _mod_dmax_ready(steps: pd.DataFrame) -> bool:
+    # The first rise of at least 0.4 mmol/L needs a couple of steps after it to draw the ModDMax line
+    rises = np.flatnonzero(steps["lactate"].diff().shift(-1).to_numpy() >= 0.4)
+    return len(steps) >= 5 and len(rises) > 0 and rises[0] <= len(steps) - 3
+
+
+# When a method has enough data to be meaningful, given the (non baseline) steps so far
+READINESS: Dict[str, Callable[[pd.DataFrame], bool]] = {
+    "obla_2": lambda steps: len(steps) >= 4 and steps["lactate"].max() >= 2,
+    "obla_4": lambda steps: len(steps) >= 4 and steps["lactate"].max() >= 4,
+    "baseline": lambda steps: len(steps) >= 4,
+    "mod_dmax": _mod_dmax_ready,
+    "loglog": lambda steps: len(steps) >= 5,
+    "ltp": lambda steps: len(steps) >= 6,
+}
+
+
+class IncrementalEstimator:
+    """Threshold estimates that update as the steps of a test come in.
+
+    The cubic lactate and heart rate fits are kept as sufficient statistics (the normal equations) in a basis
+    anchored at the first step, so adding a step and refitting costs O(1) however long the test gets. Each
+    threshold method is only run once there is enough data for it (see `READINESS`), and methods are run in
+    order until `latency_budget` is used up; the ones that did not fit in keep their previous result and are
+    listed in `stale`. Other methods registered with `registry.register_method` run as soon as everything
+    they require is available, their outputs end up in `extra` unless they are fields of the results.
+
+    Baseline rows (intensity 0) are kept in the clean data but not fitted, as in `determine` with the default
+    `include_baseline=False`.
+
+    Args:
+        tolerance (float): Linear interpolation error of the working grid, see `methods.interpolation_step`.
+        latency_budget (float, optional): Seconds available for an update, no limit if None.
+        solver (str): Segmented regression solver for LTP and LogLog.
+    """
+
+    def __init__(self, tolerance: float = 1e-3, latency_budget: Optional[float] = 0.25, solver: str = "exact"):
+        self.tolerance = tolerance
+        self.latency_budget = latency_budget
+        self.solver = solver
+
+        self._rows: List[dict] = []
+        self._center: Optional[float] = None
+        self._scale: Optional[float] = None
+        self._gram = np.zeros((DEGREE + 1, DEGREE + 1))
+        self._rhs = np.zeros((DEGREE + 1, 2))
+        self._n_fitted = 0
+        self._outputs: Dict[str, object] = {}
+        self.stale: List[str] = []
+
+    def add_step(
+        self,
+        intensity: float,
+        lactate: float,
+        heart_rate: float,
+        step: Optional[int] = None,
+        length: float = 0,
+    ):
+        """Ingest one step, following the `clean_data` column contract."""
+        values = dict(intensity=intensity, lactate=lactate, heart_rate=heart_rate, length=length)
+        for col, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float, np.number)) or not np.isfinite(value):
+                raise ValueError(f"Column '{col}' is not numeric / contains nonnumeric values")
+
+        step = len(self._rows) if step is None else step
+        self._rows.append(
+            {"step": step, "length": length, "intensity": intensity, "lactate": lactate, "heart_rate": heart_rate}
+        )
+
+        if intensity == 0:
+            return
+
+        if self._center is None:
+            # Anchor the basis at the first step, keeping the normal equations well conditioned
+            self._center, self._scale = float(intensity), float(abs(intensity)) or 1.0
+
+        v = ((intensity - self._center) / self._scale) ** np.arange(DEGREE + 1)
+        self._gram += np.outer(v, v)
+        self._rhs += np.outer(v, [lactate, heart_rate])
+        self._n_fitted += 1
+
+    @property
+    def clean_data(self) -> pd.DataFrame:
+        return pd.DataFrame(self._rows, columns=["step", "length", "intensity", "lactate", "heart_rate"])
+
+    @property
+    def fit(self) -> Optional[CubicFit]:
+        """Current cubic fit, None until there are enough steps to determine it."""
+        if self._n_fitted <= DEGREE or np.linalg.matrix_rank(self._gram) <= DEGREE:
+            return None
+        return CubicFit(coef=np.linalg.solve(self._gram, self._rhs), center=self._center, scale=self._scale)
+
+    def ready_methods(self) -> List[str]:
+        """Registered methods that can run on the steps so far.
+
+        Methods in `READINESS` decide for themselves, any other method is ready once all of its requirements are
+        inputs or outputs of ready methods, e.g. the LT1 / LT2 estimates once LTP, LogLog and ModDMax are.
+        """
+        steps = self.clean_data
+        steps = steps[steps["intensity"] != 0].sort_values("intensity")
+        registered = registry.registered_methods()
+        ready = [name for name, is_ready in READINESS.items() if name in registered and is_ready(steps)]
+
+        available = set(registry.INPUTS)
+        for name in ready:
+            available.update(registry.get_method(name).outputs)
+        pending = [name for name in registered if name not in READINESS]
+        while True:
+            newly = [name for name in pending if set(registry.get_method(name).requires) <= available]
+            if not newly:
+                return ready
+            for name in newly:
+                ready.append(name)
+                available.update(registry.get_method(name).outputs)
+                pending.remove(name)
+
+    def estimate(self) -> Optional[LactateThresholdResults]:
+        """Recompute the thresholds for the steps so far, None if there is not enough data for a fit yet."""
+        fit = self.fit
+        if fit is None:
+            return None
+
+        dfc = self.clean_data
+        fitted = dfc[dfc["intensity"] != 0]
+        lo, hi = fitted["intensity"].min(), fitted["intensity"].max()
+        intensity = np.arange(lo, hi, interpolation_step(fit, lo, hi, tolerance=self.tolerance))
+        lactate, heart_rate = fit(intensity).T
+        dfi = pd.DataFrame({"intensity": intensity, "lactate": lactate, "heart_rate": heart_rate})
+        dfi.attrs["fit"] = fit
+
+        ready = self.ready_methods()
+
+        inputs = {"clean_data": dfc, "interpolated_data": dfi, "fit": fit}
+        products = dict(inputs)
+        start = time.perf_counter()
+        self.stale = []
+        plan = registry.resolve(ready)
+        for method in plan:
+            over_budget = self.latency_budget is not None and time.perf_counter() - start > self.latency_budget
+            if over_budget:
+                self.stale.append(method.name)
+                products.update({o: self._outputs.get(o) for o in method.outputs})
+                continue
+            values = method(products, {"solver": self.solver})
+            products.update(values)
+            self._outputs.update(values)
+
+        res = LactateThresholdResults(
+            clean_data=dfc,
+            interpolator=partial(interpolate, dfc.copy(), include_baseline=False),
+            working_data=dfi,
+        )
+        for method in plan:
+            for output in method.outputs:
+                if output in LactateThresholdResults.model_fields:
+                    setattr(res, output, products[output])
+                else:
+                    res.extra[output] = products[output]
+
+        return res
+
+    def update(self, *args, **kwargs) -> Optional[LactateThresholdResults]:
+        """`add_step` followed by `estimate`."""
+        self.add_step(*args, **kwargs)
+        return self.estimate()
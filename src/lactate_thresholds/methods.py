@@ -1,13 +1,11 @@
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import pwlf
-import statsmodels.api as sm
-from numpy.polynomial.polynomial import Polynomial
-from scipy.optimize import curve_fit
 
+from lactate_thresholds.fit import CubicFit, FittedCurves, fit_cubic, fit_curves
+from lactate_thresholds.segmented import fit_breakpoints
 from lactate_thresholds.types import (
     OBLA,
     BaseLinePlus,
@@ -16,50 +14,118 @@ from lactate_thresholds.types import (
     ModDMax,
     ThresholdEstimate,
 )
-from lactate_thresholds.utils import (
-    get_heart_rate,
-    get_heart_rate_interpolated,
-    get_intensity_interpolated,
-    get_lactate_interpolated,
-)
-
-
-def interpolate(df: pd.DataFrame, interpolation_factor: float = 0.1, include_baseline: bool = True) -> pd.DataFrame:
-    # Adjust baseline intensity
+from lactate_thresholds.utils import InterpolatedIndex, interpolated_index, predict_heart_rate
+
+Measurement = Tuple[float, float, float]
+
+logger = logging.getLogger(__name__)
+
+
+# Grid step per intensity unit, giving comparable precision across sports
+UNIT_STEPS = {
+    "watt": 1.0,
+    "km/h": 0.01,
+    "m/s": 0.005,
+}
+
+
+def interpolation_step(
+    fit: CubicFit,
+    intensity_min: float,
+    intensity_max: float,
+    interpolation_factor: float = 0.1,
+    n_points: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    unit: Optional[str] = None,
+    max_points: int = 100_000,
+) -> float:
+    """Determine the step size of the interpolation grid.
+
+    In order of precedence: a target number of points, an error tolerance, a unit specific step (see
+    `UNIT_STEPS`) and finally the fixed `interpolation_factor`.
+
+    The tolerance bounds the error of linearly interpolating between grid points, which for a curve f is at
+    most h^2 / 8 * max|f''|. For a cubic f'' is linear so its maximum is found at one of the range ends.
+    """
+    span = intensity_max - intensity_min
+
+    if n_points is not None:
+        step = span / max(n_points, 1)
+    elif tolerance is not None:
+        d2 = [np.abs(fit.polynomial(i).deriv(2)([intensity_min, intensity_max])).max() for i in range(2)]
+        curvature = max(d2)
+        step = np.sqrt(8 * tolerance / curvature) if curvature > 0 else span
+    elif unit is not None:
+        if unit not in UNIT_STEPS:
+            raise ValueError(f"Unknown unit '{unit}', expected one of {list(UNIT_STEPS)}")
+        step = UNIT_STEPS[unit]
+    else:
+        step = interpolation_factor
+
+    # Keep the grid within sane bounds whatever the policy
+    if span > 0:
+        step = min(max(step, span / max_points), span / 2)
+    return step
+
+
+def interpolate_arrays(
+    intensity: np.ndarray,
+    lactate: np.ndarray,
+    heart_rate: np.ndarray,
+    interpolation_factor: float = 0.1,
+    include_baseline: bool = True,
+    n_points: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    unit: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, CubicFit]:
+    """Array counterpart of `interpolate`, returning the grid (intensity, lactate, heart_rate) and the fit."""
+    # The heart rate line of ModDMax skips the first step, baseline or not
+    line_intensity, line_heart_rate = intensity[1:], heart_rate[1:]
+
+    is_baseline = intensity == 0
+    if is_baseline.any():
+        if include_baseline:
+            intensity = intensity.copy()
+            intensity[is_baseline] = intensity[1] - (intensity[2] - intensity[1])
+        else:
+            keep = ~is_baseline
+            intensity, lactate, heart_rate = intensity[keep], lactate[keep], heart_rate[keep]
+
+    # Fit lactate and heartrate in one go, these curves are shared by all threshold methods
+    fit = fit_curves(intensity, lactate, heart_rate, line_intensity, line_heart_rate)
+
+    # Generate new intensity values for interpolation and predict
+    intensity_min, intensity_max = intensity.min(), intensity.max()
+    step = interpolation_step(fit, intensity_min, intensity_max, interpolation_factor, n_points, tolerance, unit)
+    new_intensity = np.arange(intensity_min, intensity_max, step)
+    new_lactate, new_heartrate = fit(new_intensity).T
+
+    return new_intensity, new_lactate, new_heartrate, fit
+
+
+def interpolate(
+    df: pd.DataFrame,
+    interpolation_factor: float = 0.1,
+    include_baseline: bool = True,
+    n_points: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    unit: Optional[str] = None,
+) -> pd.DataFrame:
+    # Adjust baseline intensity, in place so that the clean data reflects it
     if include_baseline and (df["intensity"] == 0).any():
         to_subtract = df.iloc[2]["intensity"] - df.iloc[1]["intensity"]
         df.loc[df["intensity"] == 0, "intensity"] = df.iloc[1]["intensity"] - to_subtract
 
-    # Remove baseline if not included
-    if not include_baseline and (df["intensity"] == 0).any():
-        df = df[df["intensity"] != 0]
-
-    # Sort the dataframe by intensity
-    df = df.sort_values(by="intensity").reset_index(drop=True)
-
-    def fit_and_predict(column):
-        # Create polynomial features manually
-        X = np.column_stack([df["intensity"] ** i for i in range(1, 4)])  # 3rd degree
-        y = df[column]
-
-        # Fit the statsmodels OLS model
-        X = sm.add_constant(X)  # Add intercept term
-        model = sm.OLS(y, X).fit()
-
-        # Generate new intensity values for interpolation
-        new_intensity = np.arange(df["intensity"].min(), df["intensity"].max(), interpolation_factor)
-        new_X = np.column_stack([new_intensity**i for i in range(1, 4)])
-        new_X = sm.add_constant(new_X)  # Add intercept term for prediction
-
-        # Predict values for the new intensity data
-        new_values = model.predict(new_X)
-        return new_intensity, new_values
-
-    # Interpolate lactate
-    new_intensity, new_lactate = fit_and_predict("lactate")
-
-    # Interpolate heartrate
-    _, new_heartrate = fit_and_predict("heart_rate")
+    new_intensity, new_lactate, new_heartrate, fit = interpolate_arrays(
+        df["intensity"].to_numpy(dtype=float),
+        df["lactate"].to_numpy(dtype=float),
+        df["heart_rate"].to_numpy(dtype=float),
+        interpolation_factor,
+        include_baseline,
+        n_points,
+        tolerance,
+        unit,
+    )
 
     # Combine interpolated values into a new DataFrame
     interpolated_df = pd.DataFrame(
@@ -69,139 +135,182 @@ def interpolate(df: pd.DataFrame, interpolation_factor: float = 0.1, include_bas
             "heart_rate": new_heartrate,
         }
     )
+    interpolated_df.attrs["fit"] = fit
 
     return interpolated_df
 
 
-def determine_ltp(
-    data_clean: pd.DataFrame, data_interpolated: pd.DataFrame, n_breakpoints: int = 2
-) -> List[LactateTurningPoint]:
-    # Extract intensity and lactate data
-    X = data_interpolated["intensity"].values
-    y = data_interpolated["lactate"].values
+def fit_piecewise_linear(x: np.ndarray, y: np.ndarray, n_breakpoints: int, solver: str = "exact") -> np.ndarray:
+    """Breakpoints of a continuous piecewise linear fit, including the outer ends.
 
-    # Fit piecewise linear model
-    pwlf_model = pwlf.PiecewiseLinFit(X, y)
-    breakpoints = pwlf_model.fit(n_breakpoints + 1)  # n_segments = n_breakpoints + 1
+    Args:
+        solver (str): "exact" for the deterministic search in `segmented.fit_breakpoints`, or "pwlf" for
+            the randomized global optimizer of `pwlf`, kept for comparison.
+    """
+    if solver == "exact":
+        return fit_breakpoints(x, y, n_breakpoints)
+    if solver == "pwlf":
+        import pwlf
 
-    # Get breakpoint intensities and corresponding lactate values
-    breakpoint_intensities = breakpoints[1:-1]  # Ignore first and last points
+        return pwlf.PiecewiseLinFit(x, y).fit(n_breakpoints + 1)  # n_segments = n_breakpoints + 1
 
-    lt1 = LactateTurningPoint(
-        lactate=get_lactate_interpolated(data_interpolated, breakpoint_intensities[0]),
-        intensity=breakpoint_intensities[0],
-        heart_rate=get_heart_rate_interpolated(data_interpolated, breakpoint_intensities[0]),
-    )
-    lt2 = LactateTurningPoint(
-        lactate=get_lactate_interpolated(data_interpolated, breakpoint_intensities[1]),
-        intensity=breakpoint_intensities[1],
-        heart_rate=get_heart_rate_interpolated(data_interpolated, breakpoint_intensities[1]),
-    )
+    raise ValueError(f"Unknown solver '{solver}', expected 'exact' or 'pwlf'")
 
-    return [lt1, lt2]
 
+# The threshold methods below work on plain arrays and an `InterpolatedIndex` over the interpolation grid,
+# returning (intensity, lactate, heart_rate) tuples. The `determine_*` functions wrap them for DataFrames.
 
-def determine_mod_dmax(data_clean: pd.DataFrame, data_interpolated: pd.DataFrame) -> ModDMax:
-    if data_clean.empty or data_clean.iloc[0]["intensity"] == 0:
-        data_dmax = data_clean.iloc[1:].copy()
-    else:
-        data_dmax = data_clean.copy()
 
-    # Find the first rise in blood lactate greater than 0.4 mmol/L
-    data_dmax["diffs"] = data_dmax["lactate"].diff().shift(-1)
-    data_first_rise = data_dmax[data_dmax["diffs"] >= 0.4].head(1)
+def ltp_arrays(
+    index: InterpolatedIndex, n_breakpoints: int = 2, solver: str = "exact", breakpoints: Optional[np.ndarray] = None
+) -> List[Measurement]:
+    """LTP1 and LTP2, from `breakpoints` of the lactate curve if they were already fitted."""
+    if breakpoints is None:
+        breakpoints = fit_piecewise_linear(index.intensity, index.lactate, n_breakpoints, solver)
+
+    # Ignore first and last points
+    return [(b, index.lactate_at(b), index.heart_rate_at(b)) for b in breakpoints[1:-1]]
 
-    if data_first_rise.empty:
-        logging.warning("No first rise in blood lactate greater than 0.4 mmol/L found.")
-        return None
 
-    # Fit a 3rd degree polynomial
-    def poly3(x, a, b, c, d):
-        return a * x**3 + b * x**2 + c * x + d
+def mod_dmax_arrays(
+    intensity: np.ndarray, lactate: np.ndarray, heart_rate: np.ndarray, index: InterpolatedIndex
+) -> Optional[Measurement]:
+    """ModDMax on the clean measurements, a leading baseline step is left out of the line."""
+    start = 1 if len(intensity) == 0 or intensity[0] == 0 else 0
+    dmax_intensity, dmax_lactate = intensity[start:], lactate[start:]
 
-    popt, _ = curve_fit(poly3, data_clean["intensity"], data_clean["lactate"])
+    # Find the first rise in blood lactate greater than 0.4 mmol/L
+    rises = np.flatnonzero(np.diff(dmax_lactate) >= 0.4)
+    if len(rises) == 0:
+        logger.warning("No first rise in blood lactate greater than 0.4 mmol/L found.")
+        return None
+    first_rise = rises[0]
+
+    # The lactate curve of the interpolation, refitted only when the grid was too small to carry it
+    curves = index.fit if index.fit is not None else fit_cubic(intensity, np.column_stack([lactate, heart_rate]))
+    curve = curves.polynomial(0)
 
     # Calculate the differences
-    diff_lactate = data_dmax["lactate"].max() - data_first_rise["lactate"].values[0]
-    diff_intensity = data_dmax["intensity"].max() - data_first_rise["intensity"].values[0]
+    diff_lactate = dmax_lactate.max() - dmax_lactate[first_rise]
+    diff_intensity = dmax_intensity.max() - dmax_intensity[first_rise]
 
     lin_beta = diff_lactate / diff_intensity
 
     # Find where the first derivative of the polynomial fit equals the slope of the line
-    p = Polynomial([popt[3], popt[2], popt[1], popt[0]])
-    dp = p.deriv()
-    roots = (dp - lin_beta).roots()
+    roots = (curves.derivative(0) - lin_beta).roots()
     roots = roots[np.isreal(roots)].real
     roots = roots[roots > 0]
 
-    max_intensity = data_dmax["intensity"].max()
+    max_intensity = dmax_intensity.max()
     model_intensity = roots[roots <= max_intensity].max()
-    model_lactate = poly3(model_intensity, *popt)
+    model_lactate = curve(model_intensity)
 
     # Workaround for unplausible estimations
     if model_lactate > 8:
-        logging.warning("Estimated lactate value via ModDMax is higher than 8 mmol/L. Returning None.")
+        logger.warning("Estimated lactate value via ModDMax is higher than 8 mmol/L. Returning None.")
         return None
 
-    return ModDMax(
-        lactate=get_lactate_interpolated(data_interpolated, model_intensity),
-        intensity=model_intensity,
-        heart_rate=get_heart_rate(data_clean, [model_intensity])[0],
-    )
+    if isinstance(curves, FittedCurves):
+        heart_rate_at = curves.predict_heart_rate([model_intensity])[0]
+    else:
+        heart_rate_at = predict_heart_rate(intensity, heart_rate, [model_intensity])[0]
+
+    return model_intensity, index.lactate_at(model_intensity), heart_rate_at
+
 
+def loglog_data(index: InterpolatedIndex, loglog_restrainer=1) -> Tuple[np.ndarray, np.ndarray]:
+    """Log intensity and log lactate the LogLog breakpoint is fitted to."""
+    positive = index.intensity > 0
+    log_intensity = np.log(index.intensity[positive])
+    log_lactate = np.log(index.lactate[positive])
 
-def determine_loglog(data_clean: pd.DataFrame, data_interpolated: pd.DataFrame, loglog_restrainer=1):
-    data_filtered = data_interpolated[data_interpolated["intensity"] > 0].copy()
-    data_filtered["intensity"] = np.log(data_filtered["intensity"])
-    data_filtered["lactate"] = np.log(data_filtered["lactate"])
+    n = int(loglog_restrainer * len(log_intensity))
+    return log_intensity[:n], log_lactate[:n]
 
-    n = len(data_filtered)
-    data_filtered = data_filtered.iloc[: int(loglog_restrainer * n)]
 
-    piecewise_fit = pwlf.PiecewiseLinFit(data_filtered["intensity"].values, data_filtered["lactate"].values)
-    breakpoints = piecewise_fit.fit(2)  # 1 breakpoint means 2 segments
+def loglog_arrays(
+    index: InterpolatedIndex, loglog_restrainer=1, solver: str = "exact", breakpoints: Optional[np.ndarray] = None
+) -> Measurement:
+    """LogLog, from `breakpoints` of `loglog_data` if they were already fitted."""
+    if breakpoints is None:
+        breakpoints = fit_piecewise_linear(*loglog_data(index, loglog_restrainer), 1, solver)
 
     loglog_intensity = np.exp(breakpoints[1])
-    lactate_interpolated = get_lactate_interpolated(data_interpolated, loglog_intensity)
-    loglog_heart_rate = get_heart_rate_interpolated(data_interpolated, loglog_intensity)
+    return loglog_intensity, index.lactate_at(loglog_intensity), index.heart_rate_at(loglog_intensity)
 
-    return LogLog(
-        lactate=lactate_interpolated,
-        intensity=loglog_intensity,
-        heart_rate=loglog_heart_rate,
+
+def baseline_arrays(
+    index: InterpolatedIndex, plus: float = 0.5, perc_initial_values: float = 0.2
+) -> Optional[Measurement]:
+    baseline_window = int(len(index.lactate) * perc_initial_values)
+    bsln = index.lactate[:baseline_window].mean() if baseline_window else np.nan
+    bsln_plus = bsln + plus
+
+    if bsln_plus > index.lactate.max() or bsln_plus < index.lactate.min():
+        logger.warning(f"Baseline + {plus} is out of range.")
+        return None
+
+    # The nearest grid point, as the baseline has always been looked up. The curve usually meets its baseline
+    # more than once, so solving it for the crossing (as OBLA does) would pick a different one.
+    bsln_plus_intensity = index.grid_intensity_at_lactate(bsln_plus)
+    return bsln_plus_intensity, bsln_plus, index.heart_rate_at(bsln_plus_intensity)
+
+
+def obla_arrays(index: InterpolatedIndex, obla_lactate: float) -> Measurement:
+    obla_intensity = index.intensity_at_lactate(obla_lactate)
+    return obla_intensity, obla_lactate, index.heart_rate_at(obla_intensity)
+
+
+def threshold_estimate_arrays(index: InterpolatedIndex, intensity: float) -> Measurement:
+    return (
+        np.round(intensity, 1),
+        np.round(index.lactate_at(intensity), 1),
+        np.round(index.heart_rate_at(intensity), 0),
     )
 
 
+def _measurement(model, value: Optional[Measurement], **kwargs):
+    if value is None:
+        return None
+    intensity, lactate, heart_rate = value
+    return model(intensity=intensity, lactate=lactate, heart_rate=heart_rate, **kwargs)
+
+
+def determine_ltp(
+    data_clean: pd.DataFrame, data_interpolated: pd.DataFrame, n_breakpoints: int = 2, solver: str = "exact"
+) -> List[LactateTurningPoint]:
+    values = ltp_arrays(interpolated_index(data_interpolated), n_breakpoints, solver)
+    return [_measurement(LactateTurningPoint, v) for v in values]
+
+
+def determine_mod_dmax(data_clean: pd.DataFrame, data_interpolated: pd.DataFrame) -> ModDMax:
+    value = mod_dmax_arrays(
+        data_clean["intensity"].to_numpy(dtype=float),
+        data_clean["lactate"].to_numpy(dtype=float),
+        data_clean["heart_rate"].to_numpy(dtype=float),
+        interpolated_index(data_interpolated),
+    )
+    return _measurement(ModDMax, value)
+
+
+def determine_loglog(
+    data_clean: pd.DataFrame, data_interpolated: pd.DataFrame, loglog_restrainer=1, solver: str = "exact"
+):
+    return _measurement(LogLog, loglog_arrays(interpolated_index(data_interpolated), loglog_restrainer, solver))
+
+
 def determine_baseline(
     data_clean: pd.DataFrame,
     data_interpolated: pd.DataFrame,
     plus: float = 0.5,
     perc_initial_values: float = 0.2,
 ) -> pd.DataFrame:
-    baseline_window = int(len(data_interpolated) * perc_initial_values)
-    bsln = data_interpolated["lactate"].iloc[:baseline_window].mean()
-    bsln_plus = bsln + plus
-
-    if bsln_plus > data_interpolated["lactate"].max() or bsln_plus < data_interpolated["lactate"].min():
-        logging.warning(f"Baseline + {plus} is out of range.")
-        return None
-
-    bsln_plus_intensity = get_intensity_interpolated(data_interpolated, bsln_plus)
-    return BaseLinePlus(
-        lactate=bsln_plus,
-        intensity=bsln_plus_intensity,
-        heart_rate=get_heart_rate_interpolated(data_interpolated, bsln_plus_intensity),
-        plus=plus,
-    )
+    value = baseline_arrays(interpolated_index(data_interpolated), plus, perc_initial_values)
+    return _measurement(BaseLinePlus, value, plus=plus)
 
 
 def determine_obla(data_interpolated: pd.DataFrame, obla_lactate: float) -> OBLA:
-    obla_intensity = get_intensity_interpolated(data_interpolated, obla_lactate)
-    return OBLA(
-        lactate=obla_lactate,
-        intensity=obla_intensity,
-        heart_rate=get_heart_rate_interpolated(data_interpolated, obla_intensity),
-    )
+    return _measurement(OBLA, obla_arrays(interpolated_index(data_interpolated), obla_lactate))
 
 
 def determine_threshold_estimate(
@@ -210,8 +319,4 @@ def determine_threshold_estimate(
     if intensity is None:
         intensity = np.mean([arg.intensity for arg in args])
 
-    return ThresholdEstimate(
-        intensity=np.round(intensity, 1),
-        lactate=np.round(get_lactate_interpolated(data_interpolated, intensity), 1),
-        heart_rate=np.round(get_heart_rate_interpolated(data_interpolated, intensity), 0),
-    )
+    return _measurement(ThresholdEstimate, threshold_estimate_arrays(interpolated_index(data_interpolated), intensity))
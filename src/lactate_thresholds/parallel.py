@@ -0,0 +1,233 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+import pandas as pd
+
+from lactate_thresholds.cache import ResultCache
+from lactate_thresholds.process import determine, result_key
+from lactate_thresholds.types import LactateThresholdResults
+
+Backend = Literal["serial", "thread", "process"]
+
+
+class SerialExecutor(Executor):
+    """Executor that runs every submitted call immediately in the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _warm_worker(initializer: Optional[Callable[[], None]] = None):
+    """Pool initializer; pays the imports of the threshold methods once per worker instead of in the first task."""
+    import lactate_thresholds.process  # noqa: F401
+
+    if initializer is not None:
+        initializer()
+
+
+def make_executor(
+    backend: Backend = "process", max_workers: Optional[int] = None, initializer: Optional[Callable[[], None]] = None
+) -> Executor:
+    """Create an executor for one of the supported backends.
+
+    Thread pools are useful on free-threaded CPython builds, `determine` keeps no shared state so tests
+    can be processed concurrently. On regular builds the process backend is the one that scales.
+
+    Args:
+        initializer (Callable, optional): Run once in every worker after the imports are warmed up. Not
+            run by the serial backend, which has no workers.
+    """
+    if backend == "serial":
+        return SerialExecutor()
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, initializer=partial(_warm_worker, initializer))
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=partial(_warm_worker, initializer))
+
+    raise ValueError(f"Unknown backend '{backend}', expected 'serial', 'thread' or 'process'")
+
+
+def _determine_chunk(
+    chunk: List[Tuple[Any, pd.DataFrame]],
+    kwargs: dict,
+    return_exceptions: bool,
+    postprocess: Optional[Callable[[Any, LactateThresholdResults], Any]] = None,
+) -> List[Tuple]:
+    out = []
+    for test_id, df in chunk:
+        try:
+            res = determine(df, **kwargs)
+            out.append((test_id, res if postprocess is None else postprocess(test_id, res)))
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            out.append((test_id, e))
+    return out
+
+
+def _keyed(tests: Iterable) -> Iterator[Tuple[Any, pd.DataFrame]]:
+    for i, item in enumerate(tests):
+        if isinstance(item, tuple):
+            yield item
+        else:
+            yield i, item
+
+
+class _CacheFilter:
+    """Serves cache hits and duplicate tests in the calling process, so only unique tests reach the workers."""
+
+    def __init__(self, cache: Optional[ResultCache], kwargs: dict, return_exceptions: bool):
+        self.cache = cache
+        self.kwargs = kwargs
+        self.return_exceptions = return_exceptions
+        self.ready: Deque[Tuple[Any, Any]] = deque()
+        self.waiting: Dict[str, List[Any]] = {}
+
+    def admit(self, keyed: Iterator[Tuple[Any, pd.DataFrame]]) -> Iterator[Tuple[Optional[str], Any, pd.DataFrame]]:
+        """Yield the (key, test_id, df) triples that need computing, or None when a test was served directly."""
+        for test_id, df in keyed:
+            if self.cache is None:
+                yield None, test_id, df
+                continue
+
+            try:
+                key = result_key(df, **self.kwargs)
+            except Exception as e:
+                if not self.return_exceptions:
+                    raise
+                self.ready.append((test_id, e))
+                yield None
+                continue
+
+            if key in self.waiting:
+                self.waiting[key].append(test_id)
+                self.cache.stats.duplicates += 1
+                yield None
+                continue
+
+            res = self.cache.get(key)
+            if res is not None:
+                self.ready.append((test_id, res))
+                yield None
+                continue
+
+            self.waiting[key] = [test_id]
+            yield key, test_id, df
+
+    def next_chunk(self, todo: Iterator, chunk_size: int) -> Tuple[List[Tuple], bool]:
+        """Collect up to `chunk_size` tests to compute, stopping early when enough results are ready."""
+        chunk = []
+        for item in todo:
+            if item is not None:
+                chunk.append(item)
+            if len(chunk) >= chunk_size or len(self.ready) >= chunk_size:
+                return chunk, False
+        return chunk, True
+
+    def settle(self, key: Optional[str], test_id: Any, res: Any):
+        if key is None:
+            self.ready.append((test_id, res))
+            return
+
+        ids = self.waiting.pop(key)
+        if not isinstance(res, Exception):
+            self.cache.put(key, res)
+        self.ready.append((ids[0], res))
+        for duplicate in ids[1:]:
+            # Not from the cache, which need not hold the result any more, e.g. with `maxsize=0`
+            self.ready.append((duplicate, res if isinstance(res, Exception) else ResultCache.copy(res)))
+
+
+def determine_iter(
+    tests: Iterable[pd.DataFrame | Tuple[Any, pd.DataFrame]],
+    backend: Backend | Executor = "process",
+    max_workers: Optional[int] = None,
+    chunk_size: int = 8,
+    max_in_flight: Optional[int] = None,
+    return_exceptions: bool = False,
+    cache: Optional[ResultCache] = None,
+    postprocess: Optional[Callable[[Any, LactateThresholdResults], Any]] = None,
+    **kwargs,
+) -> Iterator[Tuple[Any, LactateThresholdResults | Exception]]:
+    """Run `determine` over many tests, yielding results as soon as they are done.
+
+    Tests are consumed lazily from `tests` and submitted in chunks, with at most `max_in_flight` chunks
+    pending at any time so that memory stays flat however long the input is. Results are yielded in
+    completion order, not in input order.
+
+    With a `cache`, tests are looked up in the calling process before being submitted and results are stored
+    once they come back. Identical tests within one run are computed only once, see `cache.stats.duplicates`.
+
+    Args:
+        tests: DataFrames, or (test_id, DataFrame) pairs. Plain DataFrames are keyed by their position.
+        backend: "serial", "thread", "process" or an existing `concurrent.futures.Executor`.
+        max_workers (int, optional): Number of workers, defaults to the number of CPUs.
+        chunk_size (int): Number of tests per submitted task.
+        max_in_flight (int, optional): Maximum number of pending chunks, defaults to twice the workers.
+        return_exceptions (bool): Yield the exception of a failing test instead of raising it.
+        cache (ResultCache, optional): Result cache, see `cache.ResultCache`.
+        postprocess (Callable, optional): Called as `postprocess(test_id, result)` in the worker right after
+            `determine`, its return value is yielded instead of the result, e.g. to reduce it to a table row
+            before it is sent back. Must be picklable for the process backend, and cannot be used with a cache.
+        **kwargs: Passed on to `determine`, e.g. `lactate_col`.
+
+    Yields:
+        (test_id, LactateThresholdResults) pairs, or (test_id, Exception) if `return_exceptions` is set.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if cache is not None and postprocess is not None:
+        raise ValueError("postprocess cannot be combined with a cache, which holds results")
+
+    owns_executor = not isinstance(backend, Executor)
+    executor = make_executor(backend, max_workers) if owns_executor else backend
+    max_in_flight = max_in_flight or 2 * (max_workers or os.cpu_count() or 1)
+
+    cache_filter = _CacheFilter(cache, kwargs, return_exceptions)
+    todo = cache_filter.admit(_keyed(tests))
+    pending: Dict[Future, List[Optional[str]]] = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight and len(cache_filter.ready) < chunk_size:
+                chunk, exhausted = cache_filter.next_chunk(todo, chunk_size)
+                if chunk:
+                    future = executor.submit(
+                        _determine_chunk, [c[1:] for c in chunk], kwargs, return_exceptions, postprocess
+                    )
+                    pending[future] = [c[0] for c in chunk]
+
+            while cache_filter.ready:
+                yield cache_filter.ready.popleft()
+
+            if not pending:
+                if exhausted:
+                    break
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                keys = pending.pop(future)
+                for key, (test_id, res) in zip(keys, future.result()):
+                    cache_filter.settle(key, test_id, res)
+
+            while cache_filter.ready:
+                yield cache_filter.ready.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def determine_all(tests: Iterable[pd.DataFrame | Tuple[Any, pd.DataFrame]], **kwargs) -> dict:
+    """Collect `determine_iter` into a dict of test_id -> result."""
+    return dict(determine_iter(tests, **kwargs))
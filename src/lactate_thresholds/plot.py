@@ -1,298 +1,568 @@
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
 import altair as alt
+import numpy as np
 import pandas as pd
 
 from lactate_thresholds.types import LactateThresholdResults
 
+WIDTH, HEIGHT = 800, 600
+
+# Named datasets of the compact plots and the y columns drawn by each kind of plot
+DATASETS = ("measurements", "curve", "thresholds")
+PLOTS = {"lactate": ["lactate"], "heart_rate": ["heart_rate"], "dashboard": ["lactate", "heart_rate"]}
+
+# Points per fitted cubic of a `determine_many` table, before reducing them to the chart's resolution
+_CUBIC_POINTS = 200
+
+# Marker shape and color per threshold
+_STAR = "M0,.5L.6,.8L.5,.1L1,-.3L.3,-.4L0,-1L-.3,-.4L-1,-.3L-.5,.1L-.6,.8L0,.5Z"
+SHAPES = {
+    "ltp1": ("circle", "#FF6347"),  # tomato
+    "ltp2": ("square", "#4682B4"),  # steelblue
+    "mod_dmax": ("diamond", "#32CD32"),  # limegreen
+    "loglog": ("cross", "#FFA500"),  # orange
+    "obla_2": ("triangle-up", "#8A2BE2"),  # blueviolet
+    "obla_4": ("triangle-down", "#8A2BE2"),  # blueviolet
+    "lt1_estimate": (_STAR, "#FFD700"),  # gold
+    "lt2_estimate": (_STAR, "#FFD700"),  # gold
+}
+
+
+def simplify_curve(x: np.ndarray, ys: List[np.ndarray], tolerances: List[float]) -> np.ndarray:
+    """Indices of the points of a curve to keep so that no series deviates more than its tolerance.
+
+    Ramer-Douglas-Peucker on the vertical distance: a segment between two kept points is split at its worst
+    point until every dropped point of every series in `ys` lies within its tolerance of the straight line
+    between its neighbours. All segments of a level are split at once. `x` must be strictly increasing.
+    """
+    n = len(x)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    positions = np.arange(n)
+
+    while True:
+        kept = np.nonzero(keep)[0]
+        error = np.max(
+            [np.abs(y - np.interp(x, x[kept], y[kept])) / tol for y, tol in zip(ys, tolerances)],
+            axis=0,
+        )
+        worst = np.maximum.reduceat(error, kept[:-1])
+        segment = np.searchsorted(kept, positions, side="right") - 1
+        segment[-1] = len(kept) - 2
 
-def lactate_intensity_plot(x: LactateThresholdResults, show_fit_line: bool = True):
-    clean_data = x.clean_data[x.clean_data["intensity"] > 0]
-    interpolated_data = x.interpolated_data
+        split = (error > 1) & (error == worst[segment])
+        if not split.any():
+            return kept
+        _, first = np.unique(segment[split], return_index=True)
+        keep[positions[split][first]] = True
 
-    base = (
-        alt.Chart(clean_data)
-        .encode(
-            x=alt.X(
-                "intensity:Q",
-                title="Intensity",
-                scale=alt.Scale(
-                    domain=[
-                        clean_data["intensity"].min() - 1,
-                        clean_data["intensity"].max() + 1,
-                    ]
-                ),
-            ),
-            y=alt.Y("lactate:Q", title="Lactate"),
-        )
-        .properties(width=800, height=600)
-    )
 
-    points_orig = base.mark_point(color="grey", opacity=0.3).properties(title="Lactate Intensity Plot")
-    line_orig = base.mark_line(color="grey", opacity=0.3)
+def _decimals(span: float, pixels: int) -> int:
+    """Decimals that keep rounding below a tenth of a pixel on an axis of `pixels` covering `span`."""
+    step = span / pixels / 10 if span > 0 else 1.0
+    return max(0, math.ceil(-math.log10(step)))
 
-    if show_fit_line:
-        line_interpolated = alt.Chart(interpolated_data).mark_line().encode(x="intensity:Q", y="lactate:Q")
-
-    # Add thresholds with shapes and colors
-    threshold_data = []
-    shapes = {
-        "ltp1": ("circle", "#FF6347"),  # tomato
-        "ltp2": ("square", "#4682B4"),  # steelblue
-        "mod_dmax": ("diamond", "#32CD32"),  # limegreen
-        "loglog": ("cross", "#FFA500"),  # orange
-        "obla_2": ("triangle-up", "#8A2BE2"),  # blueviolet
-        "obla_4": ("triangle-down", "#8A2BE2"),  # blueviolet
-        "lt1_estimate": (
-            "M0,.5L.6,.8L.5,.1L1,-.3L.3,-.4L0,-1L-.3,-.4L-1,-.3L-.5,.1L-.6,.8L0,.5Z",
-            "#FFD700",
-        ),  # gold
-        "lt2_estimate": (
-            "M0,.5L.6,.8L.5,.1L1,-.3L.3,-.4L0,-1L-.3,-.4L-1,-.3L-.5,.1L-.6,.8L0,.5Z",
-            "#FFD700",
-        ),  # gold
-    }
 
-    for key, (shape, color) in shapes.items():
-        r = getattr(x, key)
-        if r is not None:
-            threshold_data.append(
-                {
-                    "intensity": r.intensity,
-                    "lactate": r.lactate,
-                    "threshold": key,
-                    "shape": shape,
-                    "color": color,
-                }
-            )
+_COLUMNS = ["intensity", "lactate", "heart_rate"]
 
-    threshold_df = pd.DataFrame(threshold_data)
 
-    thresholds = (
-        alt.Chart(threshold_df)
-        .mark_point(size=150, filled=True, strokeOpacity=1, fillOpacity=1)
-        .encode(
-            x="intensity:Q",
-            y="lactate:Q",
-            shape=alt.Shape(
-                "threshold:N",
-                scale=alt.Scale(
-                    domain=list(shapes.keys()),
-                    range=[shapes[key][0] for key in shapes.keys()],
-                ),
-            ),
-            color=alt.Color(
-                "threshold:N",
-                scale=alt.Scale(
-                    domain=list(shapes.keys()),
-                    range=[shapes[key][1] for key in shapes.keys()],
-                ),
-            ),
+class _PlotData(NamedTuple):
+    """The columns a plot draws, taken out of the frames once."""
+
+    measurements: Dict[str, np.ndarray]
+    curve: Dict[str, np.ndarray]
+    thresholds: Dict[str, np.ndarray]
+
+    @classmethod
+    def of(cls, x: LactateThresholdResults) -> "_PlotData":
+        measured = x.clean_data["intensity"].to_numpy() > 0
+        found = [(key, r) for key in SHAPES if (r := getattr(x, key)) is not None]
+        return cls(
+            {col: x.clean_data[col].to_numpy()[measured] for col in _COLUMNS},
+            {col: x.interpolated_data[col].to_numpy() for col in _COLUMNS},
+            {
+                "threshold": np.array([key for key, _ in found], dtype=object),
+                **{col: np.array([getattr(r, col) for _, r in found], dtype=float) for col in _COLUMNS},
+            },
         )
-    )
 
-    # Add interactive selection tied to interpolated data
-    nearest = alt.selection_point(nearest=True, on="mouseover", fields=["intensity"], empty=False)
+    def domains(self) -> Dict[str, tuple]:
+        intensity, heart_rate = self.measurements["intensity"], self.measurements["heart_rate"]
+        return {
+            "intensity": (intensity.min() - 1, intensity.max() + 1),
+            "lactate": (0, max(self.measurements["lactate"].max(), self.curve["lactate"].max())),
+            "heart_rate": (heart_rate.min() - 10, heart_rate.max() + 10),
+        }
+
+
+def _records(columns: Dict[str, np.ndarray], decimals: Dict[str, int] | None = None) -> List[dict]:
+    """Columns as Vega-Lite records of plain Python values, NaN as null."""
+    values = []
+    for name, column in columns.items():
+        column = np.asarray(column)
+        if decimals and name in decimals:
+            column = np.round(column.astype(float), decimals[name])
+        if column.dtype.kind == "f" and np.isnan(column).any():
+            column = np.where(np.isnan(column), None, column)
+        values.append(column.tolist())
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _full(data: _PlotData) -> Dict[str, List[dict]]:
+    return {name: _records(columns) for name, columns in zip(DATASETS, data)}
+
+
+def _compact(data: _PlotData, tolerance: float) -> Dict[str, List[dict]]:
+    span = {name: hi - lo for name, (lo, hi) in data.domains().items()}
+    decimals = {
+        "intensity": _decimals(span["intensity"], WIDTH),
+        "lactate": _decimals(span["lactate"], HEIGHT),
+        "heart_rate": _decimals(span["heart_rate"], HEIGHT),
+    }
 
-    selectors = (
-        alt.Chart(interpolated_data).mark_point().encode(x="intensity:Q", opacity=alt.value(0)).add_params(nearest)
+    grid_intensity = data.curve["intensity"].astype(float)
+    order = np.argsort(grid_intensity, kind="stable")
+    grid_intensity = grid_intensity[order]
+    lo, hi = grid_intensity[0], grid_intensity[-1]
+
+    n_pixels = max(2, math.ceil((hi - lo) / span["intensity"] * WIDTH) + 1)
+    intensity = np.linspace(lo, hi, min(n_pixels, len(grid_intensity)))
+    curve = {"intensity": intensity}
+    for col in ["lactate", "heart_rate"]:
+        curve[col] = np.interp(intensity, grid_intensity, data.curve[col].astype(float)[order])
+
+    keep = simplify_curve(
+        intensity,
+        [curve["lactate"], curve["heart_rate"]],
+        [tolerance * span["lactate"] / HEIGHT, tolerance * span["heart_rate"] / HEIGHT],
     )
 
-    points = (
-        alt.Chart(interpolated_data)
-        .mark_point(size=50, color="red")
-        .encode(
-            x="intensity:Q",
-            y="lactate:Q",
-            opacity=alt.condition(nearest, alt.value(1), alt.value(0)),
-        )
-    )
+    return {
+        "measurements": _records(data.measurements, decimals),
+        "curve": _records({col: values[keep] for col, values in curve.items()}, decimals),
+        "thresholds": _records(data.thresholds, decimals),
+    }
 
-    rules = (
-        alt.Chart(interpolated_data)
-        .mark_rule(color="gray")
-        .encode(x="intensity:Q")
-        .transform_filter(nearest)
-        .properties(
-            height=600  # Ensure the rule spans the full height of the graph
-        )
-    )
 
-    vertical_dotted_line = (
-        alt.Chart(pd.DataFrame({"lactate": [x.baseline.lactate]}))
-        .mark_rule(strokeDash=[5, 5], color="purple")
-        .encode(y=alt.Y("lactate:Q"))
-        .properties(width=800, height=600)
-    )
+def full_datasets(x: LactateThresholdResults) -> Dict[str, List[dict]]:
+    """The data of the plots as is, with the full interpolated curve. See `compact_datasets`."""
+    return _full(_PlotData.of(x))
 
-    layers = [
-        points_orig,
-        line_orig,
-        vertical_dotted_line,
-        thresholds,
-        selectors,
-        points,
-        rules,
-    ]
 
-    if show_fit_line:
-        layers.append(line_interpolated)
+def compact_datasets(x: LactateThresholdResults, tolerance: float = 0.5) -> Dict[str, List[dict]]:
+    """The data of the plots, reduced to what is visible at `WIDTH` x `HEIGHT` pixels.
 
-    chart = (
-        alt.layer(*layers)
-        .interactive()
-        .encode(
-            tooltip=[
-                alt.Tooltip("intensity:Q", format=".1f"),
-                alt.Tooltip("lactate:Q", format=".1f"),
-                alt.Tooltip("heart_rate:Q", format=".0f"),
-            ]
-        )
-    )
+    The curve is resampled at one point per horizontal pixel and simplified with `simplify_curve`, so the
+    drawn lactate and heart rate lines stay within `tolerance` pixels of the full curve. All values are
+    rounded to a tenth of a pixel.
 
-    return chart
+    Returns:
+        Records of the "measurements", "curve" and "thresholds" datasets.
+    """
+    return _compact(_PlotData.of(x), tolerance)
 
 
-def heart_rate_intensity_plot(x: LactateThresholdResults, show_fit_line: bool = True):
-    clean_data = x.clean_data[x.clean_data["intensity"] > 0]
-    interpolated_data = x.interpolated_data
+def _chart(
+    y: str,
+    measurements,
+    curve,
+    thresholds,
+    show_fit_line: bool,
+    domains: Dict[str, tuple],
+    baseline: float | None,
+    compact: bool = False,
+) -> alt.LayerChart:
+    """Layers of an intensity plot of `y` ("lactate" or "heart_rate"), data given as frames or named datasets."""
+    if y == "lactate":
+        y_encoding = alt.Y("lactate:Q", title="Lactate")
+        title, tooltip = "Lactate Intensity Plot", [("intensity", ".1f"), ("lactate", ".1f"), ("heart_rate", ".0f")]
+    else:
+        y_encoding = alt.Y("heart_rate:Q", title="Heart Rate (bpm)", scale=alt.Scale(domain=list(domains[y])))
+        title, tooltip = "Heart Rate Intensity Plot", [("intensity", ".1f"), ("heart_rate", ".0f")]
 
     base = (
-        alt.Chart(clean_data)
+        alt.Chart(measurements)
         .encode(
-            x=alt.X(
-                "intensity:Q",
-                title="Intensity",
-                scale=alt.Scale(
-                    domain=[
-                        clean_data["intensity"].min() - 1,
-                        clean_data["intensity"].max() + 1,
-                    ]
-                ),
-            ),
-            y=alt.Y(
-                "heart_rate:Q",
-                title="Heart Rate (bpm)",
-                scale=alt.Scale(
-                    domain=[
-                        clean_data["heart_rate"].min() - 10,
-                        clean_data["heart_rate"].max() + 10,
-                    ]
-                ),
-            ),
+            x=alt.X("intensity:Q", title="Intensity", scale=alt.Scale(domain=list(domains["intensity"]))),
+            y=y_encoding,
         )
-        .properties(width=800, height=600)
+        .properties(width=WIDTH, height=HEIGHT)
     )
 
-    points_orig = base.mark_point(color="grey", opacity=0.3).properties(title="Heart Rate Intensity Plot")
+    points_orig = base.mark_point(color="grey", opacity=0.3).properties(title=title)
     line_orig = base.mark_line(color="grey", opacity=0.3)
 
-    if show_fit_line:
-        line_interpolated = alt.Chart(interpolated_data).mark_line().encode(x="intensity:Q", y="heart_rate:Q")
-
-    # Add thresholds with shapes and colors
-    threshold_data = []
-    shapes = {
-        "ltp1": ("circle", "#FF6347"),  # tomato
-        "ltp2": ("square", "#4682B4"),  # steelblue
-        "mod_dmax": ("diamond", "#32CD32"),  # limegreen
-        "loglog": ("cross", "#FFA500"),  # orange
-        "obla_2": ("triangle-up", "#8A2BE2"),  # blueviolet
-        "obla_4": ("triangle-down", "#8A2BE2"),  # blueviolet
-        "lt1_estimate": (
-            "M0,.5L.6,.8L.5,.1L1,-.3L.3,-.4L0,-1L-.3,-.4L-1,-.3L-.5,.1L-.6,.8L0,.5Z",
-            "#FFD700",
-        ),  # gold
-        "lt2_estimate": (
-            "M0,.5L.6,.8L.5,.1L1,-.3L.3,-.4L0,-1L-.3,-.4L-1,-.3L-.5,.1L-.6,.8L0,.5Z",
-            "#FFD700",
-        ),  # gold
-    }
-
-    for key, (shape, color) in shapes.items():
-        r = getattr(x, key)
-        if r is not None:
-            threshold_data.append(
-                {
-                    "intensity": r.intensity,
-                    "heart_rate": r.heart_rate,
-                    "threshold": key,
-                    "shape": shape,
-                    "color": color,
-                }
-            )
-
-    threshold_df = pd.DataFrame(threshold_data)
-
     thresholds = (
-        alt.Chart(threshold_df)
+        alt.Chart(thresholds)
         .mark_point(size=150, filled=True, strokeOpacity=1, fillOpacity=1)
         .encode(
             x="intensity:Q",
-            y="heart_rate:Q",
+            y=f"{y}:Q",
             shape=alt.Shape(
                 "threshold:N",
-                scale=alt.Scale(
-                    domain=list(shapes.keys()),
-                    range=[shapes[key][0] for key in shapes.keys()],
-                ),
+                scale=alt.Scale(domain=list(SHAPES), range=[shape for shape, _ in SHAPES.values()]),
             ),
             color=alt.Color(
                 "threshold:N",
-                scale=alt.Scale(
-                    domain=list(shapes.keys()),
-                    range=[shapes[key][1] for key in shapes.keys()],
-                ),
+                scale=alt.Scale(domain=list(SHAPES), range=[color for _, color in SHAPES.values()]),
             ),
         )
     )
 
     # Add interactive selection tied to interpolated data
-    nearest = alt.selection_point(nearest=True, on="mouseover", fields=["intensity"], empty=False)
-
-    selectors = (
-        alt.Chart(interpolated_data).mark_point().encode(x="intensity:Q", opacity=alt.value(0)).add_params(nearest)
+    nearest = alt.selection_point(
+        nearest=True, on="mouseover", fields=["intensity"], empty=False, **({"name": f"{y}_nearest"} if compact else {})
     )
 
+    selectors = alt.Chart(curve).mark_point().encode(x="intensity:Q", opacity=alt.value(0)).add_params(nearest)
+
     points = (
-        alt.Chart(interpolated_data)
+        alt.Chart(curve)
         .mark_point(size=50, color="red")
         .encode(
             x="intensity:Q",
-            y="heart_rate:Q",
+            y=f"{y}:Q",
             opacity=alt.condition(nearest, alt.value(1), alt.value(0)),
         )
     )
 
     rules = (
-        alt.Chart(interpolated_data)
+        alt.Chart(curve)
         .mark_rule(color="gray")
         .encode(x="intensity:Q")
         .transform_filter(nearest)
         .properties(
-            height=600  # Ensure the rule spans the full height of the graph
+            height=HEIGHT  # Ensure the rule spans the full height of the graph
         )
     )
 
-    layers = [
-        points_orig,
-        line_orig,
-        thresholds,
-        selectors,
-        points,
-        rules,
-    ]
+    layers = [points_orig, line_orig]
+    if y == "lactate" and baseline is not None:
+        if compact:
+            baseline_rule = alt.Chart().mark_rule(strokeDash=[5, 5], color="purple").encode(y=alt.datum(baseline))
+        else:
+            baseline_rule = (
+                alt.Chart(pd.DataFrame({"lactate": [baseline]}))
+                .mark_rule(strokeDash=[5, 5], color="purple")
+                .encode(y=alt.Y("lactate:Q"))
+                .properties(width=WIDTH, height=HEIGHT)
+            )
+        layers.append(baseline_rule)
+    layers += [thresholds, selectors, points, rules]
 
     if show_fit_line:
-        layers.append(line_interpolated)
+        layers.append(alt.Chart(curve).mark_line().encode(x="intensity:Q", y=f"{y}:Q"))
 
-    chart = (
+    return (
         alt.layer(*layers)
-        .interactive()
+        .interactive(**({"name": f"{y}_zoom"} if compact else {}))
+        .encode(tooltip=[alt.Tooltip(f"{field}:Q", format=fmt) for field, fmt in tooltip])
+    )
+
+
+def _named_chart(plot: str, show_fit_line: bool, domains: Dict[str, tuple], baseline: float | None):
+    """Chart of `plot` drawing from the named datasets of `compact_datasets`."""
+    charts = [
+        _chart(y, *[alt.NamedData(name) for name in DATASETS], show_fit_line, domains, baseline, compact=True)
+        for y in PLOTS[plot]
+    ]
+    return charts[0] if len(charts) == 1 else alt.vconcat(*charts)
+
+
+def _baseline(x: LactateThresholdResults) -> float | None:
+    return x.baseline.lactate if x.baseline is not None else None
+
+
+def _plot(x: LactateThresholdResults, y: str, show_fit_line: bool, compact: bool, tolerance: float):
+    if compact:
+        data = _PlotData.of(x)
+        chart = _named_chart(y, show_fit_line, data.domains(), _baseline(x))
+        return chart.properties(datasets=_compact(data, tolerance))
+
+    clean_data = x.clean_data[x.clean_data["intensity"] > 0]
+    threshold_df = pd.DataFrame(
+        [
+            {"intensity": r.intensity, y: getattr(r, y), "threshold": key, "shape": shape, "color": color}
+            for key, (shape, color) in SHAPES.items()
+            if (r := getattr(x, key)) is not None
+        ]
+    )
+    return _chart(
+        y, clean_data, x.interpolated_data, threshold_df, show_fit_line, _PlotData.of(x).domains(), _baseline(x)
+    )
+
+
+def lactate_intensity_plot(
+    x: LactateThresholdResults, show_fit_line: bool = True, compact: bool = False, tolerance: float = 0.5
+):
+    """Lactate against intensity with the measurements, the fitted curve and all thresholds.
+
+    Args:
+        x (LactateThresholdResults): Results to plot.
+        show_fit_line (bool): Draw the fitted curve.
+        compact (bool): Keep the Vega-Lite spec small, e.g. for serving to browsers: every dataset is stored
+            once under a name (see `compact_datasets`), the curve is reduced to the points visible at the
+            chart's pixel resolution and values are rounded.
+        tolerance (float): Maximum deviation in pixels of the reduced curve, with `compact`.
+    """
+    return _plot(x, "lactate", show_fit_line, compact, tolerance)
+
+
+def heart_rate_intensity_plot(
+    x: LactateThresholdResults, show_fit_line: bool = True, compact: bool = False, tolerance: float = 0.5
+):
+    """Heart rate against intensity with the measurements, the fitted curve and all thresholds.
+
+    See `lactate_intensity_plot` for the arguments.
+    """
+    return _plot(x, "heart_rate", show_fit_line, compact, tolerance)
+
+
+def dashboard_plot(x: LactateThresholdResults, show_fit_line: bool = True, tolerance: float = 0.5):
+    """The lactate and heart rate plots stacked in one compact spec, both drawing from the same datasets."""
+    data = _PlotData.of(x)
+    chart = _named_chart("dashboard", show_fit_line, data.domains(), _baseline(x))
+    return chart.properties(datasets=_compact(data, tolerance))
+
+
+@lru_cache(maxsize=None)
+def _template(plot: str, show_fit_line: bool, has_baseline: bool) -> Tuple[str, ...]:
+    """The JSON of a plot split around placeholders for everything that differs between tests.
+
+    Even positions hold fixed JSON fragments, odd positions the names of the values that go in between: the
+    datasets, the `<column>_lo` and `<column>_hi` ends of the axis domains and the baseline.
+    """
+    domains = {name: (f"@@{name}_lo@@", f"@@{name}_hi@@") for name in ["intensity", "lactate", "heart_rate"]}
+    spec = _named_chart(plot, show_fit_line, domains, "@@baseline@@" if has_baseline else None).to_dict()
+    spec.setdefault("datasets", {}).update({name: f"@@{name}@@" for name in DATASETS})
+    return tuple(re.split(r'"@@(\w+)@@"', json.dumps(spec)))
+
+
+def plot_json(
+    x: LactateThresholdResults,
+    plot: str = "lactate",
+    show_fit_line: bool = True,
+    compact: bool = True,
+    tolerance: float = 0.5,
+) -> str:
+    """Vega-Lite JSON of a plot, filled into a spec that is only built once per kind of plot.
+
+    Equivalent to `lactate_intensity_plot(x, compact=True).to_json()` and friends, but no Altair objects are
+    created per call: the datasets and axis domains of the test are serialized into a cached template. Meant
+    for serving many plots, e.g. to `st.vega_lite_chart` or a report.
+
+    Args:
+        x (LactateThresholdResults): Results to plot.
+        plot (str): "lactate", "heart_rate" or "dashboard" (both, sharing the datasets).
+        show_fit_line (bool): Draw the fitted curve.
+        compact (bool): Reduce and round the data, see `compact_datasets`. Otherwise the full curve is sent.
+        tolerance (float): Maximum deviation in pixels of the reduced curve, with `compact`.
+    """
+    if plot not in PLOTS:
+        raise ValueError(f"Unknown plot '{plot}', expected one of {list(PLOTS)}")
+
+    data = _PlotData.of(x)
+    values = _compact(data, tolerance) if compact else _full(data)
+    for name, (lo, hi) in data.domains().items():
+        values[f"{name}_lo"], values[f"{name}_hi"] = float(lo), float(hi)
+    values["baseline"] = _baseline(x)
+
+    out = list(_template(plot, show_fit_line, x.baseline is not None))
+    out[1::2] = [json.dumps(values[name]) for name in out[1::2]]
+    return "".join(out)
+
+
+def plot_spec(x: LactateThresholdResults, plot: str = "lactate", **kwargs) -> dict:
+    """`plot_json` as a dict."""
+    return json.loads(plot_json(x, plot, **kwargs))
+
+
+def _overlay_curves(results, y: str, thresholds: Sequence[str]) -> Tuple[list, list, list]:
+    """Labels, (intensity, y) curves and (test, threshold, intensity, y) markers of many tests."""
+    if isinstance(results, pd.DataFrame):
+        from lactate_thresholds.batch import CURVE_COLUMNS
+        from lactate_thresholds.fit import horner
+
+        missing = [c for c in CURVE_COLUMNS if c not in results.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} not found, create the table with determine_many(..., curves=True)")
+
+        # The fitted cubics, evaluated finely enough for a straight line between points to be invisible
+        table = results[results["curve_lo"].notna()]
+        lo, hi, center, scale = (table[f"curve_{c}"].to_numpy(dtype=float) for c in ["lo", "hi", "center", "scale"])
+        intensity = lo[:, None] + (hi - lo)[:, None] * np.linspace(0, 1, _CUBIC_POINTS)
+        values = horner(
+            table[[f"curve_{y}_{i}" for i in range(4)]].to_numpy(dtype=float)[:, None, :],
+            (intensity - center[:, None]) / scale[:, None],
+        )
+
+        markers = [
+            (i, name, x, value)
+            for name in thresholds
+            for i, (x, value) in enumerate(table[[f"{name}_intensity", f"{name}_{y}"]].to_numpy(dtype=float))
+            if not np.isnan(x)
+        ]
+        return list(table["test_id"]), list(zip(intensity, values)), markers
+
+    labels, curves, markers = [], [], []
+    for i, item in enumerate(results.items() if isinstance(results, Mapping) else results):
+        label, res = item if isinstance(item, tuple) else (i, item)
+        if isinstance(res, Exception):
+            continue
+
+        grid = res.interpolated_data
+        curves.append((grid["intensity"].to_numpy(dtype=float), grid[y].to_numpy(dtype=float)))
+        markers += [
+            (len(labels), name, r.intensity, getattr(r, y))
+            for name in thresholds
+            if (r := getattr(res, name)) is not None
+        ]
+        labels.append(label)
+    return labels, curves, markers
+
+
+def _label(label: Any) -> str:
+    return "/".join(map(str, label)) if isinstance(label, tuple) else str(label)
+
+
+def overlay_plot(
+    results: Mapping[Any, LactateThresholdResults] | Iterable | pd.DataFrame,
+    y: str = "lactate",
+    thresholds: Sequence[str] = ("lt1_estimate", "lt2_estimate"),
+    tolerance: float = 0.5,
+    max_points: int = 20_000,
+) -> alt.LayerChart:
+    """The curves of many tests on one chart, e.g. an athlete over a season or a whole squad.
+
+    All curves are drawn from one long-format dataset at a level of detail that adapts to their number: every
+    curve is reduced to the points needed at the chart's pixel resolution (see `simplify_curve`), and the
+    tolerance is doubled until all curves together fit in `max_points`. The threshold markers of all tests
+    share one small dataset. Hovering a curve highlights its test.
+
+    Args:
+        results: Results by label as a mapping, (label, result) pairs (e.g. from `parallel.determine_iter`,
+            failed tests are skipped) or plain results, labelled by position. A `determine_many(...,
+            curves=True)` table draws the fitted curves straight from its coefficients.
+        y (str): "lactate" or "heart_rate".
+        thresholds (Sequence[str]): Thresholds to mark, names of `SHAPES`.
+        tolerance (float): Maximum deviation in pixels of the drawn curves, before adapting to `max_points`.
+        max_points (int): Budget of curve points over all tests.
+    """
+    if y not in ("lactate", "heart_rate"):
+        raise ValueError(f"Unknown y '{y}', expected 'lactate' or 'heart_rate'")
+    unknown = set(thresholds) - set(SHAPES)
+    if unknown:
+        raise ValueError(f"Unknown thresholds {sorted(unknown)}, expected some of {list(SHAPES)}")
+
+    labels, curves, markers = _overlay_curves(results, y, thresholds)
+    if not curves:
+        raise ValueError("No results to plot")
+
+    x_lo = min(np.nanmin(intensity) for intensity, _ in curves)
+    x_hi = max(np.nanmax(intensity) for intensity, _ in curves)
+    y_lo = min(np.nanmin(values) for _, values in curves)
+    y_hi = max(np.nanmax(values) for _, values in curves)
+    y_domain = (0, y_hi) if y == "lactate" else (y_lo - 10, y_hi + 10)
+    x_span, y_span = (x_hi - x_lo) or 1.0, (y_domain[1] - y_domain[0]) or 1.0
+
+    # Resample every curve at one point per horizontal pixel of the shared intensity axis
+    pixels = []
+    for intensity, values in curves:
+        order = np.argsort(intensity, kind="stable")
+        intensity, values = intensity[order], values[order]
+        n = min(len(intensity), max(2, math.ceil((intensity[-1] - intensity[0]) / x_span * WIDTH) + 1))
+        grid = np.linspace(intensity[0], intensity[-1], n)
+        pixels.append((grid, np.interp(grid, intensity, values)))
+
+    while True:
+        keep = [simplify_curve(grid, [values], [tolerance * y_span / HEIGHT]) for grid, values in pixels]
+        if sum(map(len, keep)) <= max_points or tolerance >= HEIGHT:
+            break
+        tolerance *= 2
+
+    decimals = {"intensity": _decimals(x_span, WIDTH), y: _decimals(y_span, HEIGHT)}
+    datasets = {
+        "tests": _records(
+            {"test": np.arange(len(labels)), "label": np.array([_label(lb) for lb in labels], dtype=object)}
+        ),
+        "curves": _records(
+            {
+                "test": np.repeat(np.arange(len(pixels)), [len(k) for k in keep]),
+                "intensity": np.concatenate([grid[k] for (grid, _), k in zip(pixels, keep)]),
+                y: np.concatenate([values[k] for (_, values), k in zip(pixels, keep)]),
+            },
+            decimals,
+        ),
+        "markers": _records(
+            {
+                "test": np.array([m[0] for m in markers], dtype=int),
+                "threshold": np.array([m[1] for m in markers], dtype=object),
+                "intensity": np.array([m[2] for m in markers], dtype=float),
+                y: np.array([m[3] for m in markers], dtype=float),
+            },
+            decimals,
+        ),
+    }
+
+    hover = alt.selection_point(name="overlay_hover", fields=["test"], on="mouseover", nearest=True, empty=False)
+    # The more curves, the more the ones not hovered fade into the background
+    opacity = alt.condition(hover, alt.value(1), alt.value(min(0.8, max(0.1, 8 / len(labels)))))
+    label_names = [record["label"] for record in datasets["tests"]]
+    color = alt.Color(
+        "label:O",
+        title="Test",
+        sort=label_names,
+        scale=alt.Scale(scheme="viridis"),
+        legend=alt.Legend() if len(labels) <= 30 else None,
+    )
+    x_encoding = alt.X("intensity:Q", title="Intensity", scale=alt.Scale(domain=[x_lo, x_hi]))
+    y_encoding = alt.Y(
+        f"{y}:Q",
+        title="Lactate" if y == "lactate" else "Heart Rate (bpm)",
+        scale=alt.Scale(domain=list(y_domain)),
+    )
+    y_format = ".1f" if y == "lactate" else ".0f"
+    lookup = alt.LookupData(data=alt.NamedData("tests"), key="test", fields=["label"])
+
+    lines = (
+        alt.Chart(alt.NamedData("curves"))
+        .transform_lookup(lookup="test", from_=lookup)
+        .mark_line(strokeWidth=1.5)
+        .encode(x=x_encoding, y=y_encoding, detail="test:N", color=color, opacity=opacity, tooltip=["label:N"])
+        .add_params(hover)
+    )
+    points = (
+        alt.Chart(alt.NamedData("markers"))
+        .transform_lookup(lookup="test", from_=lookup)
+        .mark_point(size=80, filled=True)
         .encode(
+            x="intensity:Q",
+            y=f"{y}:Q",
+            shape=alt.Shape(
+                "threshold:N",
+                scale=alt.Scale(domain=list(SHAPES), range=[shape for shape, _ in SHAPES.values()]),
+            ),
+            color=color,
+            opacity=opacity,
             tooltip=[
+                "label:N",
+                "threshold:N",
                 alt.Tooltip("intensity:Q", format=".1f"),
-                alt.Tooltip("heart_rate:Q", format=".0f"),
-            ]
+                alt.Tooltip(f"{y}:Q", format=y_format),
+            ],
         )
     )
 
+    chart = (
+        alt.layer(lines, points)
+        .properties(width=WIDTH, height=HEIGHT, title="Lactate Curves" if y == "lactate" else "Heart Rate Curves")
+        .interactive(name="overlay_zoom")
+    )
+    # Set directly, `properties` would validate every record against the schema up front
+    chart.datasets = datasets
     return chart
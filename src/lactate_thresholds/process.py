@@ -1,14 +1,19 @@
+import inspect
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
 import pandas as pd
 
-from lactate_thresholds.methods import (
-    determine_baseline,
-    determine_loglog,
-    determine_ltp,
-    determine_mod_dmax,
-    determine_obla,
-    interpolate,
-)
+from lactate_thresholds import registry, tracing
+from lactate_thresholds.cache import ResultCache, cache_key
+from lactate_thresholds.methods import interpolate, interpolate_arrays
+from lactate_thresholds.records import THRESHOLDS, ThresholdRecord
 from lactate_thresholds.types import LactateThresholdResults
+from lactate_thresholds.utils import InterpolatedIndex, interpolated_index
+
+# Linear interpolation error (mmol/L) of the working grid used by `determine(lazy=True)`
+LAZY_TOLERANCE = 1e-3
 
 
 def clean_data(
@@ -43,6 +48,37 @@ def clean_data(
     return df_clean
 
 
+# Parameters of `determine` that change its result, i.e. all but the data and its column names
+_RESULT_PARAMS = [
+    "include_baseline",
+    "lazy",
+    "n_points",
+    "tolerance",
+    "unit",
+    "solver",
+    "methods",
+    "method_params",
+]
+
+
+def _cache_params(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    params = {k: arguments[k] for k in _RESULT_PARAMS}
+    if params["methods"] is not None:
+        params["methods"] = sorted(params["methods"])
+    return params
+
+
+def result_key(df: pd.DataFrame, **kwargs) -> str:
+    """Cache key `determine(df, **kwargs)` would use, e.g. to spot duplicate tests up front."""
+    bound = inspect.signature(determine).bind(df, **kwargs)
+    bound.apply_defaults()
+    args = bound.arguments
+    dfc = clean_data(
+        df, args["step_col"], args["length_col"], args["intensity_col"], args["lactate_col"], args["heart_rate_col"]
+    )
+    return cache_key(dfc, _cache_params(args))
+
+
 def determine(
     df: pd.DataFrame,
     step_col: str = "step",
@@ -51,17 +87,186 @@ def determine(
     lactate_col: str = "lactate",
     heart_rate_col: str = "heart_rate",
     include_baseline=False,
+    lazy: bool = False,
+    n_points: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    unit: Optional[str] = None,
+    solver: str = "exact",
+    methods: Optional[Iterable[str]] = None,
+    method_params: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResultCache] = None,
+    tracer: Optional[tracing.Tracer] = None,
+) -> LactateThresholdResults:
+    """Clean the data, interpolate and run all threshold methods.
+
+    `n_points`, `tolerance` and `unit` set the resolution of the interpolation grid, see
+    `methods.interpolation_step`. With `lazy=True` the threshold methods run on a grid that is just fine
+    enough for `tolerance` (default `LAZY_TOLERANCE` mmol/L), and the full resolution `interpolated_data`
+    is only produced when it is first accessed, e.g. when plotting.
+
+    `solver` selects the segmented regression used by LTP and LogLog, see `methods.fit_piecewise_linear`.
+
+    `methods` restricts the run to the given registered methods (see `registry.register_method`) and whatever
+    they depend on, by default all built-in methods run. `method_params` are passed on as keyword options to
+    the methods that declare them.
+
+    With a `cache` (see `cache.ResultCache`), results are looked up by a hash of the cleaned measurements and
+    all of the above parameters before anything is computed.
+
+    With a `tracer` (see `tracing.Tracer`, or a tracer registered with `tracing.set_tracer`), the wall time, CPU
+    time and optionally peak memory of every stage are recorded and attached to the result as `timings`.
+    """
+    tracer = tracer if tracer is not None else tracing.get_tracer()
+    timings = [] if tracer is not None else None
+    stage = partial(tracing.stage, tracer, timings=timings)
+
+    with stage("clean_data"):
+        dfc = clean_data(df, step_col, length_col, intensity_col, lactate_col, heart_rate_col)
+
+    if cache is not None:
+        key = cache_key(dfc, _cache_params(locals()))
+        with stage("cache_lookup"):
+            res = cache.get(key)
+        if res is not None:
+            res.timings = timings
+            return res
+
+    res = _determine(
+        dfc,
+        include_baseline=include_baseline,
+        lazy=lazy,
+        n_points=n_points,
+        tolerance=tolerance,
+        unit=unit,
+        solver=solver,
+        methods=methods,
+        method_params=method_params,
+        tracer=tracer,
+        timings=timings,
+    )
+    if cache is not None:
+        cache.put(key, res)
+
+    res.timings = timings
+    return res
+
+
+def _determine(
+    dfc: pd.DataFrame,
+    include_baseline: bool,
+    lazy: bool,
+    n_points: Optional[int],
+    tolerance: Optional[float],
+    unit: Optional[str],
+    solver: str,
+    methods: Optional[Iterable[str]],
+    method_params: Optional[Dict[str, Any]],
+    tracer: Optional[tracing.Tracer],
+    timings: Optional[List[tracing.StageTiming]],
 ) -> LactateThresholdResults:
-    dfc = clean_data(df, step_col, length_col, intensity_col, lactate_col, heart_rate_col)
-    dfi = interpolate(dfc, include_baseline=include_baseline)
-
-    res = LactateThresholdResults(clean_data=dfc, interpolated_data=dfi)
-    res.ltp1, res.ltp2 = determine_ltp(dfc, dfi)
-    res.mod_dmax = determine_mod_dmax(dfc, dfi)
-    res.loglog = determine_loglog(dfc, dfi)
-    res.obla_2 = determine_obla(dfi, 2)
-    res.obla_4 = determine_obla(dfi, 4)
-    res.baseline = determine_baseline(dfc, dfi, 0)
-    res.calc_lt1_lt2_estimates()
+    """`determine` on data that went through `clean_data`, stage timings are appended to `timings`."""
+    stage = partial(tracing.stage, tracer, timings=timings)
+    resolution = dict(n_points=n_points, tolerance=tolerance, unit=unit)
+
+    if lazy:
+        with stage("interpolate"):
+            dfi = interpolate(
+                dfc,
+                include_baseline=include_baseline,
+                n_points=n_points,
+                tolerance=LAZY_TOLERANCE if tolerance is None and n_points is None else tolerance,
+            )
+        res = LactateThresholdResults(
+            clean_data=dfc,
+            interpolator=partial(interpolate, dfc, include_baseline=include_baseline, **resolution),
+            working_data=dfi,
+        )
+    else:
+        with stage("interpolate"):
+            dfi = interpolate(dfc, include_baseline=include_baseline, **resolution)
+        res = LactateThresholdResults(clean_data=dfc, interpolated_data=dfi)
+
+    if tracer is not None:
+        # Built by the first method otherwise, this separates the sorted lookups from the method itself
+        with stage("index"):
+            interpolated_index(dfi)
+
+    inputs = {"clean_data": dfc, "interpolated_data": dfi, "fit": dfi.attrs.get("fit")}
+    params = {"solver": solver, **(method_params or {})}
+    outputs = registry.run(methods or registry.DEFAULT_METHODS, inputs, params, stage if tracer is not None else None)
+    for name, value in outputs.items():
+        if name in LactateThresholdResults.model_fields:
+            setattr(res, name, value)
+        else:
+            res.extra[name] = value
 
     return res
+
+
+def validate_array(name: str, values, n: Optional[int] = None) -> np.ndarray:
+    """Check a measurement column and return it as contiguous float64, without copying if it already is."""
+    values = np.asarray(values)
+    if values.dtype.kind not in "biuf":
+        raise ValueError(f"Column '{name}' is not numeric / contains nonnumeric values")
+    if values.ndim != 1 or (n is not None and len(values) != n):
+        raise ValueError(f"Column '{name}' must be one-dimensional with one value per step")
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not np.isfinite(values).all():
+        raise ValueError(f"Column '{name}' contains missing or infinite values")
+    return values
+
+
+def determine_arrays(
+    intensity: np.ndarray,
+    lactate: np.ndarray,
+    heart_rate: np.ndarray,
+    include_baseline: bool = False,
+    n_points: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    unit: Optional[str] = None,
+    solver: str = "exact",
+    methods: Optional[Iterable[str]] = None,
+    method_params: Optional[Dict[str, Any]] = None,
+    test_id: Any = None,
+) -> ThresholdRecord:
+    """Determine the thresholds of a test held as plain arrays, one value per step.
+
+    Runs the same computations as `determine` without any DataFrames or pydantic models in between, for
+    high-volume scoring. Measurement arrays that are already contiguous float64 are used without copying.
+
+    Args:
+        intensity, lactate, heart_rate: Measurements per step, in the order of the protocol.
+        include_baseline, n_points, tolerance, unit, solver, methods, method_params: See `determine`. Every
+            method that runs needs an array implementation, see `registry.register_method`.
+        test_id: Stored on the returned record.
+
+    Returns:
+        ThresholdRecord: Thresholds as (intensity, lactate, heart_rate) tuples, convert with `to_model` if needed.
+    """
+    intensity = validate_array("intensity", intensity)
+    lactate = validate_array("lactate", lactate, len(intensity))
+    heart_rate = validate_array("heart_rate", heart_rate, len(intensity))
+
+    grid_intensity, grid_lactate, grid_heart_rate, fit = interpolate_arrays(
+        intensity,
+        lactate,
+        heart_rate,
+        include_baseline=include_baseline,
+        n_points=n_points,
+        tolerance=tolerance,
+        unit=unit,
+    )
+    index = InterpolatedIndex.from_arrays(grid_intensity, grid_lactate, grid_heart_rate, fit)
+
+    if include_baseline and (intensity == 0).any():
+        # As `interpolate` does in place for `determine`, ModDMax sees the adjusted baseline intensity
+        intensity = intensity.copy()
+        intensity[intensity == 0] = intensity[1] - (intensity[2] - intensity[1])
+
+    inputs = {"clean_data": (intensity, lactate, heart_rate), "interpolated_data": index, "fit": fit}
+    params = {"solver": solver, **(method_params or {})}
+    outputs = registry.run(methods or registry.DEFAULT_METHODS, inputs, params, arrays=True)
+
+    thresholds = {name: value for name, value in outputs.items() if name in THRESHOLDS}
+    extra = {name: value for name, value in outputs.items() if name not in THRESHOLDS}
+    return ThresholdRecord(test_id=test_id, extra=extra or None, **thresholds)
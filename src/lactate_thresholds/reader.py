@@ -0,0 +1,143 @@
+import os
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds.process import clean_data
+
+
+def _chunks(path: str, columns: List[str], chunksize: int, file_format: str) -> Iterator[pd.DataFrame]:
+    if file_format == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet requires pyarrow, install it with `pip install pyarrow`") from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unknown file format '{file_format}', expected 'csv' or 'parquet'")
+
+
+def _file_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}.get(ext, "csv")
+
+
+def read_tests(
+    path: str,
+    test_id_col: str | Sequence[str] = "test_id",
+    step_col: str = "step",
+    length_col: str = "length",
+    intensity_col: str = "intensity",
+    lactate_col: str = "lactate",
+    heart_rate_col: str = "heart_rate",
+    chunksize: int = 100_000,
+    file_format: Optional[str] = None,
+) -> Iterator[Tuple[Any, pd.DataFrame]]:
+    """Stream the tests of a long-format CSV or Parquet file as (test_id, clean_data) pairs.
+
+    The file is read in chunks of `chunksize` rows and `clean_data` is applied once per chunk, so memory stays
+    bounded however large the file is. The rows of a test must be contiguous, as in a file sorted by test; a
+    test spanning two chunks is carried over and yielded once complete. Only the ids of the current chunk are
+    remembered, so a test whose rows come apart within one chunk is detected, but one split across chunks
+    is yielded once per run of rows.
+
+    The pairs can be passed straight to `parallel.determine_iter` or `batch.determine_many`, see also
+    `determine_file`.
+
+    Args:
+        path (str): CSV or Parquet file.
+        test_id_col (str | Sequence[str]): Column(s) identifying a test, e.g. ["athlete_id", "test_date"].
+            With several columns the test ids are tuples.
+        chunksize (int): Number of rows read at a time.
+        file_format (str, optional): "csv" or "parquet", guessed from the extension by default.
+
+    Raises:
+        ValueError: When the rows of a test are not contiguous within a chunk.
+    """
+    id_cols = [test_id_col] if isinstance(test_id_col, str) else list(test_id_col)
+    value_cols = [step_col, length_col, intensity_col, lactate_col, heart_rate_col]
+    cols = dict(
+        step_col=step_col,
+        length_col=length_col,
+        intensity_col=intensity_col,
+        lactate_col=lactate_col,
+        heart_rate_col=heart_rate_col,
+    )
+
+    carry_id, carry = None, None
+    for chunk in _chunks(path, id_cols + value_cols, chunksize, file_format or _file_format(path)):
+        if chunk.empty:
+            continue
+        # Tests completed in this chunk, bounded by its rows however many tests the file holds
+        closed = set()
+        ids = chunk[id_cols].reset_index(drop=True)
+        dfc = clean_data(chunk, **cols).reset_index(drop=True)
+
+        # Start of every run of rows sharing a test id
+        changed = np.zeros(len(ids), dtype=bool)
+        changed[0] = True
+        for col in id_cols:
+            values = ids[col].to_numpy()
+            changed[1:] |= values[1:] != values[:-1]
+        starts = np.flatnonzero(changed)
+        ends = np.append(starts[1:], len(ids))
+
+        for start, end in zip(starts, ends):
+            row = ids.iloc[start]
+            test_id = row.iloc[0] if len(id_cols) == 1 else tuple(row)
+            part = dfc.iloc[start:end]
+
+            if carry is not None and test_id == carry_id:
+                carry = pd.concat([carry, part], ignore_index=True)
+                continue
+            if carry is not None:
+                closed.add(carry_id)
+                yield carry_id, carry
+
+            if test_id in closed:
+                raise ValueError(f"Rows of test {test_id!r} are not contiguous, sort the file by {id_cols}")
+            carry_id, carry = test_id, part.reset_index(drop=True)
+
+    if carry is not None:
+        yield carry_id, carry
+
+
+def determine_file(
+    path: str,
+    test_id_col: str | Sequence[str] = "test_id",
+    step_col: str = "step",
+    length_col: str = "length",
+    intensity_col: str = "intensity",
+    lactate_col: str = "lactate",
+    heart_rate_col: str = "heart_rate",
+    chunksize: int = 100_000,
+    file_format: Optional[str] = None,
+    **kwargs,
+) -> Iterator[Tuple[Any, Any]]:
+    """Determine the thresholds of every test in a long-format file, see `read_tests` and `parallel.determine_iter`.
+
+    Args:
+        **kwargs: Passed on to `parallel.determine_iter`, e.g. `backend`, `return_exceptions` or `include_baseline`.
+
+    Yields:
+        (test_id, LactateThresholdResults) pairs in completion order.
+    """
+    from lactate_thresholds.parallel import determine_iter
+
+    tests = read_tests(
+        path,
+        test_id_col=test_id_col,
+        step_col=step_col,
+        length_col=length_col,
+        intensity_col=intensity_col,
+        lactate_col=lactate_col,
+        heart_rate_col=heart_rate_col,
+        chunksize=chunksize,
+        file_format=file_format,
+    )
+    yield from determine_iter(tests, **kwargs)
@@ -0,0 +1,183 @@
+from functools import partial
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds.types import (
+    OBLA,
+    BaseLinePlus,
+    BaseMeasurement,
+    LactateThresholdResults,
+    LactateTurningPoint,
+    LogLog,
+    ModDMax,
+    ThresholdEstimate,
+)
+
+MODELS: Dict[str, Type[BaseMeasurement]] = {
+    "ltp1": LactateTurningPoint,
+    "ltp2": LactateTurningPoint,
+    "mod_dmax": ModDMax,
+    "loglog": LogLog,
+    "baseline": BaseLinePlus,
+    "obla_2": OBLA,
+    "obla_4": OBLA,
+    "lt1_estimate": ThresholdEstimate,
+    "lt2_estimate": ThresholdEstimate,
+}
+THRESHOLDS = list(MODELS)
+FIELDS = ["intensity", "lactate", "heart_rate"]
+
+# One row per test, NaN where a threshold could not be determined
+RESULT_DTYPE = np.dtype(
+    [("test_id", object)]
+    + [(f"{t}_{f}", np.float64) for t in THRESHOLDS for f in FIELDS]
+    + [("baseline_plus", np.float64)]
+)
+
+Measurement = Tuple[float, float, float]
+
+
+class ThresholdRecord:
+    """Slim, unvalidated counterpart of `LactateThresholdResults` for bulk runs.
+
+    Every threshold is a plain (intensity, lactate, heart_rate) tuple, or None. The source frames are only
+    held when they were asked for; `to_model` converts back to the pydantic model.
+    """
+
+    __slots__ = ("test_id", *THRESHOLDS, "baseline_plus", "extra", "clean_data", "interpolated_data")
+
+    def __init__(
+        self,
+        test_id: Any = None,
+        baseline_plus: float = 0.0,
+        extra: Optional[Dict[str, Any]] = None,
+        clean_data: Optional[pd.DataFrame] = None,
+        interpolated_data: Optional[pd.DataFrame] = None,
+        **thresholds: Optional[Measurement],
+    ):
+        unknown = set(thresholds) - set(THRESHOLDS)
+        if unknown:
+            raise ValueError(f"Unknown thresholds: {sorted(unknown)}")
+
+        self.test_id = test_id
+        self.baseline_plus = baseline_plus
+        self.extra = extra
+        self.clean_data = clean_data
+        self.interpolated_data = interpolated_data
+        for name in THRESHOLDS:
+            setattr(self, name, thresholds.get(name))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in THRESHOLDS)
+        return f"ThresholdRecord(test_id={self.test_id!r}, {values})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ThresholdRecord):
+            return NotImplemented
+        fields = ("test_id", *THRESHOLDS, "baseline_plus", "extra")
+        return all(getattr(self, f) == getattr(other, f) for f in fields)
+
+    @classmethod
+    def from_model(
+        cls, res: LactateThresholdResults, test_id: Any = None, keep_data: bool = False
+    ) -> "ThresholdRecord":
+        thresholds = {}
+        for name in THRESHOLDS:
+            m = getattr(res, name)
+            thresholds[name] = None if m is None else (m.intensity, m.lactate, m.heart_rate)
+
+        data = {}
+        if keep_data:
+            # A lazy result stays lazy, `to_model` interpolates again when needed
+            data = dict(
+                clean_data=res.clean_data, interpolated_data=res.interpolated_data if res.is_interpolated else None
+            )
+        plus = res.baseline.plus if res.baseline is not None else 0.0
+        return cls(test_id=test_id, baseline_plus=plus, extra=dict(res.extra) or None, **data, **thresholds)
+
+    def to_model(
+        self, clean_data: Optional[pd.DataFrame] = None, include_baseline: bool = False
+    ) -> LactateThresholdResults:
+        """Convert to a validated `LactateThresholdResults`.
+
+        Args:
+            clean_data (pd.DataFrame, optional): Cleaned measurements, required if the record does not hold them.
+            include_baseline (bool): See `determine`, used to interpolate `clean_data` lazily if the record does
+                not hold the interpolated data.
+        """
+        from lactate_thresholds.methods import interpolate
+
+        clean_data = self.clean_data if clean_data is None else clean_data
+        if clean_data is None:
+            raise ValueError("The record holds no clean_data, pass it to convert to LactateThresholdResults")
+
+        thresholds = {}
+        for name, model in MODELS.items():
+            value = getattr(self, name)
+            if value is None:
+                continue
+            intensity, lactate, heart_rate = value
+            extra = {"plus": self.baseline_plus} if name == "baseline" else {}
+            thresholds[name] = model(intensity=intensity, lactate=lactate, heart_rate=heart_rate, **extra)
+        if self.extra:
+            thresholds["extra"] = dict(self.extra)
+
+        if self.interpolated_data is not None:
+            return LactateThresholdResults(
+                clean_data=clean_data, interpolated_data=self.interpolated_data, **thresholds
+            )
+        return LactateThresholdResults(
+            clean_data=clean_data,
+            interpolator=partial(interpolate, clean_data, include_baseline=include_baseline),
+            **thresholds,
+        )
+
+    def row(self) -> np.ndarray:
+        """The record as a single row of `RESULT_DTYPE`."""
+        values = [self.test_id]
+        for name in THRESHOLDS:
+            value = getattr(self, name)
+            values.extend((np.nan,) * 3 if value is None else value)
+        values.append(self.baseline_plus if self.baseline is not None else np.nan)
+        return np.array(tuple(values), dtype=RESULT_DTYPE)
+
+
+def to_array(records: Iterable[ThresholdRecord]) -> np.ndarray:
+    """Pack records into a structured array of `RESULT_DTYPE`, one row per test."""
+    return np.array([r.row()[()] for r in records], dtype=RESULT_DTYPE)
+
+
+def from_array(array: np.ndarray) -> List[ThresholdRecord]:
+    """Unpack a structured array of `RESULT_DTYPE`, a threshold is None when all of its fields are NaN."""
+    out = []
+    for row in array:
+        thresholds = {}
+        for name in THRESHOLDS:
+            value = tuple(float(row[f"{name}_{f}"]) for f in FIELDS)
+            thresholds[name] = None if np.isnan(value).all() else value
+        plus = float(row["baseline_plus"])
+        out.append(ThresholdRecord(test_id=row["test_id"], baseline_plus=0.0 if np.isnan(plus) else plus, **thresholds))
+    return out
+
+
+def columns_to_array(columns: Mapping[str, Any]) -> np.ndarray:
+    """Pack the columns of the `batch.determine_many` table (a frame or a dict of arrays) into a structured
+    array, without creating any models. An empty mapping gives an empty array."""
+    n = len(columns["test_id"]) if "test_id" in columns else 0
+    array = np.empty(n, dtype=RESULT_DTYPE)
+    if not n:
+        return array
+    # Element-wise, tuple test ids would otherwise be unpacked into a second axis
+    array["test_id"] = np.fromiter(columns["test_id"], dtype=object, count=n)
+    for t in THRESHOLDS:
+        for f in FIELDS:
+            array[f"{t}_{f}"] = np.asarray(columns[f"{t}_{f}"], dtype=np.float64)
+    array["baseline_plus"] = np.where(np.isnan(array["baseline_intensity"]), np.nan, 0.0)
+    return array
+
+
+def frame_to_array(df: pd.DataFrame) -> np.ndarray:
+    """Convert the table of `batch.determine_many` to a structured array, without creating any models."""
+    return columns_to_array(df)
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from lactate_thresholds.methods import (
+    baseline_arrays,
+    determine_baseline,
+    determine_loglog,
+    determine_ltp,
+    determine_mod_dmax,
+    determine_obla,
+    determine_threshold_estimate,
+    loglog_arrays,
+    ltp_arrays,
+    mod_dmax_arrays,
+    obla_arrays,
+    threshold_estimate_arrays,
+)
+
+# Products that are available to every method without running one
+INPUTS = ("clean_data", "interpolated_data", "fit")
+
+
+@dataclass(frozen=True)
+class ThresholdMethod:
+    """A registered threshold method.
+
+    `func` is called with the products named in `requires` as positional arguments, in that order, followed
+    by the keyword options named in `params` that were passed to `determine`. Its return value provides the
+    names in `outputs`, a single value for one output or an iterable of values for several.
+
+    `array_func`, when given, is the same method for `process.determine_arrays`. It is called the same way on
+    the array products: "clean_data" as an (intensity, lactate, heart_rate) tuple of arrays, "interpolated_data"
+    as a `utils.InterpolatedIndex` and the outputs of other methods as (intensity, lactate, heart_rate) tuples,
+    or None where they could not be determined.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    requires: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    params: Tuple[str, ...] = ()
+    array_func: Optional[Callable[..., Any]] = None
+
+    def __call__(self, products: Dict[str, Any], params: Dict[str, Any], arrays: bool = False) -> Dict[str, Any]:
+        func = self.array_func if arrays else self.func
+        args = [products[r] for r in self.requires]
+        kwargs = {k: params[k] for k in self.params if k in params}
+        value = func(*args, **kwargs)
+
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: value}
+        return dict(zip(self.outputs, value, strict=True))
+
+
+_REGISTRY: Dict[str, ThresholdMethod] = {}
+
+
+def register_method(
+    name: str,
+    requires: Iterable[str],
+    outputs: Optional[Iterable[str]] = None,
+    params: Iterable[str] = (),
+    replace: bool = False,
+    arrays: Optional[Callable[..., Any]] = None,
+):
+    """Decorator registering a threshold method so `determine(methods=[...])` can run it.
+
+    Args:
+        name (str): Name to select the method by.
+        requires (Iterable[str]): Inputs of the method: "clean_data", "interpolated_data", "fit" (the fitted
+            `CubicFit`) or outputs of other registered methods.
+        outputs (Iterable[str], optional): Names of the values the method produces, defaults to `name`.
+            Outputs matching a field of `LactateThresholdResults` are stored there, others end up in `extra`.
+        params (Iterable[str]): Keyword options the method accepts from `determine`.
+        replace (bool): Allow overriding an existing registration.
+        arrays (Callable, optional): The method on plain arrays, which `process.determine_arrays` runs, see
+            `ThresholdMethod`. Without it the method is only available to `determine`.
+    """
+
+    def decorator(func):
+        if name in _REGISTRY and not replace:
+            raise ValueError(f"Method '{name}' is already registered")
+        method = ThresholdMethod(name, func, tuple(requires), tuple(outputs or (name,)), tuple(params), arrays)
+
+        producers = _producers()
+        for output in method.outputs:
+            if output in INPUTS or (output in producers and producers[output] != name):
+                raise ValueError(f"Output '{output}' of method '{name}' is already provided")
+
+        _REGISTRY[name] = method
+        return func
+
+    return decorator
+
+
+def unregister_method(name: str):
+    _REGISTRY.pop(name, None)
+
+
+def registered_methods() -> List[str]:
+    return list(_REGISTRY)
+
+
+def get_method(name: str) -> ThresholdMethod:
+    if name not in _REGISTRY:
+        raise ValueError(f"Unknown method '{name}', registered: {registered_methods()}")
+    return _REGISTRY[name]
+
+
+def _producers() -> Dict[str, str]:
+    return {output: method.name for method in _REGISTRY.values() for output in method.outputs}
+
+
+def resolve(methods: Iterable[str]) -> List[ThresholdMethod]:
+    """Order the requested methods and everything they depend on, each method appearing once.
+
+    Args:
+        methods (Iterable[str]): Method names, or output names such as "ltp1" which select their method.
+
+    Raises:
+        ValueError: For unknown methods or inputs and for cyclic dependencies.
+    """
+    producers = _producers()
+    plan: List[ThresholdMethod] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str):
+        if name not in _REGISTRY:
+            if name not in producers:
+                raise ValueError(f"Unknown method '{name}', registered: {registered_methods()}")
+            name = producers[name]
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cyclic dependency involving method '{name}'")
+
+        state[name] = "visiting"
+        method = _REGISTRY[name]
+        for requirement in method.requires:
+            if requirement in INPUTS:
+                continue
+            if requirement not in producers:
+                raise ValueError(f"Method '{name}' requires '{requirement}', which no method provides")
+            visit(producers[requirement])
+        state[name] = "done"
+        plan.append(method)
+
+    for name in methods:
+        visit(name)
+
+    return plan
+
+
+def run(
+    methods: Iterable[str],
+    inputs: Dict[str, Any],
+    params: Optional[Dict[str, Any]] = None,
+    stage: Optional[Callable[[str], ContextManager]] = None,
+    arrays: bool = False,
+) -> Dict[str, Any]:
+    """Run the requested methods and their dependencies, returning all outputs by name.
+
+    `stage`, when given, wraps every method call in `stage(method.name)`, see `tracing.Tracer.stage`. With
+    `arrays=True` the `array_func` of every method runs on array inputs, see `ThresholdMethod`.
+
+    Raises:
+        ValueError: With `arrays=True`, when a method that would run has no array implementation.
+    """
+    plan = resolve(methods)
+    if arrays:
+        missing = [method.name for method in plan if method.array_func is None]
+        if missing:
+            raise ValueError(f"Methods {missing} have no array implementation, register one with `arrays=`")
+
+    products = dict(inputs)
+    outputs = {}
+    for method in plan:
+        if stage is None:
+            values = method(products, params or {}, arrays)
+        else:
+            with stage(method.name):
+                values = method(products, params or {}, arrays)
+        products.update(values)
+        outputs.update(values)
+    return outputs
+
+
+def _estimate_arrays(index, *components):
+    if any(c is None for c in components):
+        return None
+    return threshold_estimate_arrays(index, np.mean([c[0] for c in components]))
+
+
+# Built-in methods, in the order `determine` has always run them
+register_method(
+    "ltp",
+    ["clean_data", "interpolated_data"],
+    outputs=["ltp1", "ltp2"],
+    params=["solver"],
+    arrays=lambda measured, index, solver="exact": ltp_arrays(index, solver=solver),
+)(determine_ltp)
+register_method(
+    "mod_dmax",
+    ["clean_data", "interpolated_data"],
+    arrays=lambda measured, index: mod_dmax_arrays(*measured, index),
+)(determine_mod_dmax)
+register_method(
+    "loglog",
+    ["clean_data", "interpolated_data"],
+    params=["solver"],
+    arrays=lambda measured, index, solver="exact": loglog_arrays(index, solver=solver),
+)(determine_loglog)
+register_method("obla_2", ["interpolated_data"], arrays=lambda index: obla_arrays(index, 2))(
+    lambda dfi: determine_obla(dfi, 2)
+)
+register_method("obla_4", ["interpolated_data"], arrays=lambda index: obla_arrays(index, 4))(
+    lambda dfi: determine_obla(dfi, 4)
+)
+register_method(
+    "baseline",
+    ["clean_data", "interpolated_data"],
+    arrays=lambda measured, index: baseline_arrays(index, 0),
+)(lambda dfc, dfi: determine_baseline(dfc, dfi, 0))
+register_method("lt1_estimate", ["interpolated_data", "ltp1", "loglog"], arrays=_estimate_arrays)(
+    lambda dfi, ltp1, loglog: determine_threshold_estimate(dfi, None, ltp1, loglog)
+)
+register_method("lt2_estimate", ["interpolated_data", "ltp2", "mod_dmax"], arrays=_estimate_arrays)(
+    lambda dfi, ltp2, mod_dmax: determine_threshold_estimate(dfi, None, ltp2, mod_dmax)
+)
+
+DEFAULT_METHODS = registered_methods()
@@ -0,0 +1,222 @@
+from itertools import product
+from math import comb
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+# Candidate combinations scored in one stack of normal equations, bounds the memory of `fit_breakpoints_many`
+MAX_CANDIDATES = 1 << 15
+
+
+class _SufficientStats:
+    """Prefix sums of 1, x, x^2, y, xy and y^2 over sorted x, for a batch of fits.
+
+    Any continuous piecewise linear fit can be written as least squares on the basis
+    [1, x, (x - b_1)+, ..., (x - b_k)+]. Every entry of its normal equations is a sum over the points to the
+    right of some breakpoint, so with these prefix sums the normal equations of any set of breakpoints are
+    assembled in O(1), independent of the number of points.
+
+    Row t of `x` and `y` holds one fit, its points are the first `n[t]` entries and the rest is padding.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, n: np.ndarray):
+        valid = np.arange(x.shape[1])[None, :] < n[:, None]
+
+        def prefix(v):
+            return np.concatenate([np.zeros((len(v), 1)), np.cumsum(np.where(valid, v, 0.0), axis=1)], axis=1)
+
+        self.x = x
+        self.n = n
+        # Prefix sums of 1, x, x^2, y and xy, flattened over the fits so one gather serves a whole stack
+        self.width = x.shape[1] + 1
+        self.sums = np.stack([prefix(np.ones_like(x)), prefix(x), prefix(x**2), prefix(y), prefix(x * y)])
+        self.sums = self.sums.reshape(5, -1)
+        self.syy = np.array([np.sum(row[:k] ** 2) for row, k in zip(y, n)])
+
+    def suffix(self, b: np.ndarray, owner: np.ndarray, bounds: np.ndarray, totals: np.ndarray) -> np.ndarray:
+        """Sums over x > b for an array of breakpoints, each of the fit in `owner`, as rows of a (5, M) array."""
+        idx = np.empty(len(b), dtype=int)
+        for t, k in enumerate(self.n):
+            rows = slice(bounds[t], bounds[t + 1])
+            idx[rows] = np.searchsorted(self.x[t, :k], b[rows], side="right")
+        return totals - self.sums[:, owner * self.width + idx]
+
+    def sse(self, breakpoints: np.ndarray, owner: np.ndarray) -> np.ndarray:
+        """Residual sum of squares of the best continuous fit for each row of (M, k) breakpoints.
+
+        Row m belongs to fit `owner[m]`, `owner` is sorted so that the rows of every fit are contiguous.
+        """
+        m, k = breakpoints.shape
+        p = k + 2
+        gram = np.empty((m, p, p))
+        rhs = np.empty((m, p))
+        bounds = np.searchsorted(owner, np.arange(len(self.n) + 1))
+        totals = self.sums[:, owner * self.width + self.n[owner]]
+
+        gram[:, 0, 0] = totals[0]
+        gram[:, 0, 1] = gram[:, 1, 0] = totals[1]
+        gram[:, 1, 1] = totals[2]
+        rhs[:, 0] = totals[3]
+        rhs[:, 1] = totals[4]
+
+        for j in range(k):
+            b = breakpoints[:, j]
+            s0, s1, s2, sy, sxy = self.suffix(b, owner, bounds, totals)
+            gram[:, 0, j + 2] = gram[:, j + 2, 0] = s1 - b * s0
+            gram[:, 1, j + 2] = gram[:, j + 2, 1] = s2 - b * s1
+            rhs[:, j + 2] = sxy - b * sy
+
+            for i in range(j + 1):
+                a = breakpoints[:, i]
+                # (x - a)+ (x - b)+ is non zero right of the larger breakpoint only
+                r0, r1, r2, _, _ = self.suffix(np.maximum(a, b), owner, bounds, totals)
+                gram[:, i + 2, j + 2] = gram[:, j + 2, i + 2] = r2 - (a + b) * r1 + a * b * r0
+
+        # The explained sum of squares rhs' pinv(gram) rhs from the eigendecomposition of the symmetric normal
+        # equations, dropping the directions `np.linalg.pinv` drops: breakpoints at an end or on top of each
+        # other leave them singular
+        w, v = np.linalg.eigh(gram)
+        z = np.einsum("mqp,mq->mp", v, rhs)
+        keep = np.abs(w) > 1e-15 * np.abs(w).max(axis=1, keepdims=True)
+        return self.syy[owner] - np.sum(np.where(keep, z**2 / np.where(keep, w, 1.0), 0.0), axis=1)
+
+
+def _ordered(combos: np.ndarray, strict: bool = False) -> np.ndarray:
+    """Mask of the combinations (along the last axis) whose breakpoints are in order."""
+    if combos.shape[-1] < 2:
+        return np.ones(combos.shape[:-1], dtype=bool)
+    steps = np.diff(combos, axis=-1)
+    return np.all(steps > 0 if strict else steps >= 0, axis=-1)
+
+
+def _search(
+    stats: _SufficientStats, tol: np.ndarray, n_breakpoints: int, grid_size: int, refine: int, n_starts: int
+) -> np.ndarray:
+    """The search of `fit_breakpoints` for every fit in `stats` at once, returning (T, k) unit breakpoints."""
+    n_fits = len(stats.n)
+    rows = np.arange(n_fits)
+
+    def score(combos: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        # Only the masked (T, M) combinations are scored, as one stack for all fits, the others get inf
+        sse = np.full(mask.shape, np.inf)
+        sse[mask] = stats.sse(combos[mask], np.broadcast_to(rows[:, None], mask.shape)[mask])
+        return sse
+
+    candidates = np.linspace(0, 1, grid_size)
+    combos = np.array(list(product(candidates, repeat=n_breakpoints)))
+    combos = combos[_ordered(combos, strict=True)]
+    combos = np.broadcast_to(combos, (n_fits,) + combos.shape)
+    sse = score(combos, np.ones(combos.shape[:2], dtype=bool))
+    starts = combos[rows[:, None], np.argsort(sse, axis=1, kind="stable")[:, :n_starts]]
+
+    # Index of the offset of every breakpoint in each refined combination, in the order of `product`
+    steps = np.arange(-refine, refine + 1)
+    picks = np.array(list(product(range(len(steps)), repeat=n_breakpoints)))
+
+    best, best_sse = starts[:, 0], np.full(n_fits, np.inf)
+    for start in range(starts.shape[1]):
+        b, b_sse = starts[:, start], np.full(n_fits, np.inf)
+        spacing = 1 / (grid_size - 1)
+        while np.any(spacing > tol):
+            active = spacing > tol
+            offsets = np.clip(b[..., None] + steps * (spacing / refine), 0, 1)
+            combos = offsets[:, np.arange(n_breakpoints), picks]
+            sse = score(combos, _ordered(combos) & active[:, None])
+            found = np.argmin(sse, axis=1)
+            b = np.where(active[:, None], combos[rows, found], b)
+            b_sse = np.where(active, sse[rows, found], b_sse)
+            spacing /= refine
+        better = b_sse < best_sse
+        best = np.where(better[:, None], b, best)
+        best_sse = np.where(better, b_sse, best_sse)
+
+    return best
+
+
+def fit_breakpoints(
+    x: np.ndarray,
+    y: np.ndarray,
+    n_breakpoints: int,
+    grid_size: int = 64,
+    refine: int = 4,
+    n_starts: int = 3,
+    tol: Optional[float] = None,
+) -> np.ndarray:
+    """Deterministic breakpoint search for a continuous piecewise linear fit.
+
+    All ordered combinations of `grid_size` candidate positions are scored first, after which the search
+    zooms in around the `n_starts` best combinations, dividing the candidate spacing by `refine` on every level
+    until it drops below `tol`. Each candidate costs O(1) thanks to prefix sum sufficient statistics, so the
+    cost of the fit does not depend on the number of points and there is no randomness involved.
+
+    Args:
+        x (np.ndarray): Independent variable.
+        y (np.ndarray): Dependent variable.
+        n_breakpoints (int): Number of interior breakpoints, the fit has `n_breakpoints + 1` segments.
+        grid_size (int): Number of candidate positions per breakpoint on the coarse level.
+        refine (int): Shrink factor of the candidate spacing per refinement level.
+        n_starts (int): Number of coarse combinations that are refined.
+        tol (float, optional): Precision of the breakpoints, defaults to 1e-6 times the range of x.
+
+    Returns:
+        np.ndarray: Breakpoints including the outer ends, [min(x), b_1, ..., b_k, max(x)], like
+        `pwlf.PiecewiseLinFit.fit`.
+    """
+    return fit_breakpoints_many([x], [y], n_breakpoints, grid_size, refine, n_starts, tol)[0]
+
+
+def fit_breakpoints_many(
+    xs: Sequence[np.ndarray],
+    ys: Sequence[np.ndarray],
+    n_breakpoints: int,
+    grid_size: int = 64,
+    refine: int = 4,
+    n_starts: int = 3,
+    tol: Optional[float] = None,
+) -> np.ndarray:
+    """`fit_breakpoints` for many fits, e.g. the curves of all tests in a `batch.determine_many` chunk.
+
+    The candidates of every search level are scored for all fits together as one stack of normal equations,
+    in groups of fits holding up to `MAX_CANDIDATES` candidates, instead of one small stack per fit and level.
+    The result of every fit is the same as from `fit_breakpoints`.
+
+    Returns:
+        np.ndarray: One row of breakpoints per fit, see `fit_breakpoints`.
+    """
+    out = np.empty((len(xs), n_breakpoints + 2))
+    fits = []
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+
+        lo, hi = x[0], x[-1]
+        span = hi - lo
+        if n_breakpoints == 0 or span == 0:
+            out[i] = [lo] + [lo] * n_breakpoints + [hi]
+            continue
+
+        # Work on a unit scale for well conditioned normal equations
+        u = (x - lo) / span
+        v = (y - y.mean()) / (y.std() or 1.0)
+        fits.append((i, u, v, lo, hi, 1e-6 if tol is None else tol / span))
+
+    group_size = max(MAX_CANDIDATES // max(comb(grid_size, n_breakpoints), 1), 1)
+    for g in range(0, len(fits), group_size):
+        group = fits[g : g + group_size]
+        n = np.array([len(f[1]) for f in group])
+        width = n.max()
+        u = np.zeros((len(group), width))
+        v = np.zeros((len(group), width))
+        for row, f in enumerate(group):
+            u[row, : n[row]], v[row, : n[row]] = f[1], f[2]
+
+        best = _search(
+            _SufficientStats(u, v, n), np.array([f[5] for f in group]), n_breakpoints, grid_size, refine, n_starts
+        )
+        for (i, _, _, lo, hi, _), b in zip(group, best):
+            out[i] = np.concatenate([[lo], lo + b * (hi - lo), [hi]])
+
+    return out
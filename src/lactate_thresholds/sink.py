@@ -0,0 +1,172 @@
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from lactate_thresholds.records import RESULT_DTYPE, ThresholdRecord
+from lactate_thresholds.types import LactateThresholdResults
+
+TABLES = ("thresholds", "zones", "interpolated")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError as e:
+        raise ImportError("Writing results requires pyarrow, install it with `pip install pyarrow`") from e
+    return pa, ds
+
+
+class ResultSink:
+    """Append-only Parquet dataset of threshold results, partitioned by athlete and date.
+
+    Results are buffered and written as new files with unique names, so several runs (or processes) can append
+    to the same dataset without touching each other's files. The dataset holds up to three tables, each in its
+    own hive-partitioned subdirectory of `path`:
+
+    * thresholds: one row per test, the columns of `records.RESULT_DTYPE`
+    * zones: one row per zone and scheme with numeric boundaries, see `zones.zone_table`
+    * interpolated: the interpolated curves, only with `include_interpolated`
+
+    Args:
+        path (str): Root directory of the dataset.
+        partition_by (Sequence[str]): Names of the parts of the test id, which are also the partition columns.
+            A test id is a tuple with one value per column, or a scalar for a single column.
+        zones (Iterable[str]): Zone schemes to store, names of `zones.SCHEMES`: the built-in schemes or any added
+            with `zones.register_scheme`.
+        include_interpolated (bool): Also store `interpolated_data`.
+        buffer_rows (int): Rows buffered per table before they are written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        partition_by: Sequence[str] = ("athlete_id", "test_date"),
+        zones: Iterable[str] = ("seiler_3",),
+        include_interpolated: bool = False,
+        buffer_rows: int = 100_000,
+    ):
+        from lactate_thresholds.zones import SCHEMES as schemes
+
+        _pyarrow()
+        unknown = set(zones) - set(schemes)
+        if unknown:
+            raise ValueError(f"Unknown zone schemes {sorted(unknown)}, expected some of {list(schemes)}")
+
+        self.path = path
+        self.partition_by = list(partition_by)
+        self.zones = list(zones)
+        self.include_interpolated = include_interpolated
+        self.buffer_rows = buffer_rows
+        self.rows_written = dict.fromkeys(TABLES, 0)
+        self._buffers: Dict[str, List[pd.DataFrame]] = {name: [] for name in TABLES}
+        self._buffered = dict.fromkeys(TABLES, 0)
+
+    def _keys(self, test_id: Any) -> Dict[str, Any]:
+        values = test_id if isinstance(test_id, tuple) else (test_id,)
+        if len(values) != len(self.partition_by):
+            raise ValueError(f"Test id {test_id!r} does not match the partition columns {self.partition_by}")
+        return dict(zip(self.partition_by, values))
+
+    def _append(self, table: str, df: pd.DataFrame):
+        self._buffers[table].append(df)
+        self._buffered[table] += len(df)
+        if self._buffered[table] >= self.buffer_rows:
+            self._flush_table(table)
+
+    def write(self, test_id: Any, res: LactateThresholdResults | ThresholdRecord):
+        """Buffer the results of one test, `ThresholdRecord`s only provide the thresholds table."""
+        keys = self._keys(test_id)
+
+        record = res if isinstance(res, ThresholdRecord) else ThresholdRecord.from_model(res)
+        row = record.row()[()]
+        thresholds = {name: row[name] for name in RESULT_DTYPE.names if name != "test_id"}
+        self._append("thresholds", pd.DataFrame([{**keys, **thresholds}]))
+
+        if isinstance(res, ThresholdRecord):
+            return
+
+        if res.lt1_estimate is not None and res.lt2_estimate is not None:
+            from lactate_thresholds.zones import zone_table
+
+            for scheme in self.zones:
+                self._append("zones", zone_table(res, scheme).drop(columns="focus").assign(scheme=scheme, **keys))
+
+        if self.include_interpolated:
+            # A fresh frame, the fit in `attrs` has no place in the Parquet metadata
+            curves = {col: res.interpolated_data[col].to_numpy() for col in ["intensity", "lactate", "heart_rate"]}
+            self._append("interpolated", pd.DataFrame(curves).assign(**keys))
+
+    def write_all(self, results: Iterable[Tuple[Any, LactateThresholdResults | ThresholdRecord]]):
+        """Write (test_id, result) pairs, e.g. straight from `parallel.determine_iter`. Failed tests are skipped."""
+        for test_id, res in results:
+            if isinstance(res, Exception):
+                continue
+            self.write(test_id, res)
+
+    def _flush_table(self, table: str):
+        if not self._buffers[table]:
+            return
+        pa, ds = _pyarrow()
+
+        df = pd.concat(self._buffers[table], ignore_index=True)
+        ds.write_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            base_dir=os.path.join(self.path, table),
+            format="parquet",
+            partitioning=self.partition_by,
+            partitioning_flavor="hive",
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        self.rows_written[table] += len(df)
+        self._buffers[table] = []
+        self._buffered[table] = 0
+
+    def flush(self):
+        for table in TABLES:
+            self._flush_table(table)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_results(
+    path: str,
+    table: str = "thresholds",
+    columns: Optional[List[str]] = None,
+    filter: Optional[Any] = None,
+    as_arrow: bool = False,
+):
+    """Read a table written by `ResultSink`.
+
+    Args:
+        path (str): Root directory of the dataset.
+        table (str): "thresholds", "zones" or "interpolated".
+        columns (List[str], optional): Columns to read, partition columns included.
+        filter (pyarrow.compute.Expression, optional): Row filter, e.g. `pc.field("athlete_id") == "a1"`.
+            Filters on partition columns skip whole directories.
+        as_arrow (bool): Return the `pyarrow.Table`, from which float columns convert to NumPy without copying
+            (`table["ltp1_intensity"].to_numpy()`).
+
+    Returns:
+        pd.DataFrame, or a pyarrow.Table with `as_arrow`.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}', expected one of {list(TABLES)}")
+    _, ds = _pyarrow()
+
+    dataset = ds.dataset(os.path.join(path, table), format="parquet", partitioning="hive")
+    result = dataset.to_table(columns=columns, filter=filter)
+    if as_arrow:
+        return result
+    # Column-wise blocks, so that pandas does not have to copy everything into one consolidated array
+    return result.to_pandas(split_blocks=True, self_destruct=True)
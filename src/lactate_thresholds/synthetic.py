@@ -0,0 +1,236 @@
+from typing import Dict, Iterator, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Protocol and physiology ranges per sport, drawn uniformly per test
+SPORTS: Dict[str, dict] = {
+    "cycling": {
+        "unit": "watt",
+        "lt1": (120.0, 260.0),
+        "lt2_gap": (40.0, 110.0),
+        "lengths": (3, 4, 5, 8),
+        "resolution": 5.0,
+    },
+    "running": {
+        "unit": "km/h",
+        "lt1": (8.5, 14.0),
+        "lt2_gap": (1.5, 4.0),
+        "lengths": (3, 4, 5),
+        "resolution": 0.1,
+    },
+}
+
+TRUTH_COLUMNS = [
+    "test_id",
+    "sport",
+    "unit",
+    "n_steps",
+    "lt1_intensity",
+    "lt1_lactate",
+    "lt1_heart_rate",
+    "lt2_intensity",
+    "lt2_lactate",
+    "lt2_heart_rate",
+]
+
+
+class SyntheticCorpus:
+    """Seeded corpus of realistic step tests with known thresholds, for load tests and accuracy checks.
+
+    Lactate follows a three-segment model: nearly flat up to LT1, a linear rise up to LT2 and an exponential
+    rise beyond, so LT1 and LT2 are the true breakpoints of the curve. Heart rate rises linearly with intensity
+    plus a cardiac drift per step. Every test draws its own sport, step count, protocol, baseline lactate,
+    rise, drift and noise; a baseline row (step 0, intensity 0) is added with probability `p_baseline` and
+    steps other than the first and last two are dropped with probability `p_missing`.
+
+    Tests are generated in blocks of `block_size` with NumPy, each block from its own child of the seed, so a
+    corpus is cheap to produce in the millions and the same seed always gives the same tests, whichever way
+    they are read:
+
+    * `tests()` streams (test_id, DataFrame) pairs, ready for `determine_many` or `parallel.determine_iter`
+    * `frame()` returns one long-format frame with a `test_id` column, see `batch.split_tests`
+    * `truth()` returns the ground truth, one row per test (without generating the measurements)
+
+    Args:
+        n_tests (int): Number of tests.
+        seed (int, optional): Seed of the corpus, fresh entropy by default (kept in `seed`).
+        sports (Sequence[str]): Sports to draw from, keys of `SPORTS`.
+        min_steps (int): Fewest steps of a test, before dropping missing steps.
+        max_steps (int): Most steps of a test.
+        noise (float): Scale of the lactate and heart rate measurement noise, 0 for exact curves.
+        p_baseline (float): Probability of a baseline row.
+        p_missing (float): Probability of a step to be missing.
+        block_size (int): Tests generated at a time.
+    """
+
+    def __init__(
+        self,
+        n_tests: int,
+        seed: int | None = None,
+        sports: Sequence[str] = ("cycling", "running"),
+        min_steps: int = 5,
+        max_steps: int = 12,
+        noise: float = 1.0,
+        p_baseline: float = 0.5,
+        p_missing: float = 0.05,
+        block_size: int = 10_000,
+    ):
+        unknown = set(sports) - set(SPORTS)
+        if unknown:
+            raise ValueError(f"Unknown sports {sorted(unknown)}, expected some of {list(SPORTS)}")
+        if not 3 <= min_steps <= max_steps:
+            raise ValueError("Expected 3 <= min_steps <= max_steps")
+
+        sequence = np.random.SeedSequence(seed)
+        self.seed = sequence.entropy
+        self.n_tests = n_tests
+        self.sports = list(sports)
+        self.min_steps, self.max_steps = min_steps, max_steps
+        self.noise = noise
+        self.p_baseline, self.p_missing = p_baseline, p_missing
+        self.block_size = block_size
+        # Separate streams for the parameters and the noise of every block, so `truth` can skip the latter
+        self._blocks = [child.spawn(2) for child in sequence.spawn(-(-n_tests // block_size))]
+
+    def __len__(self) -> int:
+        return self.n_tests
+
+    def __iter__(self) -> Iterator[Tuple[int, pd.DataFrame]]:
+        return self.tests()
+
+    def _params(self, block: int) -> Dict[str, np.ndarray]:
+        """Protocol and curve parameters of the tests in a block."""
+        rng = np.random.default_rng(self._blocks[block][0])
+        first = block * self.block_size
+        n = min(self.block_size, self.n_tests - first)
+
+        sport = rng.integers(len(self.sports), size=n)
+        specs = [SPORTS[s] for s in self.sports]
+
+        def per_sport(key, i=None):
+            return np.array([spec[key] if i is None else spec[key][i] for spec in specs])[sport]
+
+        lt1 = rng.uniform(per_sport("lt1", 0), per_sport("lt1", 1))
+        lt2 = lt1 + rng.uniform(per_sport("lt2_gap", 0), per_sport("lt2_gap", 1))
+
+        # The protocol starts well below LT1 and ends beyond LT2
+        n_steps = rng.integers(self.min_steps, self.max_steps + 1, size=n)
+        resolution = per_sport("resolution")
+        start = np.round(lt1 * rng.uniform(0.45, 0.7, n) / resolution) * resolution
+        end = lt2 + (lt2 - lt1) * rng.uniform(0.4, 0.9, n)
+        increment = np.maximum(np.floor((end - start) / (n_steps - 1) / resolution), 1) * resolution
+
+        # Step length out of the sport's usual lengths
+        counts = np.array([len(spec["lengths"]) for spec in specs])
+        lengths = np.zeros((len(specs), counts.max()), dtype=int)
+        for i, spec in enumerate(specs):
+            lengths[i, : counts[i]] = spec["lengths"]
+        length = lengths[sport, rng.integers(0, counts[sport])]
+        baseline = rng.uniform(0.7, 1.5, n)
+        slope = rng.uniform(1.2, 3.0, n) / (lt2 - lt1)  # lactate gained between LT1 and LT2
+
+        return {
+            "test_id": np.arange(first, first + n),
+            "sport": sport,
+            "lt1": lt1,
+            "lt2": lt2,
+            "n_steps": n_steps,
+            "start": start,
+            "increment": increment,
+            "length": length,
+            "baseline": baseline,
+            "flat_slope": rng.uniform(0.0, 0.12, n) * slope,
+            "slope": slope,
+            "rise": rng.uniform(0.4, 1.0, n),
+            "rate": rng.uniform(1.5, 2.5, n),
+            "hr_lt2": rng.uniform(155.0, 185.0, n),
+            "hr_span": rng.uniform(35.0, 70.0, n),
+            "hr_drift": rng.uniform(0.0, 1.5, n),
+            "hr_rest": rng.uniform(55.0, 85.0, n),
+            "has_baseline": rng.random(n) < self.p_baseline,
+        }
+
+    @staticmethod
+    def _lactate(p: Dict[str, np.ndarray], x: np.ndarray) -> np.ndarray:
+        lt1, lt2 = p["lt1"], p["lt2"]
+        below = p["baseline"] + p["flat_slope"] * (x - lt1)
+        between = p["baseline"] + p["slope"] * (x - lt1)
+        # Exponential rise beyond LT2, in units of the LT1-LT2 distance
+        above = between + p["rise"] * np.expm1(p["rate"] * np.maximum(x - lt2, 0) / (lt2 - lt1))
+        return np.where(x <= lt1, below, np.where(x <= lt2, between, above))
+
+    @staticmethod
+    def _heart_rate(p: Dict[str, np.ndarray], x: np.ndarray) -> np.ndarray:
+        # Linear in intensity, plus the drift accumulated per step since LT2
+        per_intensity = p["hr_span"] / (p["lt2"] - p["start"])
+        return p["hr_lt2"] + (per_intensity + p["hr_drift"] / p["increment"]) * (x - p["lt2"])
+
+    def _truth(self, p: Dict[str, np.ndarray]) -> pd.DataFrame:
+        truth = {"test_id": p["test_id"], "sport": np.array(self.sports)[p["sport"]]}
+        truth["unit"] = np.array([SPORTS[s]["unit"] for s in self.sports])[p["sport"]]
+        truth["n_steps"] = p["n_steps"]
+        for name in ["lt1", "lt2"]:
+            truth[f"{name}_intensity"] = p[name]
+            truth[f"{name}_lactate"] = self._lactate(p, p[name])
+            truth[f"{name}_heart_rate"] = self._heart_rate(p, p[name])
+        return pd.DataFrame(truth, columns=TRUTH_COLUMNS)
+
+    def _block(self, block: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        p = self._params(block)
+        rng = np.random.default_rng(self._blocks[block][1])
+
+        # One row per step and baseline, with the parameters of its test repeated alongside
+        rows = p["n_steps"] + p["has_baseline"]
+        test = np.repeat(np.arange(len(rows)), rows)
+        position = np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)
+        step = position + 1 - p["has_baseline"][test]
+        r = {key: value[test] for key, value in p.items()}
+
+        is_baseline = step == 0
+        x = r["start"] + r["increment"] * (step - 1)
+        lactate = self._lactate(r, x) + self.noise * rng.normal(0, 1, len(x)) * (0.08 + 0.03 * self._lactate(r, x))
+        heart_rate = self._heart_rate(r, x) + self.noise * rng.normal(0, 2.0, len(x))
+
+        lactate = np.where(is_baseline, r["baseline"] + self.noise * rng.normal(0, 0.1, len(x)), lactate)
+        heart_rate = np.where(is_baseline, r["hr_rest"], heart_rate)
+
+        missing = (rng.random(len(x)) < self.p_missing) & (step > 1) & (step < r["n_steps"] - 1)
+        keep = ~missing
+        frame = pd.DataFrame(
+            {
+                "test_id": r["test_id"][keep],
+                "step": step[keep],
+                "length": np.where(is_baseline, 0, r["length"])[keep],
+                "intensity": np.where(is_baseline, 0.0, np.round(x, 2))[keep],
+                "lactate": np.maximum(np.round(lactate, 1), 0.3)[keep],
+                "heart_rate": np.round(np.minimum(heart_rate, 215.0))[keep],
+            }
+        )
+        return frame, self._truth(p)
+
+    def blocks(self) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """(long-format frame, ground truth) per block of tests."""
+        for block in range(len(self._blocks)):
+            yield self._block(block)
+
+    def tests(self) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """Stream the tests as (test_id, DataFrame) pairs."""
+        for frame, _ in self.blocks():
+            ids = frame["test_id"].to_numpy()
+            bounds = np.append(np.flatnonzero(np.diff(ids)) + 1, len(ids))
+            values = frame.drop(columns="test_id")
+            start = 0
+            for end in bounds:
+                yield int(ids[start]), values.iloc[start:end].reset_index(drop=True)
+                start = end
+
+    def frame(self) -> pd.DataFrame:
+        """All tests as one long-format frame with a `test_id` column."""
+        frames = [frame for frame, _ in self.blocks()]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["test_id"])
+
+    def truth(self) -> pd.DataFrame:
+        """True LT1 and LT2 (intensity, lactate and heart rate on the noise-free curves) per test."""
+        frames = [self._truth(self._params(block)) for block in range(len(self._blocks))]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TRUTH_COLUMNS)
@@ -0,0 +1,184 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Cost of one stage of `determine`.
+
+    Attributes:
+        stage (str): "clean_data", "cache_lookup", "interpolate", "index" (the sorted lookups on the
+            interpolated grid) or the name of a threshold method.
+        wall_time (float): Elapsed seconds.
+        cpu_time (float): CPU seconds of the calling process.
+        peak_memory (int, optional): Peak bytes allocated during the stage, only when tracing memory.
+    """
+
+    stage: str
+    wall_time: float
+    cpu_time: float
+    peak_memory: Optional[int] = None
+
+
+@dataclass
+class StageTotals:
+    count: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_memory: Optional[int] = None
+
+
+class Tracer:
+    """Collects per-stage timings of `determine`, passed as `determine(df, tracer=...)` or set with `set_tracer`.
+
+    Every stage is passed to `callback` (e.g. to forward it to a metrics system) as it completes and summed up
+    per stage name; the timings of one call are also attached to its result as `timings`.
+
+    Args:
+        callback (Callable[[StageTiming], None], optional): Called with every completed stage.
+        memory (bool): Also record the peak memory of every stage with `tracemalloc`, which slows down
+            allocation-heavy code considerably.
+    """
+
+    def __init__(self, callback: Optional[Callable[[StageTiming], None]] = None, memory: bool = False):
+        self.callback = callback
+        self.memory = memory
+        self.totals: Dict[str, StageTotals] = {}
+
+    @contextmanager
+    def stage(self, name: str, timings: Optional[List[StageTiming]] = None) -> Iterator[None]:
+        started_tracing = False
+        if self.memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            base = tracemalloc.get_traced_memory()[0]
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = None
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1] - base, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            timing = StageTiming(name, wall, cpu, peak)
+            if timings is not None:
+                timings.append(timing)
+            self._record(timing)
+
+    def _record(self, timing: StageTiming):
+        totals = self.totals.setdefault(timing.stage, StageTotals())
+        totals.count += 1
+        totals.wall_time += timing.wall_time
+        totals.cpu_time += timing.cpu_time
+        if timing.peak_memory is not None:
+            totals.peak_memory = max(totals.peak_memory or 0, timing.peak_memory)
+        if self.callback is not None:
+            self.callback(timing)
+
+    def summary(self):
+        """Totals per stage as a DataFrame: count, total and mean wall/CPU seconds and the largest peak memory."""
+        import pandas as pd
+
+        rows = [
+            {
+                "stage": name,
+                "count": t.count,
+                "wall_time": t.wall_time,
+                "cpu_time": t.cpu_time,
+                "mean_wall_time": t.wall_time / t.count,
+                "peak_memory": t.peak_memory,
+            }
+            for name, t in self.totals.items()
+        ]
+        return pd.DataFrame(rows, columns=["stage", "count", "wall_time", "cpu_time", "mean_wall_time", "peak_memory"])
+
+    def reset(self):
+        self.totals = {}
+
+
+_tracer: Optional[Tracer] = None
+_NO_STAGE = nullcontext()
+
+
+def set_tracer(tracer: Optional[Tracer]):
+    """Trace every `determine` call that gets no tracer of its own, `None` to stop.
+
+    The tracer is global to the process, worker processes of `parallel.determine_iter` do not see it.
+    """
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def stage(tracer: Optional[Tracer], name: str, timings: Optional[List[StageTiming]] = None) -> ContextManager:
+    """`tracer.stage(name)`, or a shared no-op context without a tracer."""
+    if tracer is None:
+        return _NO_STAGE
+    return tracer.stage(name, timings)
+
+
+def profile(df, path: Optional[str] = None, top: int = 25, sort: str = "cumulative", **kwargs: Any) -> str:
+    """Profile `determine` on one test and return (and optionally write) a plain text report.
+
+    The report holds the stage timings (with peak memory), the `top` functions by `sort` from cProfile and the
+    `top` source lines allocating the most memory according to tracemalloc.
+
+    Args:
+        df (pd.DataFrame): The test, as passed to `determine`.
+        path (str, optional): File to write the report to.
+        **kwargs: Passed on to `determine`, e.g. `lactate_col` or `solver`.
+    """
+    import cProfile
+    import io
+    import pstats
+
+    from lactate_thresholds.process import determine
+
+    determine(df, **kwargs)  # warm up lazy imports and caches, so that they do not dominate the report
+
+    tracer = Tracer(memory=True)
+    res = determine(df, tracer=tracer, **kwargs)
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    determine(df, **kwargs)
+    profiler.disable()
+
+    tracemalloc.start(10)
+    try:
+        determine(df, **kwargs)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    out = io.StringIO()
+    out.write("Stages\n")
+    out.write(f"{'stage':16s} {'wall ms':>10s} {'cpu ms':>10s} {'peak KiB':>10s}\n")
+    for t in res.timings:
+        out.write(f"{t.stage:16s} {t.wall_time * 1e3:10.2f} {t.cpu_time * 1e3:10.2f} {t.peak_memory / 1024:10.1f}\n")
+
+    out.write(f"\ncProfile, top {top} by {sort}\n")
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(top)
+
+    out.write(f"tracemalloc, top {top} lines by allocated size\n")
+    for stat in snapshot.statistics("lineno")[:top]:
+        out.write(f"{stat}\n")
+
+    report = out.getvalue()
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(report)
+    return report
@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import Any, Callable, Dict, List, Literal, Optional, get_args
 
 import pandas as pd
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+
+from lactate_thresholds.tracing import StageTiming
 
 
 class BaseMeasurement(BaseModel):
@@ -38,7 +40,6 @@ class LactateThresholdResults(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     clean_data: pd.DataFrame
-    interpolated_data: pd.DataFrame
     ltp1: LactateTurningPoint | None = None
     ltp2: LactateTurningPoint | None = None
     mod_dmax: ModDMax | None = None
@@ -48,6 +49,46 @@ class LactateThresholdResults(BaseModel):
     obla_4: OBLA | None = None
     lt1_estimate: ThresholdEstimate | None = None
     lt2_estimate: ThresholdEstimate | None = None
+    extra: Dict[str, Any] = {}
+    timings: List[StageTiming] | None = None  # per-stage costs, when traced
+
+    _interpolated_data: pd.DataFrame | None = PrivateAttr(default=None)
+    _interpolator: Callable[[], pd.DataFrame] | None = PrivateAttr(default=None)
+    _working_data: pd.DataFrame | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        interpolated_data: pd.DataFrame | None = None,
+        interpolator: Callable[[], pd.DataFrame] | None = None,
+        working_data: pd.DataFrame | None = None,
+        **data,
+    ):
+        """
+        Either pass `interpolated_data` directly, or an `interpolator` that produces it on first access. In the
+        latter case `working_data`, a coarser grid of the same fitted curve, is used for the threshold lookups.
+        """
+        if interpolated_data is None and interpolator is None:
+            raise ValueError("Either interpolated_data or an interpolator is required")
+
+        super().__init__(**data)
+        self._interpolated_data = interpolated_data
+        self._interpolator = interpolator
+        self._working_data = working_data
+
+    @property
+    def interpolated_data(self) -> pd.DataFrame:
+        if self._interpolated_data is None:
+            self._interpolated_data = self._interpolator()
+        return self._interpolated_data
+
+    @interpolated_data.setter
+    def interpolated_data(self, value: pd.DataFrame):
+        self._interpolated_data = value
+
+    @property
+    def is_interpolated(self) -> bool:
+        """Whether `interpolated_data` has been materialized."""
+        return self._interpolated_data is not None
 
     def calc_lt1_lt2_estimates(self, lt1: Optional[float] = None, lt2: Optional[float] = None):
         """
@@ -55,5 +96,64 @@ class LactateThresholdResults(BaseModel):
         """
         from lactate_thresholds.methods import determine_threshold_estimate
 
-        self.lt1_estimate = determine_threshold_estimate(self.interpolated_data, lt1, self.ltp1, self.loglog)
-        self.lt2_estimate = determine_threshold_estimate(self.interpolated_data, lt2, self.ltp2, self.mod_dmax)
+        data = self._interpolated_data
+        if data is None:
+            data = self._working_data if self._working_data is not None else self.interpolated_data
+
+        self.lt1_estimate = determine_threshold_estimate(data, lt1, self.ltp1, self.loglog)
+        self.lt2_estimate = determine_threshold_estimate(data, lt2, self.ltp2, self.mod_dmax)
+
+
+# Values a zone boundary can be relative to, the intensity anchors get their heart rate from the curve and the heart
+# rate anchors their intensity
+ZoneAnchor = Literal["lt1_intensity", "lt2_intensity", "lt1_heart_rate", "lt2_heart_rate", "heart_rate_max"]
+ZONE_ANCHORS = get_args(ZoneAnchor)
+
+
+class ZoneBoundary(BaseModel):
+    anchor: ZoneAnchor
+    multiplier: float = Field(1.0, gt=0)
+
+
+class ZoneDefinition(BaseModel):
+    label: str
+    focus: str = ""
+    lower: ZoneBoundary | None = None  # defaults to the upper boundary of the previous zone, 0 for the first
+    upper: ZoneBoundary | None = None  # open ended, only for the last zone
+    intensity_format: str | None = None  # e.g. "{lower:.2f} - {upper:.2f}", see `zones.render_zones`
+    heart_rate_format: str | None = None
+
+
+class ZoneScheme(BaseModel):
+    """Declarative training zone scheme, see `zones.register_scheme`.
+
+    Every zone runs from `lower` to `upper`, each a multiple of one of the `ZONE_ANCHORS` of a test.
+    """
+
+    name: str
+    zones: List[ZoneDefinition] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def check_zones(self) -> "ZoneScheme":
+        labels = [z.label for z in self.zones]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f"Zone labels of scheme '{self.name}' are not unique")
+
+        previous = None
+        for i, zone in enumerate(self.zones):
+            if zone.upper is None and i < len(self.zones) - 1:
+                raise ValueError(f"Only the last zone can be open ended, '{zone.label}' has no upper boundary")
+
+            lower = zone.lower if zone.lower is not None else previous
+            for a, b in [(previous, lower), (lower, zone.upper)]:
+                if a is not None and b is not None and a.anchor == b.anchor and a.multiplier > b.multiplier:
+                    raise ValueError(f"Boundaries of zone '{zone.label}' are out of order")
+
+            for template in [zone.intensity_format, zone.heart_rate_format]:
+                try:
+                    template is None or template.format(lower=1.0, upper=2.0)
+                except (KeyError, IndexError, ValueError) as e:
+                    raise ValueError(f"Invalid format {template!r} of zone '{zone.label}': {e}") from e
+            previous = zone.upper
+
+        return self
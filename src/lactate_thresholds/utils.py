@@ -1,34 +1,143 @@
+import weakref
+from typing import Optional
+
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
+
+from lactate_thresholds.fit import CubicFit, fit_line, predict_line
 
 
 def get_heart_rate(df_clean: pd.DataFrame, intensity_values: np.array) -> np.array:
-    df_clean = df_clean.iloc[1:]
+    return predict_heart_rate(
+        df_clean["intensity"].to_numpy(dtype=float), df_clean["heart_rate"].to_numpy(dtype=float), intensity_values
+    )
+
+
+def predict_heart_rate(intensity: np.ndarray, heart_rate: np.ndarray, intensity_values: np.array) -> np.array:
+    """Heart rate at `intensity_values` from a linear fit on all but the first step, rounded to whole beats."""
+    return predict_line(fit_line(intensity[1:], heart_rate[1:]), intensity_values)
+
+
+def grid_crossing(intensity: np.ndarray, column: np.ndarray, value, hi: float) -> np.ndarray:
+    """Highest intensity up to `hi` at which the grid curve, linear between points, reaches `value`; NaN if none."""
+    value = np.asarray(value, dtype=float)
+    d = column - value[..., None]
+    a, b = d[..., :-1], d[..., 1:]
+    crosses = ((a <= 0) & (b >= 0)) | ((a >= 0) & (b <= 0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(a == b, 0.0, a / (a - b))
+    x = intensity[:-1] + t * np.diff(intensity)
+    best = np.where(crosses & (x <= hi), x, -np.inf).max(axis=-1, initial=-np.inf)
+    return np.where(np.isfinite(best), best, np.nan)
+
+
+class InterpolatedIndex:
+    """Lookup structure over an interpolated curve, built once per `interpolated_data` frame.
+
+    Forward lookups (intensity -> lactate / heart rate) use a binary search on the sorted intensity grid
+    followed by linear interpolation. Inverse lookups (lactate / heart rate -> intensity) take the crossing on
+    the final monotone branch, falling back to the nearest grid point when the value is never reached. They
+    solve the fitted cubic analytically when the frame carries its fit (as the output of `interpolate` does),
+    and interpolate linearly between grid points otherwise, so that both directions answer from the same
+    curve. All lookups accept scalars as well as arrays of query values.
+    """
+
+    def __init__(self, df_interpolated: pd.DataFrame):
+        self._setup(
+            df_interpolated["intensity"].to_numpy(dtype=float),
+            df_interpolated["lactate"].to_numpy(dtype=float),
+            df_interpolated["heart_rate"].to_numpy(dtype=float),
+            df_interpolated.attrs.get("fit"),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, intensity: np.ndarray, lactate: np.ndarray, heart_rate: np.ndarray, fit: Optional[CubicFit] = None
+    ) -> "InterpolatedIndex":
+        """Index over an interpolation grid held as plain arrays, see `methods.interpolate_arrays`."""
+        index = cls.__new__(cls)
+        index._setup(intensity, lactate, heart_rate, fit)
+        return index
+
+    def _setup(self, intensity: np.ndarray, lactate: np.ndarray, heart_rate: np.ndarray, fit: Optional[CubicFit]):
+        order = np.argsort(intensity, kind="stable") if np.any(np.diff(intensity) < 0) else slice(None)
+
+        self.intensity = intensity[order]
+        self.lactate = lactate[order]
+        self.heart_rate = heart_rate[order]
+        self.fit = fit if isinstance(fit, CubicFit) else None
+
+    def _forward(self, column: np.ndarray, intensity):
+        out = np.interp(intensity, self.intensity, column)
+        return float(out) if np.ndim(out) == 0 else out
+
+    def _crossing(self, column: np.ndarray, response: int, value: np.ndarray, hi: float) -> np.ndarray:
+        if self.fit is not None:
+            return self.fit.invert(value, self.intensity[0], hi, response=response)
+        return grid_crossing(self.intensity, column, value, hi)
+
+    def _nearest(self, column: np.ndarray, value: np.ndarray) -> np.ndarray:
+        return self.intensity[np.abs(column[None, :] - np.atleast_1d(value)[:, None]).argmin(axis=1)]
+
+    def _inverse(self, column: np.ndarray, response: int, value):
+        value = np.asarray(value, dtype=float)
+        out = self._crossing(column, response, value, self.intensity[-1])
+
+        missing = np.isnan(out) & ~np.isnan(value)
+        if missing.any():
+            out = np.array(out)
+            out[missing] = self._nearest(column, value[missing])
+
+        return float(out) if np.ndim(out) == 0 else out
+
+    def lactate_at(self, intensity):
+        return self._forward(self.lactate, intensity)
+
+    def heart_rate_at(self, intensity):
+        return self._forward(self.heart_rate, intensity)
+
+    def intensity_at_lactate(self, lactate):
+        return self._inverse(self.lactate, 0, lactate)
+
+    def intensity_at_heart_rate(self, heart_rate):
+        return self._inverse(self.heart_rate, 1, heart_rate)
+
+    def grid_intensity_at_lactate(self, lactate):
+        """Intensity of the grid point whose lactate is closest to `lactate`, without solving the curve."""
+        lactate = np.asarray(lactate, dtype=float)
+        out = np.where(np.isnan(lactate), np.nan, self._nearest(self.lactate, lactate))
+        return float(out[0]) if np.ndim(lactate) == 0 else out
+
+
+_INDEX_CACHE: dict[int, tuple[weakref.ref, InterpolatedIndex]] = {}
+
+
+def interpolated_index(df_interpolated: pd.DataFrame) -> InterpolatedIndex:
+    """Return the (cached) `InterpolatedIndex` of an interpolated data frame.
 
-    X = sm.add_constant(df_clean["intensity"])
-    y = df_clean["heart_rate"]
-    model_heart_rate = sm.OLS(y, X).fit()
+    The index lives as long as the frame does; interpolated data is treated as immutable.
+    """
+    key = id(df_interpolated)
+    entry = _INDEX_CACHE.get(key)
+    if entry is not None and entry[0]() is df_interpolated:
+        return entry[1]
 
-    new_data = pd.DataFrame({"const": 1, "intensity": intensity_values})
-    return model_heart_rate.predict(new_data).round(0)
+    index = InterpolatedIndex(df_interpolated)
+    _INDEX_CACHE[key] = (weakref.ref(df_interpolated, lambda _: _INDEX_CACHE.pop(key, None)), index)
+    return index
 
 
 def get_heart_rate_interpolated(df_interpolated: pd.DataFrame, intensity: float) -> float:
-    closest_intensity = df_interpolated.iloc[(df_interpolated["intensity"] - intensity).abs().argsort()[:1]]
-    return closest_intensity["heart_rate"].values[0]
+    return interpolated_index(df_interpolated).heart_rate_at(intensity)
 
 
 def get_lactate_interpolated(df_interpolated: pd.DataFrame, intensity: float) -> float:
-    closest_intensity = df_interpolated.iloc[(df_interpolated["intensity"] - intensity).abs().argsort()[:1]]
-    return closest_intensity["lactate"].values[0]
+    return interpolated_index(df_interpolated).lactate_at(intensity)
 
 
 def get_intensity_interpolated(df_interpolated: pd.DataFrame, lactate: float) -> float:
-    closest_lactate = df_interpolated.iloc[(df_interpolated["lactate"] - lactate).abs().argsort()[:1]]
-    return closest_lactate["intensity"].values[0]
+    return interpolated_index(df_interpolated).intensity_at_lactate(lactate)
 
 
 def get_intensity_based_on_heartrate_interpolated(df_interpolated: pd.DataFrame, heart_rate: float) -> float:
-    closest_hr = df_interpolated.iloc[(df_interpolated["heart_rate"] - heart_rate).abs().argsort()[:1]]
-    return closest_hr["intensity"].values[0]
+    return interpolated_index(df_interpolated).intensity_at_heart_rate(heart_rate)
@@ -1,117 +1,445 @@
+from functools import partial
+from typing import Any, Dict, List
+
+import numpy as np
 import pandas as pd
 
-from lactate_thresholds.types import LactateThresholdResults
+from lactate_thresholds.types import ZONE_ANCHORS, LactateThresholdResults, ZoneBoundary, ZoneDefinition, ZoneScheme
 
+# Columns of the numeric zone tables, open ends of the last zone are NaN
+ZONE_COLUMNS = ["zone", "intensity_lower", "intensity_upper", "heart_rate_lower", "heart_rate_upper", "focus"]
 
-def seiler_3_zones(res: LactateThresholdResults) -> pd.DataFrame:
-    """Determine Seiler 3-zone training zones based on LT1 and LT2.
 
-    Args:
-        lt1 (ThresholdEstimate): Lactate threshold 1 intensity.
-        lt2 (ThresholdEstimate): Lactate threshold 2 intensity.
+class _IndexCurves:
+    """Curve lookups of a single test, on its interpolated grid like the rest of the package."""
 
-    Returns:
-        pd.DataFrame: DataFrame with Seiler 3-zone training zones, including focus and usage.
+    def __init__(self, res: LactateThresholdResults):
+        from lactate_thresholds.utils import interpolated_index
+
+        self._index = interpolated_index(res.interpolated_data)
+
+    def heart_rate_at(self, intensity: np.ndarray) -> np.ndarray:
+        return np.asarray(self._index.heart_rate_at(intensity), dtype=float).reshape(intensity.shape)
+
+    def intensity_at_heart_rate(self, heart_rate: np.ndarray) -> np.ndarray:
+        out = self._index.intensity_at_heart_rate(heart_rate.ravel())
+        return np.asarray(out, dtype=float).reshape(heart_rate.shape)
+
+
+class _TableCurves:
+    """Curve lookups of many tests at once, from the `batch.CURVE_COLUMNS` of a `determine_many` table."""
+
+    def __init__(self, results: pd.DataFrame):
+        self.center = results["curve_center"].to_numpy(dtype=float)[:, None]
+        self.scale = results["curve_scale"].to_numpy(dtype=float)[:, None]
+        self.lo = results["curve_lo"].to_numpy(dtype=float)[:, None]
+        self.hi = results["curve_hi"].to_numpy(dtype=float)[:, None]
+        self.heart_rate_coef = results[[f"curve_heart_rate_{i}" for i in range(4)]].to_numpy(dtype=float)
+
+    def heart_rate_at(self, intensity: np.ndarray) -> np.ndarray:
+        from lactate_thresholds.fit import horner
+
+        t = (np.clip(intensity, self.lo, self.hi) - self.center) / self.scale
+        return horner(self.heart_rate_coef[:, None, :], t)
+
+    def intensity_at_heart_rate(self, heart_rate: np.ndarray) -> np.ndarray:
+        from lactate_thresholds.fit import horner, invert_cubic
+
+        # Tests without a value or curve are left out of the root finding, which cannot handle NaN
+        valid = ~np.isnan(heart_rate) & ~np.isnan(self.heart_rate_coef).any(axis=1)[:, None] & ~np.isnan(self.lo)
+        t = invert_cubic(
+            np.where(valid[..., None], self.heart_rate_coef[:, None, :], 0.0),
+            np.where(valid, heart_rate, 0.0),
+            (self.lo - self.center) / self.scale,
+            (self.hi - self.center) / self.scale,
+        )
+        out = np.where(valid, self.center + self.scale * t, np.nan)
+
+        # Never reached: the closest point of the curve, like the nearest grid point of a single test. The curve
+        # stays on one side of the value, so that is an end of the range or a turning point of the cubic
+        missing = np.isnan(out) & valid
+        if missing.any():
+            rows = np.nonzero(missing)[0]
+            coef = self.heart_rate_coef[rows]
+            a, b, c = 3 * coef[:, 3], 2 * coef[:, 2], coef[:, 1]
+            disc = np.sqrt(np.maximum(b**2 - 4 * a * c, 0.0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                turning = np.where(
+                    a[:, None] != 0, (-b[:, None] + [[-1, 1]] * disc[:, None]) / (2 * a[:, None]), np.nan
+                )
+            candidates = np.clip(
+                np.column_stack([self.lo[rows], self.hi[rows], self.center[rows] + self.scale[rows] * turning]),
+                self.lo[rows],
+                self.hi[rows],
+            )
+            values = horner(coef[:, None, :], (candidates - self.center[rows]) / self.scale[rows])
+            nearest = np.nanargmin(np.abs(values - heart_rate[missing][:, None]), axis=1)
+            out[missing] = candidates[np.arange(len(rows)), nearest]
+        return out
+
+
+def _at(anchor: str, multiplier: float = 1.0) -> Dict[str, Any]:
+    return {"anchor": anchor, "multiplier": multiplier}
+
+
+def _fractions(anchor: str, bounds: List[tuple]) -> List[Dict[str, Any]]:
+    """Zones given as (lower, upper) fractions of one anchor, None for 0 or an open end."""
+    return [
+        {"lower": None if lower is None else _at(anchor, lower), "upper": None if upper is None else _at(anchor, upper)}
+        for lower, upper in bounds
+    ]
+
+
+def _scheme(
+    name: str,
+    labels: List[str],
+    focus: List[str],
+    bounds: List[Dict[str, Any]],
+    formats: Dict[int, tuple] | None = None,
+) -> ZoneScheme:
+    """A built-in scheme, `formats` maps a zone index to its (intensity, heart rate) format."""
+    zones = [{"label": label, "focus": text, **bound} for label, text, bound in zip(labels, focus, bounds)]
+    for i, (intensity_format, heart_rate_format) in (formats or {}).items():
+        zones[i].update(intensity_format=intensity_format, heart_rate_format=heart_rate_format)
+    return ZoneScheme.model_validate({"name": name, "zones": zones})
+
+
+_SEILER_LABELS = ["Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5"]
+_FRIEL_LABELS = [
+    "Zone 1. Recovery",
+    "Zone 2. Aerobic",
+    "Zone 3. Tempo",
+    "Zone 4. SubThreshold",
+    "Zone 5a. VO2 SuperThreshold",
+    "Zone 5b. Aerobic Capacity",
+    "Zone 5c. Anaerobic Capacity",
+]
+_FRIEL_FOCUS = [
+    "Active recovery.",
+    "Aerobic endurance.",
+    "Building aerobic capacity and stamina.",
+    "Threshold effort.",
+    "Improving VO2 max.",
+    "Anaerobic capacity.",
+    "Peak power output.",
+]
+# The last Friel zone runs up to the highest measured heart rate
+_FRIEL_FORMATS = {0: (None, "{lower:.0f} - {upper:.0f}"), 6: ("more than {lower:.2f}", "{lower:.0f} - max")}
+_FRIEL_LAST = {"lower": _at("lt2_heart_rate", 1.06), "upper": _at("heart_rate_max")}
+
+# friel references
+# https://web.archive.org/web/20241212065559/https://www.trainingbible.com/joesblog/2009/11/quick-guide-to-setting-zones.html
+
+BUILTIN_SCHEMES: List[ZoneScheme] = [
+    _scheme(
+        "seiler_3",
+        _SEILER_LABELS[:3],
+        [
+            "Recovery, building an aerobic foundation.",
+            "Moderate aerobic work; a gray zone with limited efficiency for endurance adaptations.",
+            "Enhancing anaerobic threshold and lactate tolerance.",
+        ],
+        [
+            {"upper": _at("lt1_intensity")},
+            {"upper": _at("lt2_intensity")},
+            {},
+        ],
+        formats={0: ("{lower:.2f} - {upper:.2f}", None)},
+    ),
+    _scheme(
+        "seiler_5",
+        _SEILER_LABELS,
+        [
+            "Recovery, building an aerobic foundation.",
+            "Aerobic base building and improving fat utilization.",
+            "Aerobic endurance and muscular efficiency.",
+            "Improving lactate tolerance and anaerobic threshold.",
+            "Anaerobic capacity, speed, and power.",
+        ],
+        [
+            {"upper": _at("lt1_intensity", 0.98)},
+            {"upper": _at("lt1_intensity", 1.02)},
+            {"upper": _at("lt2_intensity", 0.98)},
+            {"upper": _at("lt2_intensity", 1.02)},
+            {},
+        ],
+        formats={0: ("{lower:.0f} - {upper:.2f}", None)},
+    ),
+    _scheme(
+        "friel_7_running",
+        _FRIEL_LABELS,
+        _FRIEL_FOCUS,
+        _fractions(
+            "lt2_heart_rate",
+            [(None, 0.85), (0.85, 0.89), (0.90, 0.94), (0.95, 0.99), (1.00, 1.02), (1.03, 1.06)],
+        )
+        + [_FRIEL_LAST],
+        formats=_FRIEL_FORMATS,
+    ),
+    _scheme(
+        "friel_7_cycling",
+        [label.replace("VO2 ", "") for label in _FRIEL_LABELS],
+        _FRIEL_FOCUS,
+        _fractions(
+            "lt2_heart_rate",
+            [(None, 0.81), (0.81, 0.89), (0.90, 0.93), (0.94, 0.99), (1.00, 1.02), (1.03, 1.06)],
+        )
+        + [_FRIEL_LAST],
+        formats=_FRIEL_FORMATS,
+    ),
+    # Power zones with LT2 standing in for the functional threshold power
+    _scheme(
+        "coggan_7",
+        [
+            "Zone 1. Active Recovery",
+            "Zone 2. Endurance",
+            "Zone 3. Tempo",
+            "Zone 4. Lactate Threshold",
+            "Zone 5. VO2max",
+            "Zone 6. Anaerobic Capacity",
+            "Zone 7. Neuromuscular Power",
+        ],
+        [
+            "Active recovery.",
+            "Aerobic endurance.",
+            "Sustained aerobic work.",
+            "Threshold effort.",
+            "Improving VO2 max.",
+            "Anaerobic capacity.",
+            "Short maximal efforts.",
+        ],
+        _fractions(
+            "lt2_intensity",
+            [(None, 0.55), (0.55, 0.75), (0.75, 0.90), (0.90, 1.05), (1.05, 1.20), (1.20, 1.50), (1.50, None)],
+        ),
+    ),
+]
+
+
+class _CompiledScheme:
+    """A `ZoneScheme` compiled into index arrays, evaluating all boundaries of many tests in two curve lookups.
+
+    Every distinct (anchor, multiplier) boundary becomes a column of an intensity and a heart rate matrix, next
+    to a column of zeros and one of NaN for open ends. The zone table is then plain fancy indexing into these.
     """
 
-    from lactate_thresholds.utils import get_heart_rate_interpolated
+    def __init__(self, scheme: ZoneScheme):
+        self.scheme = scheme
+        self.zones = [z.label for z in scheme.zones]
+        self.focus = [z.focus for z in scheme.zones]
 
-    zone1_intensity = f"{0:.2f} - {res.lt1_estimate.intensity:.2f}"
-    zone1_heartrate = f"up to {get_heart_rate_interpolated(res.interpolated_data, res.lt1_estimate.intensity):.0f}"
+        columns: Dict[tuple, int] = {}
 
-    zone2_intensity = f"{res.lt1_estimate.intensity:.2f} - {res.lt2_estimate.intensity:.2f}"
-    zone2_heartrate = (
-        f"{get_heart_rate_interpolated(res.interpolated_data, res.lt1_estimate.intensity):.0f} - "
-        f"{get_heart_rate_interpolated(res.interpolated_data, res.lt2_estimate.intensity):.0f}"
-    )
+        def column(boundary: ZoneBoundary | None, default: int) -> int:
+            if boundary is None:
+                return default
+            return columns.setdefault((boundary.anchor, boundary.multiplier), len(columns) + 2)
+
+        lower, upper, previous = [], [], 0
+        for zone in scheme.zones:
+            lower.append(column(zone.lower, previous))
+            upper.append(column(zone.upper, 1))
+            previous = upper[-1]
+        self.lower, self.upper = np.array(lower), np.array(upper)
+
+        self.anchor = np.array([ZONE_ANCHORS.index(a) for a, _ in columns], dtype=int)
+        self.multiplier = np.array([m for _, m in columns], dtype=float)
+        self.by_intensity = np.array([a.endswith("_intensity") for a, _ in columns], dtype=bool)
+
+        self.intensity_formats = [
+            z.intensity_format or self._default_format(i, z, "{:.2f}") for i, z in enumerate(scheme.zones)
+        ]
+        self.heart_rate_formats = [
+            z.heart_rate_format or self._default_format(i, z, "{:.0f}") for i, z in enumerate(scheme.zones)
+        ]
+
+    def _default_format(self, i: int, zone: ZoneDefinition, spec: str) -> str:
+        lower, upper = spec.replace("{", "{lower"), spec.replace("{", "{upper")
+        if zone.upper is None:
+            return f"{lower} - max"
+        if i == 0 and zone.lower is None:
+            return f"up to {upper}"
+        return f"{lower} - {upper}"
+
+    def __call__(self, anchors: np.ndarray, curves) -> Dict[str, np.ndarray]:
+        """Zone boundaries of shape (n_tests, n_zones), from `anchors` of shape (n_tests, len(ZONE_ANCHORS))."""
+        n = len(anchors)
+        values = anchors[:, self.anchor] * self.multiplier
+        intensity = np.column_stack([np.zeros(n), np.full(n, np.nan), values])
+        heart_rate = intensity.copy()
 
-    zone3_intensity = f"{res.lt2_estimate.intensity:.2f} - max"
-    zone3_heartrate = f"{get_heart_rate_interpolated(res.interpolated_data, res.lt2_estimate.intensity):.0f} - max"
-
-    zones = pd.DataFrame(
-        {
-            "zone": ["Zone 1", "Zone 2", "Zone 3"],
-            "intensity": [zone1_intensity, zone2_intensity, zone3_intensity],
-            "heart_rate": [zone1_heartrate, zone2_heartrate, zone3_heartrate],
-            "focus": [
-                "Recovery, building an aerobic foundation.",
-                "Moderate aerobic work; a gray zone with limited efficiency for endurance adaptations.",
-                "Enhancing anaerobic threshold and lactate tolerance.",
-            ],
+        by_intensity, by_heart_rate = np.nonzero(self.by_intensity)[0] + 2, np.nonzero(~self.by_intensity)[0] + 2
+        if len(by_intensity):
+            heart_rate[:, by_intensity] = curves.heart_rate_at(intensity[:, by_intensity])
+        if len(by_heart_rate):
+            intensity[:, by_heart_rate] = curves.intensity_at_heart_rate(heart_rate[:, by_heart_rate])
+
+        return {
+            "intensity_lower": intensity[:, self.lower],
+            "intensity_upper": intensity[:, self.upper],
+            "heart_rate_lower": heart_rate[:, self.lower],
+            "heart_rate_upper": heart_rate[:, self.upper],
         }
-    )
 
-    return zones
 
+_COMPILED: Dict[str, _CompiledScheme] = {}
 
-def seiler_5_zones(res: LactateThresholdResults) -> pd.DataFrame:
-    """Determine 5-zone training zones based on LT1 and LT2.
+
+def register_scheme(scheme: ZoneScheme | Dict[str, Any], replace: bool = False) -> ZoneScheme:
+    """Validate and compile a zone scheme, making it available by name to all zone functions.
 
     Args:
-        res (LactateThresholdResults): Object containing LT1 and LT2 estimates and interpolated data.
+        scheme (ZoneScheme | dict): The scheme, or its definition as a dict, e.g. loaded from JSON.
+        replace (bool): Allow overriding an existing scheme.
+    """
+    scheme = ZoneScheme.model_validate(scheme)
+    if scheme.name in _COMPILED and not replace:
+        raise ValueError(f"Zone scheme '{scheme.name}' is already registered")
+
+    _COMPILED[scheme.name] = _CompiledScheme(scheme)
+    SCHEMES[scheme.name] = partial(training_zones, scheme=scheme.name)
+    return scheme
+
+
+def unregister_scheme(name: str):
+    _COMPILED.pop(name, None)
+    SCHEMES.pop(name, None)
+
+
+def get_scheme(name: str) -> ZoneScheme:
+    """The registered zone scheme `name`, e.g. to list its zones."""
+    return _engine(name).scheme
+
+
+def _engine(scheme: str) -> _CompiledScheme:
+    if scheme not in _COMPILED:
+        raise ValueError(f"Unknown zone scheme '{scheme}', expected one of {list(_COMPILED)}")
+    return _COMPILED[scheme]
+
+
+def _table(engine: _CompiledScheme, bounds: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Flatten (n_tests, n_zones) boundaries into the columns of a long zone table."""
+    n_tests = len(bounds["intensity_lower"])
+    columns = {
+        "zone": np.tile(engine.zones, n_tests),
+        **{name: values.ravel() for name, values in bounds.items()},
+        "focus": np.tile(engine.focus, n_tests),
+    }
+    return {name: columns[name] for name in ZONE_COLUMNS}
+
+
+def zone_table(res: LactateThresholdResults, scheme: str = "seiler_3") -> pd.DataFrame:
+    """Numeric training zones of one test, one row per zone with the columns of `ZONE_COLUMNS`.
+
+    All boundaries of the scheme are looked up on the interpolated curves in one vectorized query. Use
+    `render_zones` for the formatted strings of `seiler_3_zones` and friends.
+
+    Args:
+        res (LactateThresholdResults): Results holding LT1 and LT2 estimates.
+        scheme (str): Name of a registered scheme, e.g. "seiler_3", "seiler_5", "friel_7_running",
+            "friel_7_cycling" or "coggan_7".
+    """
+    engine = _engine(scheme)
+    anchors = np.array(
+        [
+            [
+                res.lt1_estimate.intensity,
+                res.lt2_estimate.intensity,
+                res.lt1_estimate.heart_rate,
+                res.lt2_estimate.heart_rate,
+                res.clean_data.heart_rate.max(),
+            ]
+        ],
+        dtype=float,
+    )
+    return pd.DataFrame(_table(engine, engine(anchors, _IndexCurves(res))))
+
+
+def zones_many(results: pd.DataFrame, scheme: str = "seiler_3") -> pd.DataFrame:
+    """Numeric training zones of many tests at once, from a `determine_many(..., curves=True)` table.
+
+    The boundaries of all tests are computed as one array per column, evaluating the fitted cubics directly
+    rather than an interpolation grid, so values agree with `zone_table` up to the grid resolution. Tests
+    without LT1 or LT2 estimate get NaN boundaries.
 
     Returns:
-        pd.DataFrame: DataFrame with 5-zone training zones, including focus and usage.
+        pd.DataFrame: One row per test and zone, `test_id` followed by the columns of `ZONE_COLUMNS`.
     """
+    from lactate_thresholds.batch import CURVE_COLUMNS
 
-    from lactate_thresholds.utils import get_heart_rate_interpolated
+    engine = _engine(scheme)
+    missing = [c for c in CURVE_COLUMNS if c not in results.columns]
+    if missing:
+        raise ValueError(f"Columns {missing} not found, create the table with determine_many(..., curves=True)")
 
-    lt1_intensity = res.lt1_estimate.intensity
-    lt2_intensity = res.lt2_estimate.intensity
+    anchors = results[
+        [
+            "lt1_estimate_intensity",
+            "lt2_estimate_intensity",
+            "lt1_estimate_heart_rate",
+            "lt2_estimate_heart_rate",
+            "heart_rate_max",
+        ]
+    ].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        columns = _table(engine, engine(anchors, _TableCurves(results)))
+    return pd.DataFrame({"test_id": np.repeat(results["test_id"].to_numpy(), len(engine.zones)), **columns})
 
-    zone1_intensity = f"0 - {0.98 * lt1_intensity:.2f}"
-    zone2_intensity = f"{0.98 * lt1_intensity:.2f} - {1.02 * lt1_intensity:.2f}"
-    zone3_intensity = f"{1.02 * lt1_intensity:.2f} - {0.98 * lt2_intensity:.2f}"
-    zone4_intensity = f"{0.98 * lt2_intensity:.2f} - {1.02 * lt2_intensity:.2f}"
-    zone5_intensity = f"{1.02 * lt2_intensity:.2f} - max"
 
-    zone1_heartrate = f"up to {get_heart_rate_interpolated(res.interpolated_data, 0.98 * lt1_intensity):.0f}"
-    zone2_heartrate = (
-        f"{get_heart_rate_interpolated(res.interpolated_data, 0.98 * lt1_intensity):.0f} - "
-        f"{get_heart_rate_interpolated(res.interpolated_data, 1.02 * lt1_intensity):.0f}"
-    )
-    zone3_heartrate = (
-        f"{get_heart_rate_interpolated(res.interpolated_data, 1.02 * lt1_intensity):.0f} - "
-        f"{get_heart_rate_interpolated(res.interpolated_data, 0.98 * lt2_intensity):.0f}"
-    )
-    zone4_heartrate = (
-        f"{get_heart_rate_interpolated(res.interpolated_data, 0.98 * lt2_intensity):.0f} - "
-        f"{get_heart_rate_interpolated(res.interpolated_data, 1.02 * lt2_intensity):.0f}"
-    )
-    zone5_heartrate = f"{get_heart_rate_interpolated(res.interpolated_data, 1.02 * lt2_intensity):.0f} - max"
-
-    zones = pd.DataFrame(
-        {
-            "zone": ["Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5"],
-            "intensity": [
-                zone1_intensity,
-                zone2_intensity,
-                zone3_intensity,
-                zone4_intensity,
-                zone5_intensity,
-            ],
-            "heart_rate": [
-                zone1_heartrate,
-                zone2_heartrate,
-                zone3_heartrate,
-                zone4_heartrate,
-                zone5_heartrate,
-            ],
-            "focus": [
-                "Recovery, building an aerobic foundation.",
-                "Aerobic base building and improving fat utilization.",
-                "Aerobic endurance and muscular efficiency.",
-                "Improving lactate tolerance and anaerobic threshold.",
-                "Anaerobic capacity, speed, and power.",
-            ],
-        }
+def _format(template: str, lower: float, upper: float) -> str:
+    return template.format(lower=lower, upper=upper)
+
+
+def render_zones(table: pd.DataFrame, scheme: str = "seiler_3") -> pd.DataFrame:
+    """Format a numeric zone table (`zone_table` or `zones_many`) as the strings shown to athletes.
+
+    Returns:
+        pd.DataFrame: Columns zone, intensity, heart_rate and focus, preceded by `test_id` if present.
+    """
+    engine = _engine(scheme)
+    n_zones = len(engine.zones)
+    position = np.arange(len(table)) % n_zones
+
+    intensity = [
+        _format(engine.intensity_formats[i], lower, upper)
+        for i, lower, upper in zip(position, table["intensity_lower"], table["intensity_upper"])
+    ]
+    heart_rate = [
+        _format(engine.heart_rate_formats[i], lower, upper)
+        for i, lower, upper in zip(position, table["heart_rate_lower"], table["heart_rate_upper"])
+    ]
+
+    rendered = pd.DataFrame(
+        {"zone": table["zone"].to_numpy(), "intensity": intensity, "heart_rate": heart_rate, "focus": table["focus"]}
     )
+    if "test_id" in table.columns:
+        rendered.insert(0, "test_id", table["test_id"].to_numpy())
+    return rendered
 
-    return zones
 
+def seiler_3_zones(res: LactateThresholdResults) -> pd.DataFrame:
+    """Determine Seiler 3-zone training zones based on LT1 and LT2.
 
-# friel references
-# https://web.archive.org/web/20241212065559/https://www.trainingbible.com/joesblog/2009/11/quick-guide-to-setting-zones.html
+    Args:
+        lt1 (ThresholdEstimate): Lactate threshold 1 intensity.
+        lt2 (ThresholdEstimate): Lactate threshold 2 intensity.
+
+    Returns:
+        pd.DataFrame: DataFrame with Seiler 3-zone training zones, including focus and usage.
+    """
+    return render_zones(zone_table(res, "seiler_3"), "seiler_3")
+
+
+def seiler_5_zones(res: LactateThresholdResults) -> pd.DataFrame:
+    """Determine 5-zone training zones based on LT1 and LT2.
+
+    Args:
+        res (LactateThresholdResults): Object containing LT1 and LT2 estimates and interpolated data.
+
+    Returns:
+        pd.DataFrame: DataFrame with 5-zone training zones, including focus and usage.
+    """
+    return render_zones(zone_table(res, "seiler_5"), "seiler_5")
 
 
 def friel_7_zones_running(res: LactateThresholdResults) -> pd.DataFrame:
@@ -123,66 +451,21 @@ def friel_7_zones_running(res: LactateThresholdResults) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with Friel's 7-zone training zones.
     """
-    from lactate_thresholds.utils import (
-        get_intensity_based_on_heartrate_interpolated,
-    )
+    return render_zones(zone_table(res, "friel_7_running"), "friel_7_running")
 
-    lt2_heart_rate = res.lt2_estimate.heart_rate
-
-    # Define zone boundaries based on LT2
-    hr_zone1 = [0, 0.85 * lt2_heart_rate]
-    hr_zone2 = [0.85 * lt2_heart_rate, 0.89 * lt2_heart_rate]
-    hr_zone3 = [0.90 * lt2_heart_rate, 0.94 * lt2_heart_rate]
-    hr_zone4 = [0.95 * lt2_heart_rate, 0.99 * lt2_heart_rate]
-    hr_zone5a = [1.00 * lt2_heart_rate, 1.02 * lt2_heart_rate]
-    hr_zone5b = [1.03 * lt2_heart_rate, 1.06 * lt2_heart_rate]
-    hr_zone5c = [1.06 * lt2_heart_rate, res.clean_data.heart_rate.max()]
-
-    # Create the zones DataFrame
-    zones = pd.DataFrame(
-        {
-            "zone": [
-                "Zone 1. Recovery",
-                "Zone 2. Aerobic",
-                "Zone 3. Tempo",
-                "Zone 4. SubThreshold",
-                "Zone 5a. VO2 SuperThreshold",
-                "Zone 5b. Aerobic Capacity",
-                "Zone 5c. Anaerobic Capacity",
-            ],
-            "intensity": [
-                f"up to {get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone1[1]):.2f}",
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone2[0]):.2f} - "
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone2[1]):.2f}",
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone3[0]):.2f} - "
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone3[1]):.2f}",
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone4[0]):.2f} - "
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone4[1]):.2f}",
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone5a[0]):.2f} - "
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone5a[1]):.2f}",
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone5b[0]):.2f} - "
-                f"{get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone5b[1]):.2f}",
-                f"more than {get_intensity_based_on_heartrate_interpolated(res.interpolated_data, hr_zone5c[0]):.2f}",
-            ],
-            "heart_rate": [
-                f"{hr_zone1[0]:.0f} - {hr_zone1[1]:.0f}",
-                f"{hr_zone2[0]:.0f} - {hr_zone2[1]:.0f}",
-                f"{hr_zone3[0]:.0f} - {hr_zone3[1]:.0f}",
-                f"{hr_zone4[0]:.0f} - {hr_zone4[1]:.0f}",
-                f"{hr_zone5a[0]:.0f} - {hr_zone5a[1]:.0f}",
-                f"{hr_zone5b[0]:.0f} - {hr_zone5b[1]:.0f}",
-                f"{hr_zone5c[0]:.0f} - max",
-            ],
-            "focus": [
-                "Active recovery.",
-                "Aerobic endurance.",
-                "Building aerobic capacity and stamina.",
-                "Threshold effort.",
-                "Improving VO2 max.",
-                "Anaerobic capacity.",
-                "Peak power output.",
-            ],
-        }
-    )
 
-    return zones
+def training_zones(res: LactateThresholdResults, scheme: str = "seiler_3") -> pd.DataFrame:
+    """Training zones of any registered scheme, formatted like `seiler_3_zones`."""
+    return render_zones(zone_table(res, scheme), scheme)
+
+
+# Zone schemes by name, e.g. for storing or exporting zones in bulk
+SCHEMES = {
+    "seiler_3": seiler_3_zones,
+    "seiler_5": seiler_5_zones,
+    "friel_7_running": friel_7_zones_running,
+}
+
+for _builtin in BUILTIN_SCHEMES:
+    _COMPILED[_builtin.name] = _CompiledScheme(_builtin)
+    SCHEMES.setdefault(_builtin.name, partial(training_zones, scheme=_builtin.name))
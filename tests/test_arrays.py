@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lactate_thresholds import determine, determine_arrays
+from lactate_thresholds.process import validate_array
+from lactate_thresholds.registry import register_method, unregister_method
+
+
+@pytest.mark.parametrize("include_baseline", [False, True])
+def test_matches_determine(test_instances, include_baseline):
+    df = pd.DataFrame.from_dict(test_instances["simple"])
+    res = determine(df, include_baseline=include_baseline)
+    record = determine_arrays(
+        df["intensity"].to_numpy(), df["lactate"].to_numpy(), df["heart_rate"].to_numpy(), include_baseline
+    )
+
+    model = record.to_model(clean_data=res.clean_data)
+    assert model.model_dump(exclude={"clean_data"}) == res.model_dump(exclude={"clean_data"})
+
+
+def test_selected_methods(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling1"])
+    record = determine_arrays(df["intensity"], df["lactate_8"], df["heart_rate"], methods=["obla_4", "lt1_estimate"])
+
+    assert record.obla_4 is not None and record.lt1_estimate is not None and record.ltp1 is not None
+    assert record.obla_2 is None and record.mod_dmax is None
+
+    with pytest.raises(ValueError):
+        determine_arrays(df["intensity"], df["lactate_8"], df["heart_rate"], methods=["dmax"])
+
+
+def test_validation():
+    x = np.linspace(100, 300, 6)
+    assert validate_array("intensity", x) is x
+    assert validate_array("intensity", [1, 2, 3]).dtype == np.float64
+
+    with pytest.raises(ValueError):
+        validate_array("intensity", np.array(["100", "200"]))
+    with pytest.raises(ValueError):
+        validate_array("lactate", np.array([1.0, np.nan]))
+    with pytest.raises(ValueError):
+        determine_arrays(x, x[:-1], x)
+
+
+def test_registered_method(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling1"])
+    columns = df["intensity"], df["lactate_8"], df["heart_rate"]
+
+    @register_method(
+        "lt_gap",
+        requires=["lt1_estimate", "lt2_estimate"],
+        params=["scale"],
+        arrays=lambda lt1, lt2, scale=1.0: scale * (lt2[0] - lt1[0]),
+    )
+    def lt_gap(lt1, lt2, scale=1.0):
+        return scale * (lt2.intensity - lt1.intensity)
+
+    register_method("lt_ratio", requires=["lt1_estimate", "lt2_estimate"])(lambda lt1, lt2: lt2.lactate / lt1.lactate)
+    try:
+        record = determine_arrays(*columns, methods=["lt_gap"], method_params={"scale": 2.0})
+        assert record.extra["lt_gap"] == pytest.approx(2 * (record.lt2_estimate[0] - record.lt1_estimate[0]))
+        assert record.obla_4 is None
+
+        # Only registered for `determine`, refused rather than left out
+        with pytest.raises(ValueError, match="lt_ratio"):
+            determine_arrays(*columns, methods=["lt_gap", "lt_ratio"])
+    finally:
+        unregister_method("lt_gap")
+        unregister_method("lt_ratio")
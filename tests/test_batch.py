@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds import determine
+from lactate_thresholds.batch import determine_many
+
+
+def test_determine_many_matches_determine(test_instances):
+    dfs = [pd.DataFrame.from_dict(test_instances["cycling1"]), pd.DataFrame.from_dict(test_instances["cycling2"])]
+    res = determine_many(dfs, lactate_col="lactate_8")
+
+    assert len(res) == 2
+    for i, df in enumerate(dfs):
+        single = determine(df, lactate_col="lactate_8")
+        for name in ["obla_2", "obla_4", "baseline", "mod_dmax"]:
+            expected = getattr(single, name)
+            assert np.isclose(res.loc[i, f"{name}_intensity"], expected.intensity)
+            assert np.isclose(res.loc[i, f"{name}_lactate"], expected.lactate)
+            assert np.isclose(res.loc[i, f"{name}_heart_rate"], expected.heart_rate)
+
+
+def test_determine_many_long_format(test_instances):
+    long = pd.concat(
+        [
+            pd.DataFrame.from_dict(test_instances["simple"]).assign(test_id="a"),
+            pd.DataFrame.from_dict(test_instances["cycling2"]).assign(test_id="b", lactate=lambda d: d["lactate_8"]),
+        ]
+    )
+    res = determine_many(long)
+
+    assert list(res["test_id"]) == ["a", "b"]
+    assert res["obla_4_intensity"].notna().all()
+    assert res["lt1_estimate_intensity"].lt(res["lt2_estimate_intensity"]).all()
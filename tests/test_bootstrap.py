@@ -0,0 +1,53 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lactate_thresholds as lt
+from lactate_thresholds.bootstrap import bootstrap
+
+
+@pytest.fixture
+def cycling(test_instances):
+    return pd.DataFrame.from_dict(test_instances["cycling1"])
+
+
+def test_intervals_cover_estimate(cycling):
+    res = bootstrap(cycling, lactate_col="lactate_8", n_resamples=20, batch_size=10, seed=0)
+    expected = lt.determine(cycling, lactate_col="lactate_8")
+
+    assert res.loc[("obla_4", "intensity"), "estimate"] == pytest.approx(expected.obla_4.intensity, abs=0.1)
+    assert (res["lower"] <= res["upper"]).all()
+    assert res.loc[("ltp1", "intensity"), "lower"] <= res.loc[("ltp1", "intensity"), "estimate"]
+    assert res.loc[("ltp1", "intensity"), "upper"] >= res.loc[("ltp1", "intensity"), "estimate"]
+    assert (res["n_resamples"] <= 20).all()
+
+
+def test_seeded_and_case_resampling(cycling):
+    a = bootstrap(cycling, lactate_col="lactate_8", resampling="case", n_resamples=10, seed=1)
+    b = bootstrap(cycling, lactate_col="lactate_8", resampling="case", n_resamples=10, seed=1)
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_early_stopping(cycling):
+    res = bootstrap(cycling, lactate_col="lactate_8", n_resamples=100, batch_size=5, tol=np.inf, seed=0)
+    assert res["n_resamples"].max() == 10
+
+
+def test_invalid_resampling(cycling):
+    with pytest.raises(ValueError):
+        bootstrap(cycling, lactate_col="lactate_8", resampling="jackknife", n_resamples=5)
+
+
+def test_logging_restored_after_threads(cycling):
+    package = logging.getLogger("lactate_thresholds")
+    level, disabled = package.level, logging.root.manager.disable
+
+    kwargs = dict(lactate_col="lactate_8", n_resamples=40, chunk_size=2, backend="thread", max_workers=8)
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda seed: bootstrap(cycling, seed=seed, **kwargs), range(4)))
+
+    assert package.level == level
+    assert logging.root.manager.disable == disabled
@@ -0,0 +1,77 @@
+import pandas as pd
+
+from lactate_thresholds import determine
+from lactate_thresholds.cache import ResultCache
+from lactate_thresholds.parallel import determine_iter
+from lactate_thresholds.process import result_key
+
+
+def test_memory_cache(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    cache = ResultCache(maxsize=1)
+
+    first = determine(df, lactate_col="lactate_8", cache=cache)
+    second = determine(df, lactate_col="lactate_8", cache=cache)
+    assert cache.stats.misses == 1 and cache.stats.hits == 1
+    assert first.lt1_estimate == second.lt1_estimate
+
+    # returned results are copies, changing one leaves the cache alone
+    second.calc_lt1_lt2_estimates(lt1=150)
+    assert determine(df, lactate_col="lactate_8", cache=cache).lt1_estimate == first.lt1_estimate
+
+    # other parameters, other key
+    determine(df, lactate_col="lactate_8", methods=["obla_4"], cache=cache)
+    assert cache.stats.misses == 2 and cache.stats.evictions == 1
+
+    cache.invalidate(result_key(df, lactate_col="lactate_8", methods=["obla_4"]))
+    assert len(cache) == 0
+
+
+def test_result_key_ignores_column_names(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    renamed = df.rename(columns={"lactate_8": "lac", "heart_rate": "hr"})
+
+    assert result_key(df, lactate_col="lactate_8") == result_key(renamed, lactate_col="lac", heart_rate_col="hr")
+    assert result_key(df, lactate_col="lactate_8") != result_key(df, lactate_col="lactate_4")
+    assert result_key(df, lactate_col="lactate_8") != result_key(df, lactate_col="lactate_8", solver="pwlf")
+
+
+def test_disk_cache(test_instances, tmp_path):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    path = str(tmp_path / "results.sqlite")
+
+    res = determine(df, lactate_col="lactate_8", cache=ResultCache(path=path))
+
+    cache = ResultCache(path=path)
+    cached = determine(df, lactate_col="lactate_8", cache=cache)
+    assert cache.stats.disk_hits == 1
+    assert cached.ltp1 == res.ltp1
+    assert cached.interpolated_data.equals(res.interpolated_data)
+
+    cache.clear()
+    determine(df, lactate_col="lactate_8", cache=cache)
+    assert cache.stats.misses == 1
+
+
+def test_duplicates_in_batch(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    tests = [("a", df), ("b", df.copy()), ("c", df.assign(lactate_8=df["lactate_4"]))]
+    cache = ResultCache()
+
+    res = dict(determine_iter(tests, backend="serial", cache=cache, lactate_col="lactate_8"))
+    assert set(res) == {"a", "b", "c"}
+    assert res["a"].ltp1 == res["b"].ltp1
+    assert cache.stats.duplicates == 1 and len(cache) == 2
+
+    res = dict(determine_iter(tests, backend="serial", cache=cache, lactate_col="lactate_8"))
+    assert len(res) == 3 and len(cache) == 2
+
+
+def test_duplicates_without_memory(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    cache = ResultCache(maxsize=0)
+
+    res = dict(determine_iter([("a", df), ("b", df)], backend="serial", cache=cache, lactate_col="lactate_8"))
+    assert res["b"] is not None and res["b"] is not res["a"]
+    assert res["a"].ltp1 == res["b"].ltp1
+    assert cache.stats.duplicates == 1 and len(cache) == 0
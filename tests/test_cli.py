@@ -0,0 +1,112 @@
+import json
+
+import pandas as pd
+import pytest
+
+from lactate_thresholds.cli import main
+from lactate_thresholds.zones import unregister_scheme
+
+
+@pytest.fixture
+def files(test_instances, tmp_path):
+    paths = []
+    for name in ["cycling1", "cycling2"]:
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame.from_dict(test_instances[name]).to_csv(path, index=False)
+        paths.append(str(path))
+    bad = tmp_path / "bad.csv"
+    pd.DataFrame.from_dict(test_instances["cycling1"]).assign(lactate_8="x").to_csv(bad, index=False)
+    return paths, str(bad)
+
+
+def test_isolates_failures(files, tmp_path):
+    paths, bad = files
+    output = tmp_path / "out.jsonl"
+    assert main([*paths, bad, "--lactate-col", "lactate_8", "-o", str(output), "-j", "1", "-q"]) == 0
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(rows) == 3
+    failed = [r for r in rows if r.get("error")]
+    assert [r["test_id"] for r in failed] == [bad]
+    ok = next(r for r in rows if r["test_id"] == paths[0])
+    assert ok["obla_4_intensity"] > 0
+    assert ok["seiler_3_zone2_intensity"].count(" - ") == 1
+
+
+def test_long_format_csv(test_instances, tmp_path):
+    long = pd.concat(
+        pd.DataFrame.from_dict(test_instances[name]).assign(athlete_id=name) for name in ["cycling1", "cycling2"]
+    )
+    path = tmp_path / "long.csv"
+    long.to_csv(path, index=False)
+    output = tmp_path / "out.csv"
+
+    args = [str(path), "--test-id-col", "athlete_id", "--lactate-col", "lactate_8", "-o", str(output)]
+    assert main([*args, "-j", "1", "-q", "--methods", "obla_4", "--zones", ""]) == 0
+
+    res = pd.read_csv(output)
+    assert sorted(res["test_id"]) == ["cycling1", "cycling2"]
+    assert res["obla_4_intensity"].notna().all() and res["ltp1_intensity"].isna().all()
+
+
+def test_long_format_isolates_failures(test_instances, tmp_path):
+    frames = {
+        name: pd.DataFrame.from_dict(test_instances[name]).assign(athlete_id=name) for name in ["cycling1", "cycling2"]
+    }
+    good = tmp_path / "long.csv"
+    pd.concat(frames.values()).to_csv(good, index=False)
+    # cycling1 comes back after cycling2, which `read_tests` refuses once it gets there
+    split = tmp_path / "split.csv"
+    pd.concat([*frames.values(), frames["cycling1"]]).to_csv(split, index=False)
+    missing = tmp_path / "missing.csv"
+    output = tmp_path / "out.jsonl"
+
+    args = [str(good), str(missing), str(split), "--test-id-col", "athlete_id", "--lactate-col", "lactate_8"]
+    assert main([*args, "-o", str(output), "-j", "1", "-q", "--zones", ""]) == 0
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    errors = {r["test_id"]: r["error"] for r in rows if r.get("error")}
+    assert set(errors) == {str(missing), str(split)}
+    assert "not contiguous" in errors[str(split)]
+    # The tests before the repeated one are kept
+    assert sorted(r["test_id"] for r in rows if not r.get("error")) == ["cycling1", "cycling1", "cycling2", "cycling2"]
+
+
+def test_custom_zone_scheme(files, tmp_path):
+    scheme = {
+        "name": "club_4",
+        "zones": [
+            {"label": "Easy", "upper": {"anchor": "lt1_intensity", "multiplier": 0.95}},
+            {"label": "Steady", "upper": {"anchor": "lt2_intensity", "multiplier": 0.9}},
+            {"label": "Threshold", "upper": {"anchor": "lt2_intensity", "multiplier": 1.03}},
+            {"label": "Hard"},
+        ],
+    }
+    scheme_path = tmp_path / "club_4.json"
+    scheme_path.write_text(json.dumps(scheme))
+    output = tmp_path / "out.csv"
+
+    parallel_output = tmp_path / "parallel.csv"
+
+    args = [*files[0], "--lactate-col", "lactate_8", "--zone-scheme", str(scheme_path), "--zones", "club_4"]
+    try:
+        assert main([*args, "-o", str(output), "-j", "1", "-q"]) == 0
+        # Zones are computed in the workers, which register the scheme themselves
+        assert main([*args, "-o", str(parallel_output), "-j", "2", "--chunk-size", "1", "-q"]) == 0
+    finally:
+        unregister_scheme("club_4")
+
+    res = pd.read_csv(output)
+    zone_columns = [c for c in res.columns if c.startswith("club_4_")]
+    assert len(zone_columns) == 8 and res["club_4_zone4_intensity"].str.endswith("max").all()
+
+    parallel = pd.read_csv(parallel_output).set_index("test_id").loc[res["test_id"]].reset_index()
+    pd.testing.assert_frame_equal(parallel, res)
+
+    with pytest.raises(SystemExit):
+        main([files[0][0], "--zones", "club_4", "-o", str(output)])
+
+
+def test_unknown_format(files, tmp_path):
+    with pytest.raises(SystemExit):
+        main([files[0][0], "-o", str(tmp_path / "out.txt")])
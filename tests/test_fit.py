@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds import determine
+from lactate_thresholds.fit import FittedCurves, fit_cubic, fit_cubic_many, fit_line
+
+
+def test_fit_cubic_recovers_watt_scale_polynomial():
+    x = np.arange(100, 400, 40, dtype=float)
+    lactate = 1e-6 * x**3 - 4e-4 * x**2 + 0.05 * x - 1
+    heart_rate = 0.3 * x + 90
+
+    fit = fit_cubic(x, np.column_stack([lactate, heart_rate]))
+
+    grid = np.arange(100, 380, 0.1)
+    pred = fit(grid)
+    assert pred.shape == (len(grid), 2)
+    assert np.allclose(pred[:, 0], 1e-6 * grid**3 - 4e-4 * grid**2 + 0.05 * grid - 1)
+    assert np.allclose(pred[:, 1], 0.3 * grid + 90)
+    assert np.allclose(fit.polynomial(0)(grid), pred[:, 0])
+    assert np.allclose(fit.polynomial(1).convert().coef[:2], [90, 0.3])
+
+
+def test_fit_cubic_many_matches_single_fits():
+    rng = np.random.default_rng(0)
+    tests = [np.sort(rng.uniform(5, 20, n)) for n in [5, 7, 9]]
+    ys = [np.column_stack([0.01 * x**3 + rng.normal(0, 0.1, len(x)), 8 * x]) for x in tests]
+
+    width = max(len(x) for x in tests)
+    xs = np.zeros((3, width))
+    yy = np.zeros((3, width, 2))
+    mask = np.zeros((3, width), dtype=bool)
+    for i, (x, y) in enumerate(zip(tests, ys)):
+        xs[i, : len(x)], yy[i, : len(x)], mask[i, : len(x)] = x, y, True
+
+    coef, center, scale = fit_cubic_many(xs, yy, mask)
+    for i, (x, y) in enumerate(zip(tests, ys)):
+        single = fit_cubic(x, y)
+        assert np.isclose(center[i], single.center) and np.isclose(scale[i], single.scale)
+        assert np.allclose(coef[i], single.coef)
+
+
+def test_fit_line_and_derivative():
+    x = np.array([100.0, 140, 180, 220, 260])
+    assert np.allclose(fit_line(x, 0.3 * x + 90), [90, 0.3])
+
+    fit = fit_cubic(x, 1e-6 * x**3 + 0.01 * x)
+    assert np.allclose(fit.derivative(0)(x), 3e-6 * x**2 + 0.01)
+    assert np.allclose(fit.derivative(0, order=2)(x), 6e-6 * x)
+
+
+def test_mod_dmax_shares_the_interpolation_curve(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling1"])
+    res = determine(df, lactate_col="lactate_8")
+    curves = res.interpolated_data.attrs["fit"]
+    assert isinstance(curves, FittedCurves)
+
+    # The ModDMax point sits on the interpolated lactate curve, its heart rate on the straight line model
+    assert np.isclose(curves.polynomial(0)(res.mod_dmax.intensity), res.mod_dmax.lactate, atol=1e-2)
+    dfc = res.clean_data
+    line = np.polyfit(dfc["intensity"][1:], dfc["heart_rate"][1:], 1)
+    assert res.mod_dmax.heart_rate == np.round(np.polyval(line, res.mod_dmax.intensity))
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["altair", "statsmodels", "scipy", "pwlf"]
+
+
+def loaded_after(statement: str) -> list:
+    code = f"import sys; {statement}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import lactate_thresholds",
+        "import lactate_thresholds.zones",
+        "from lactate_thresholds import determine, determine_many",
+        "import lactate_thresholds.parallel",
+        # The curves are fitted with linear solves, running the default methods needs no scipy or statsmodels
+        "import lactate_thresholds as lt; lt.determine(lt.data.example_data_cycling(), lactate_col='lactate_8')",
+    ],
+)
+def test_no_heavy_imports(statement):
+    assert loaded_after(statement) == []
+
+
+def test_lazy_attributes():
+    assert loaded_after("import lactate_thresholds as lt; lt.lactate_intensity_plot") == ["altair"]
+    assert loaded_after("import lactate_thresholds as lt; lt.plot") == ["altair"]
@@ -11,3 +11,29 @@ def test_interpolation(test_instances):
     assert "heart_rate" in idf.columns
     assert "lactate" in idf.columns
     assert "intensity" in idf.columns
+
+
+def test_interpolation_resolution(test_instances):
+    ld = pd.DataFrame.from_dict(test_instances["cycling2"])
+    df = process.clean_data(ld, lactate_col="lactate_8")
+
+    assert len(methods.interpolate(df)) == 2400
+    assert len(methods.interpolate(df, n_points=300)) == 300
+    assert len(methods.interpolate(df, unit="watt")) == 240
+
+    coarse = methods.interpolate(df, tolerance=1e-2)
+    fine = methods.interpolate(df, tolerance=1e-4)
+    assert len(coarse) < len(fine) < 2400
+
+
+def test_lazy_interpolation(test_instances):
+    ld = pd.DataFrame.from_dict(test_instances["cycling2"])
+    res = process.determine(ld, lactate_col="lactate_8", lazy=True)
+    eager = process.determine(ld, lactate_col="lactate_8")
+
+    assert not res.is_interpolated
+    assert abs(res.obla_4.intensity - eager.obla_4.intensity) < 0.1
+    assert abs(res.lt1_estimate.intensity - eager.lt1_estimate.intensity) < 1
+
+    assert len(res.interpolated_data) == len(eager.interpolated_data)
+    assert res.is_interpolated
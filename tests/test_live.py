@@ -0,0 +1,80 @@
+import time
+
+import pandas as pd
+import pytest
+
+import lactate_thresholds as lt
+from lactate_thresholds.live import IncrementalEstimator
+from lactate_thresholds.registry import register_method, unregister_method
+
+
+def feed(df, estimator):
+    for row in df:
+        res = estimator.update(
+            row["intensity"], row["lactate_8"], row["heart_rate"], step=row["step"], length=row["length"]
+        )
+    return res
+
+
+def test_matches_determine(test_instances):
+    df = test_instances["cycling1"]
+    res = feed(df, IncrementalEstimator(latency_budget=None))
+    expected = lt.determine(pd.DataFrame.from_dict(df), lactate_col="lactate_8", tolerance=1e-3)
+
+    for field in ["ltp1", "ltp2", "mod_dmax", "loglog", "obla_2", "obla_4", "baseline"]:
+        assert getattr(res, field).intensity == pytest.approx(getattr(expected, field).intensity, rel=1e-6)
+    assert res.lt1_estimate == expected.lt1_estimate
+    assert res.lt2_estimate == expected.lt2_estimate
+    assert len(res.clean_data) == len(df)
+
+
+def test_methods_wait_for_enough_data(test_instances):
+    df = test_instances["cycling1"]
+    estimator = IncrementalEstimator()
+
+    results = []
+    for row in df:
+        results.append(estimator.update(row["intensity"], row["lactate_8"], row["heart_rate"]))
+
+    assert results[:3] == [None, None, None]
+    assert results[3].baseline is not None and results[3].ltp1 is None and results[3].obla_4 is None
+    assert results[-1].obla_4 is not None and results[-1].lt2_estimate is not None
+
+
+def test_latency_budget(test_instances):
+    df = test_instances["cycling1"]
+    estimator = IncrementalEstimator(latency_budget=0)
+    res = feed(df, estimator)
+
+    assert estimator.stale
+    assert all(getattr(res, field) is None for field in ["ltp1", "ltp2"])
+
+    estimator.latency_budget = None
+    start = time.perf_counter()
+    res = estimator.estimate()
+    assert time.perf_counter() - start < 1
+    assert not estimator.stale and res.ltp1 is not None
+
+
+def test_rejects_non_numeric():
+    with pytest.raises(ValueError):
+        IncrementalEstimator().add_step("100", 1.0, 120)
+    with pytest.raises(ValueError):
+        IncrementalEstimator().add_step(100, True, 120)
+
+
+def test_registered_method(test_instances):
+    @register_method("lt_gap", requires=["lt1_estimate", "lt2_estimate"])
+    def lt_gap(lt1, lt2):
+        return lt2.intensity - lt1.intensity
+
+    try:
+        estimator = IncrementalEstimator(latency_budget=None)
+        early = None
+        for row in test_instances["cycling1"]:
+            res = estimator.update(row["intensity"], row["lactate_8"], row["heart_rate"])
+            early = early or res
+        assert "lt_gap" not in early.extra
+        assert res.extra["lt_gap"] == pytest.approx(res.lt2_estimate.intensity - res.lt1_estimate.intensity)
+    finally:
+        unregister_method("lt_gap")
@@ -1,8 +1,9 @@
 import logging
 
 import pandas as pd
+import pytest
 
-from lactate_thresholds import determine, methods, process
+from lactate_thresholds import determine, determine_many, methods, process
 
 
 def test_interpolation(test_instances):
@@ -57,3 +58,39 @@ def test_obla(test_instances):
     di = methods.interpolate(dfc, include_baseline=False)
     logging.info(methods.determine_obla(di, 4.0))
     logging.info(methods.determine_obla(di, 2.0))
+
+
+def test_ltp_solvers_agree(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    dfc = process.clean_data(df, lactate_col="lactate_8")
+    dfi = methods.interpolate(dfc, include_baseline=False)
+
+    exact = methods.determine_ltp(dfc, dfi)
+    assert exact == methods.determine_ltp(dfc, dfi)  # deterministic
+
+    reference = methods.determine_ltp(dfc, dfi, solver="pwlf")
+    for a, b in zip(exact, reference):
+        assert abs(a.intensity - b.intensity) < 1
+
+    loglog = methods.determine_loglog(dfc, dfi)
+    assert abs(loglog.intensity - methods.determine_loglog(dfc, dfi, solver="pwlf").intensity) < 1
+
+
+@pytest.mark.parametrize(
+    "name, lactate_col, intensity",
+    [
+        ("simple", "lactate", 9.8),
+        ("cycling1", "lactate_4", 120.7),
+        ("cycling1", "lactate_8", 119.8),
+        ("cycling2", "lactate_4", 107.2),
+        ("cycling2", "lactate_8", 136.9),
+    ],
+)
+def test_baseline_crossing(test_instances, name, lactate_col, intensity):
+    # The nearest grid point, which is not the same crossing of the curve for both cycling2 columns
+    df = pd.DataFrame.from_dict(test_instances[name])
+    res = determine(df, lactate_col=lactate_col)
+    assert res.baseline.intensity == pytest.approx(intensity, abs=0.1)
+
+    record = determine_many([df], lactate_col=lactate_col, output="records")[0]
+    assert record.baseline[0] == pytest.approx(res.baseline.intensity, abs=1e-6)
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from lactate_thresholds.cache import ResultCache
+from lactate_thresholds.parallel import determine_all, determine_iter, make_executor
+from lactate_thresholds.types import LactateThresholdResults
+
+
+@pytest.mark.parametrize("backend", ["serial", "thread", "process"])
+def test_determine_iter_backends(test_instances, backend):
+    tests = [(name, pd.DataFrame.from_dict(test_instances[name])) for name in ["simple", "cycling1", "cycling2"]]
+    tests = [(name, df.rename(columns={"lactate_8": "lactate"})) for name, df in tests]
+
+    res = determine_all(tests, backend=backend, max_workers=2, chunk_size=2, max_in_flight=1)
+
+    assert set(res) == {"simple", "cycling1", "cycling2"}
+    assert all(isinstance(r, LactateThresholdResults) for r in res.values())
+
+
+def test_determine_iter_return_exceptions(test_instances):
+    good = pd.DataFrame.from_dict(test_instances["simple"])
+    bad = good.assign(intensity=good["intensity"].astype(str))
+    tests = [good, bad]
+
+    res = dict(determine_iter(tests, backend="serial", return_exceptions=True))
+    assert isinstance(res[0], LactateThresholdResults)
+    assert isinstance(res[1], ValueError)
+
+    with pytest.raises(ValueError):
+        list(determine_iter(tests, backend="serial"))
+
+
+def _obla_4(test_id, res):
+    if test_id == "broken":
+        raise KeyError(test_id)
+    return res.obla_4.intensity
+
+
+def test_postprocess_in_workers(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling1"])
+    tests = [("ok", df), ("broken", df)]
+
+    res = dict(
+        determine_iter(
+            tests,
+            backend="process",
+            max_workers=2,
+            chunk_size=1,
+            return_exceptions=True,
+            postprocess=_obla_4,
+            lactate_col="lactate_8",
+        )
+    )
+    assert res["ok"] == determine_all([df], backend="serial", lactate_col="lactate_8")[0].obla_4.intensity
+    assert isinstance(res["broken"], KeyError)
+
+    with pytest.raises(ValueError):
+        list(determine_iter(tests, backend="serial", cache=ResultCache(), postprocess=_obla_4))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        make_executor("gpu")
@@ -1,9 +1,22 @@
+import json
 import logging
+import re
 
+import numpy as np
 import pandas as pd
+import pytest
 
-from lactate_thresholds import determine
-from lactate_thresholds.plot import heart_rate_intensity_plot, lactate_intensity_plot
+from lactate_thresholds import determine, determine_many
+from lactate_thresholds.plot import (
+    HEIGHT,
+    dashboard_plot,
+    heart_rate_intensity_plot,
+    lactate_intensity_plot,
+    overlay_plot,
+    plot_json,
+    plot_spec,
+    simplify_curve,
+)
 
 
 def test_lactate_intensity_plot(test_instances, test_output_dir):
@@ -27,3 +40,92 @@ def test_heartrate_intensity_plot(test_instances, test_output_dir):
     logging.info(df2)
     chart = heart_rate_intensity_plot(df2)
     chart.save(f"{test_output_dir}/heartrate_intensity_plot.html")
+
+
+def test_compact_plot(test_instances, test_output_dir):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    res = determine(df, lactate_col="lactate_8")
+
+    full = lactate_intensity_plot(res).to_dict()
+    compact = lactate_intensity_plot(res, compact=True).to_dict()
+    assert len(json.dumps(compact)) < len(json.dumps(full)) / 10
+
+    curve = pd.DataFrame(compact["datasets"]["curve"])
+    assert len(curve) < len(res.interpolated_data)
+    lactate = np.interp(res.interpolated_data["intensity"], curve["intensity"], curve["lactate"])
+    assert np.abs(lactate - res.interpolated_data["lactate"]).max() < res.interpolated_data["lactate"].max() / HEIGHT
+
+    dashboard = dashboard_plot(res)
+    dashboard.save(f"{test_output_dir}/dashboard_plot.html")
+    spec = dashboard.to_dict()
+    assert {"measurements", "curve", "thresholds"} <= set(spec["datasets"])
+    names = {layer["data"]["name"] for chart in spec["vconcat"] for layer in chart["layer"] if "data" in layer}
+    assert {"measurements", "curve", "thresholds"} <= names
+    assert heart_rate_intensity_plot(res, compact=True).to_dict()["datasets"]["curve"] == spec["datasets"]["curve"]
+
+
+def test_simplify_curve():
+    x = np.linspace(0, 10, 1001)
+    y = np.sin(x)
+
+    keep = simplify_curve(x, [y, 2 * x], [0.01, 0.01])
+    assert keep[0] == 0 and keep[-1] == 1000 and len(keep) < 100
+    assert np.abs(np.interp(x, x[keep], y[keep]) - y).max() <= 0.01
+    assert len(simplify_curve(x, [2 * x], [0.01])) == 2
+
+
+def test_plot_templates(test_instances):
+    res = determine(pd.DataFrame.from_dict(test_instances["cycling2"]), lactate_col="lactate_8")
+    other = determine(pd.DataFrame.from_dict(test_instances["simple"]))
+
+    def normalized(spec: dict) -> str:
+        return re.sub(r"view_[0-9a-f]+_\d+", "view", json.dumps(spec, sort_keys=True))
+
+    for r in [res, other]:
+        for show_fit_line in [True, False]:
+            spec = plot_spec(r, "lactate", show_fit_line=show_fit_line)
+            chart = lactate_intensity_plot(r, show_fit_line=show_fit_line, compact=True)
+            assert normalized(spec) == normalized(chart.to_dict())
+        assert normalized(plot_spec(r, "dashboard")) == normalized(dashboard_plot(r).to_dict())
+
+    full = json.loads(plot_json(res, "heart_rate", compact=False))
+    assert len(full["datasets"]["curve"]) == len(res.interpolated_data)
+
+    with pytest.raises(ValueError):
+        plot_json(res, "zones")
+
+
+def test_overlay_plot(test_instances, test_output_dir):
+    dfs = [pd.DataFrame.from_dict(test_instances[k]) for k in ["cycling1", "cycling2"]]
+    results = {f"test {i}": determine(df, lactate_col="lactate_8") for i, df in enumerate(dfs)}
+
+    chart = overlay_plot(results)
+    chart.save(f"{test_output_dir}/overlay_plot.html")
+    spec = chart.to_dict()
+    assert set(spec["datasets"]) == {"tests", "curves", "markers"}
+    assert [t["label"] for t in spec["datasets"]["tests"]] == ["test 0", "test 1"]
+    markers = pd.DataFrame(spec["datasets"]["markers"])
+    assert len(markers) == 4 and set(markers["threshold"]) == {"lt1_estimate", "lt2_estimate"}
+
+    # The overlay keeps each curve to the chart's resolution
+    curves = pd.DataFrame(spec["datasets"]["curves"])
+    for i, res in enumerate(results.values()):
+        curve = curves[curves["test"] == i]
+        grid = res.interpolated_data
+        lactate = np.interp(grid["intensity"], curve["intensity"], curve["lactate"])
+        assert len(curve) < len(grid)
+        assert np.abs(lactate - grid["lactate"]).max() < 2 * grid["lactate"].max() / HEIGHT
+
+    # Many tests straight from a batch table, the level of detail adapts to the point budget
+    table = determine_many(dfs * 50, lactate_col="lactate_8", curves=True)
+    spec = overlay_plot(table, y="heart_rate", max_points=2_000).to_dict()
+    assert len(spec["datasets"]["tests"]) == 100
+    assert len(spec["datasets"]["curves"]) <= 2_000
+    assert len(spec["datasets"]["markers"]) == 200
+
+    with pytest.raises(ValueError):
+        overlay_plot(results, y="power")
+    with pytest.raises(ValueError):
+        overlay_plot(results, thresholds=["ftp"])
+    with pytest.raises(ValueError):
+        overlay_plot(determine_many(dfs, lactate_col="lactate_8"))
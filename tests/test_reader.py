@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from lactate_thresholds.reader import determine_file, read_tests
+
+
+@pytest.fixture
+def long_csv(test_instances, tmp_path):
+    frames = []
+    for i, name in enumerate(["cycling1", "cycling2", "cycling1"]):
+        frames.append(
+            pd.DataFrame.from_dict(test_instances[name]).assign(athlete_id=f"a{i % 2}", test_date=f"2024-0{i + 1}")
+        )
+    path = tmp_path / "tests.csv"
+    pd.concat(frames).to_csv(path, index=False)
+    return path, frames
+
+
+def test_read_tests_across_chunks(long_csv):
+    path, frames = long_csv
+    tests = list(read_tests(path, test_id_col=["athlete_id", "test_date"], lactate_col="lactate_8", chunksize=4))
+
+    assert [test_id for test_id, _ in tests] == [("a0", "2024-01"), ("a1", "2024-02"), ("a0", "2024-03")]
+    for (_, dfc), df in zip(tests, frames):
+        assert list(dfc.columns) == ["step", "length", "intensity", "lactate", "heart_rate"]
+        assert dfc["lactate"].tolist() == df["lactate_8"].tolist()
+
+
+def test_non_contiguous(long_csv, tmp_path):
+    path, _ = long_csv
+    with pytest.raises(ValueError):
+        list(read_tests(path, test_id_col="athlete_id", lactate_col="lactate_8"))
+
+    # Only the current chunk is remembered, a test split across chunks comes out once per run of rows
+    tests = list(read_tests(path, test_id_col="athlete_id", lactate_col="lactate_8", chunksize=5))
+    assert [test_id for test_id, _ in tests] == ["a0", "a1", "a0"]
+
+
+def test_determine_file(long_csv):
+    path, _ = long_csv
+    res = dict(determine_file(path, test_id_col=["athlete_id", "test_date"], lactate_col="lactate_8", backend="serial"))
+    assert len(res) == 3
+    assert res[("a0", "2024-01")].obla_4 == res[("a0", "2024-03")].obla_4
+
+
+def test_parquet(long_csv, tmp_path):
+    pytest.importorskip("pyarrow")
+    path, frames = long_csv
+    parquet = tmp_path / "tests.parquet"
+    pd.read_csv(path).to_parquet(parquet)
+
+    tests = list(read_tests(parquet, test_id_col="test_date", lactate_col="lactate_8", chunksize=5))
+    assert len(tests) == 3
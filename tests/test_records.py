@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lactate_thresholds import determine, determine_many
+from lactate_thresholds.records import (
+    FIELDS,
+    RESULT_DTYPE,
+    THRESHOLDS,
+    ThresholdRecord,
+    columns_to_array,
+    from_array,
+    to_array,
+)
+
+
+def test_roundtrip_model(test_instances):
+    res = determine(pd.DataFrame.from_dict(test_instances["cycling1"]), lactate_col="lactate_8")
+    record = ThresholdRecord.from_model(res, test_id="a", keep_data=True)
+
+    back = record.to_model()
+    assert back.model_dump(exclude={"clean_data"}) == res.model_dump(exclude={"clean_data"})
+    assert back.interpolated_data is res.interpolated_data
+
+    without_data = ThresholdRecord.from_model(res)
+    assert without_data.clean_data is None
+    with pytest.raises(ValueError):
+        without_data.to_model()
+    assert without_data.to_model(clean_data=res.clean_data).ltp1 == res.ltp1
+
+
+def test_roundtrip_array(test_instances):
+    res = determine(pd.DataFrame.from_dict(test_instances["cycling1"]), lactate_col="lactate_8", methods=["obla_2"])
+    records = [ThresholdRecord.from_model(res, test_id=i) for i in range(3)]
+
+    array = to_array(records)
+    assert array.dtype == RESULT_DTYPE and len(array) == 3
+    assert np.isnan(array["ltp1_intensity"]).all()
+    assert from_array(array) == records
+
+
+def test_determine_many_outputs(test_instances):
+    dfs = [pd.DataFrame.from_dict(test_instances[name]) for name in ["cycling1", "cycling2"]]
+    frame = determine_many(dfs, lactate_col="lactate_8")
+    array = determine_many(dfs, lactate_col="lactate_8", output="array")
+    records = determine_many(dfs, lactate_col="lactate_8", output="records", keep_data=True)
+
+    assert np.allclose(array["obla_4_intensity"], frame["obla_4_intensity"])
+    assert records[1].obla_4[0] == pytest.approx(frame.loc[1, "obla_4_intensity"])
+    model = records[0].to_model()
+    assert model.baseline.plus == 0
+    assert len(model.interpolated_data) > 0
+
+
+def test_columns_to_array():
+    columns = {f"{t}_{f}": np.array([1.0, np.nan]) for t in THRESHOLDS for f in FIELDS}
+    array = columns_to_array({"test_id": [("a", 1), ("b", 2)], **columns})
+    assert array.shape == (2,) and array["test_id"][1] == ("b", 2)
+    assert array["baseline_plus"][0] == 0 and np.isnan(array["baseline_plus"][1])
+    assert len(columns_to_array({})) == 0
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from lactate_thresholds import determine, registry
+from lactate_thresholds.registry import register_method, unregister_method
+
+
+def test_selective_methods(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+
+    res = determine(df, lactate_col="lactate_8", methods=["obla_4"])
+    assert res.obla_4 is not None
+    assert res.ltp1 is None and res.mod_dmax is None and res.lt1_estimate is None
+
+    res = determine(df, lactate_col="lactate_8", methods=["lt1_estimate"])
+    assert res.ltp1 is not None and res.loglog is not None and res.lt1_estimate is not None
+    assert res.mod_dmax is None and res.lt2_estimate is None
+
+
+def test_resolve_dependencies():
+    names = [m.name for m in registry.resolve(["lt2_estimate", "ltp"])]
+    assert names == ["ltp", "mod_dmax", "lt2_estimate"]
+
+    with pytest.raises(ValueError):
+        registry.resolve(["does_not_exist"])
+
+
+def test_third_party_method(test_instances):
+    @register_method("lt_gap", requires=["lt1_estimate", "lt2_estimate"], params=["scale"])
+    def lt_gap(lt1, lt2, scale=1.0):
+        return scale * (lt2.intensity - lt1.intensity)
+
+    try:
+        with pytest.raises(ValueError):
+            register_method("lt_gap", requires=["clean_data"])(lambda dfc: None)
+
+        df = pd.DataFrame.from_dict(test_instances["cycling2"])
+        res = determine(df, lactate_col="lactate_8", methods=["lt_gap"], method_params={"scale": 2.0})
+        assert res.extra["lt_gap"] == pytest.approx(2 * (res.lt2_estimate.intensity - res.lt1_estimate.intensity))
+    finally:
+        unregister_method("lt_gap")
+
+
+def test_cyclic_dependencies():
+    register_method("cycle_a", requires=["cycle_b"])(lambda b: b)
+    register_method("cycle_b", requires=["cycle_a"])(lambda a: a)
+    try:
+        with pytest.raises(ValueError, match="Cyclic"):
+            registry.resolve(["cycle_a"])
+    finally:
+        unregister_method("cycle_a")
+        unregister_method("cycle_b")
@@ -0,0 +1,33 @@
+import numpy as np
+
+from lactate_thresholds.segmented import fit_breakpoints, fit_breakpoints_many
+
+
+def test_fit_breakpoints_recovers_known_breaks():
+    x = np.linspace(100, 340, 2400)
+    y = np.interp(x, [100, 180, 260, 340], [1.0, 1.5, 3.5, 9.0])
+
+    breakpoints = fit_breakpoints(x, y, 2)
+    assert np.allclose(breakpoints, [100, 180, 260, 340], atol=1e-3)
+
+    breakpoints = fit_breakpoints(x, np.interp(x, [100, 200, 340], [1.0, 2.0, 9.0]), 1)
+    assert np.allclose(breakpoints, [100, 200, 340], atol=1e-3)
+
+
+def test_fit_breakpoints_is_deterministic():
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(5, 20, 200))
+    y = np.exp(0.2 * x) + rng.normal(0, 0.5, len(x))
+
+    assert np.array_equal(fit_breakpoints(x, y, 2), fit_breakpoints(x, y, 2))
+
+
+def test_fit_breakpoints_many_matches_single_fits():
+    rng = np.random.default_rng(2)
+    xs = [np.sort(rng.uniform(5, 20, n)) for n in (40, 75, 120)]
+    ys = [np.exp(0.2 * x) + rng.normal(0, 0.5, len(x)) for x in xs]
+
+    for tol in (None, 0.05):
+        many = fit_breakpoints_many(xs, ys, 2, tol=tol)
+        single = [fit_breakpoints(x, y, 2, tol=tol) for x, y in zip(xs, ys)]
+        assert np.array_equal(many, single)
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from lactate_thresholds import determine, determine_many
+
+pytest.importorskip("pyarrow")
+
+from lactate_thresholds.sink import ResultSink, read_results  # noqa: E402
+
+
+@pytest.fixture
+def results(test_instances):
+    out = []
+    for athlete, date, name in [
+        ("a1", "2024-01", "cycling1"),
+        ("a1", "2024-06", "cycling2"),
+        ("a2", "2024-01", "cycling1"),
+    ]:
+        out.append(((athlete, date), determine(pd.DataFrame.from_dict(test_instances[name]), lactate_col="lactate_8")))
+    return out
+
+
+def test_roundtrip(results, tmp_path):
+    with ResultSink(tmp_path, zones=["seiler_3", "seiler_5"], include_interpolated=True, buffer_rows=1000) as sink:
+        sink.write_all(results)
+
+    thresholds = read_results(tmp_path)
+    assert len(thresholds) == 3
+    row = thresholds[(thresholds["athlete_id"] == "a1") & (thresholds["test_date"] == "2024-06")].iloc[0]
+    assert row["obla_4_intensity"] == results[1][1].obla_4.intensity
+
+    zones = read_results(tmp_path, "zones")
+    assert len(zones) == 3 * (3 + 5)
+
+    curves = read_results(tmp_path, "interpolated", as_arrow=True)
+    assert curves.num_rows == sum(len(res.interpolated_data) for _, res in results)
+
+
+def test_append_across_runs(results, tmp_path):
+    for _ in range(2):
+        with ResultSink(tmp_path, zones=[]) as sink:
+            sink.write_all(results[:2])
+
+    import pyarrow.compute as pc
+
+    a1 = read_results(tmp_path, filter=pc.field("athlete_id") == "a1")
+    assert len(a1) == 4
+    assert sink.rows_written["thresholds"] == 2
+
+
+def test_records_and_errors(test_instances, tmp_path):
+    dfs = [pd.DataFrame.from_dict(test_instances["cycling1"])]
+    records = determine_many(dfs, lactate_col="lactate_8", output="records")
+
+    with ResultSink(tmp_path, partition_by=["test_id"]) as sink:
+        sink.write_all([(0, records[0]), (1, ValueError("bad test"))])
+        with pytest.raises(ValueError):
+            sink.write(("a", "b"), records[0])
+
+    assert len(read_results(tmp_path)) == 1
+    with pytest.raises(ValueError):
+        ResultSink(tmp_path, zones=["coggan"])
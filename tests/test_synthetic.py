@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lactate_thresholds import determine, determine_arrays
+from lactate_thresholds.batch import determine_many
+from lactate_thresholds.synthetic import SyntheticCorpus
+
+
+def test_seeded_and_consistent():
+    corpus = SyntheticCorpus(25, seed=7, block_size=10)
+    frame = corpus.frame()
+
+    pd.testing.assert_frame_equal(frame, SyntheticCorpus(25, seed=7, block_size=10).frame())
+    assert not frame.equals(SyntheticCorpus(25, seed=8, block_size=10).frame())
+
+    # The stream and the long-format frame hold the same tests
+    streamed = pd.concat([df.assign(test_id=test_id) for test_id, df in corpus.tests()], ignore_index=True)
+    pd.testing.assert_frame_equal(streamed[frame.columns], frame, check_dtype=False)
+
+    truth = corpus.truth()
+    pd.testing.assert_frame_equal(truth, pd.concat([t for _, t in corpus.blocks()], ignore_index=True))
+    assert list(truth["test_id"]) == list(range(25))
+
+
+def test_ground_truth():
+    corpus = SyntheticCorpus(200, seed=1, min_steps=6, max_steps=10, p_baseline=1.0, p_missing=0.0)
+    frame, truth = corpus.frame(), corpus.truth()
+
+    steps = frame.groupby("test_id")["step"].agg(["min", "max"])
+    assert (steps["min"] == 0).all()
+    assert steps["max"].between(6, 10).all()
+    assert (truth["lt1_intensity"] < truth["lt2_intensity"]).all()
+    assert (truth["lt1_lactate"] < truth["lt2_lactate"]).all()
+    assert set(truth["unit"]) == {"watt", "km/h"}
+
+    # Noise-free tests are recovered closely
+    res = determine_many(SyntheticCorpus(50, seed=1, noise=0.0).frame())
+    exact = SyntheticCorpus(50, seed=1).truth()
+    error = np.abs(res["lt2_estimate_intensity"] - exact["lt2_intensity"]) / exact["lt2_intensity"]
+    assert error.median() < 0.1
+
+
+def test_fast_paths_match_determine():
+    for _, df in SyntheticCorpus(5, seed=3, p_baseline=0.0):
+        res = determine(df)
+        record = determine_arrays(df["intensity"], df["lactate"], df["heart_rate"])
+        model = record.to_model(clean_data=res.clean_data)
+        assert model.model_dump(exclude={"clean_data"}) == res.model_dump(exclude={"clean_data"})
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        SyntheticCorpus(10, sports=["swimming"])
+    with pytest.raises(ValueError):
+        SyntheticCorpus(10, min_steps=8, max_steps=5)
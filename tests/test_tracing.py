@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+
+from lactate_thresholds import determine
+from lactate_thresholds.cache import ResultCache
+from lactate_thresholds.tracing import Tracer, profile, set_tracer
+
+
+def test_stage_timings(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling1"])
+    seen = []
+    tracer = Tracer(callback=seen.append)
+
+    res = determine(df, lactate_col="lactate_8", tracer=tracer)
+    stages = [t.stage for t in res.timings]
+
+    assert stages[:3] == ["clean_data", "interpolate", "index"]
+    assert {"ltp", "mod_dmax", "loglog", "obla_4", "lt2_estimate"} <= set(stages)
+    assert seen == res.timings
+    assert all(t.wall_time >= 0 and t.cpu_time >= 0 and t.peak_memory is None for t in res.timings)
+
+    determine(df, lactate_col="lactate_8", tracer=tracer)
+    summary = tracer.summary().set_index("stage")
+    assert (summary["count"] == 2).all()
+
+    assert determine(df, lactate_col="lactate_8").timings is None
+
+
+def test_registered_tracer_and_cache(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["simple"])
+    tracer = Tracer()
+    set_tracer(tracer)
+    try:
+        cache = ResultCache()
+        miss = determine(df, cache=cache)
+        res = determine(df, cache=cache)
+    finally:
+        set_tracer(None)
+
+    assert [t.stage for t in miss.timings][:4] == ["clean_data", "cache_lookup", "interpolate", "index"]
+    assert [t.stage for t in res.timings] == ["clean_data", "cache_lookup"]
+    assert tracer.totals["clean_data"].count == 2
+    assert tracer.totals["interpolate"].count == 1
+    assert determine(df).timings is None
+
+
+def test_profile_report(test_instances, test_output_dir):
+    df = pd.DataFrame.from_dict(test_instances["simple"])
+    path = os.path.join(test_output_dir, "profile.txt")
+
+    report = profile(df, path=path, top=5)
+
+    assert "mod_dmax" in report and "cProfile" in report and "tracemalloc" in report
+    with open(path) as f:
+        assert f.read() == report
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from lactate_thresholds import methods, process
+from lactate_thresholds.utils import (
+    get_intensity_interpolated,
+    get_lactate_interpolated,
+    grid_crossing,
+    interpolated_index,
+)
+
+
+def test_interpolated_index_is_cached(test_instances):
+    dfc = process.clean_data(pd.DataFrame.from_dict(test_instances["cycling2"]), lactate_col="lactate_8")
+    dfi = methods.interpolate(dfc, include_baseline=False)
+
+    assert interpolated_index(dfi) is interpolated_index(dfi)
+    assert interpolated_index(dfi) is not interpolated_index(dfi.copy())
+
+
+def test_interpolated_index_lookups(test_instances):
+    dfc = process.clean_data(pd.DataFrame.from_dict(test_instances["cycling2"]), lactate_col="lactate_8")
+    dfi = methods.interpolate(dfc, include_baseline=False)
+    index = interpolated_index(dfi)
+
+    # forward lookups agree with the grid
+    assert np.isclose(index.lactate_at(dfi["intensity"].iloc[500]), dfi["lactate"].iloc[500])
+    assert np.allclose(index.heart_rate_at(dfi["intensity"].values[::100]), dfi["heart_rate"].values[::100])
+
+    # inverse lookups return the intensity on the rising branch of the curve
+    intensities = index.intensity_at_lactate(np.array([2.0, 4.0]))
+    assert np.allclose(index.lactate_at(intensities), [2.0, 4.0], atol=1e-4)
+    assert get_intensity_interpolated(dfi, 1.0) > 200
+    assert np.isclose(get_lactate_interpolated(dfi, get_intensity_interpolated(dfi, 4.0)), 4.0, atol=1e-4)
+
+    # values outside of the curve fall back to the nearest grid point
+    assert get_intensity_interpolated(dfi, 100.0) == dfi["intensity"].iloc[-1]
+    assert np.isclose(index.intensity_at_heart_rate(160), np.interp(160, dfi["heart_rate"], dfi["intensity"]))
+
+
+def test_interpolated_index_without_fit(test_instances):
+    dfc = process.clean_data(pd.DataFrame.from_dict(test_instances["cycling2"]), lactate_col="lactate_8")
+    dfi = methods.interpolate(dfc, include_baseline=False)
+    # e.g. a grid stored and read back without its fit, answered from the grid rather than a refitted curve
+    plain = pd.DataFrame(dfi.to_dict("list"))
+    index = interpolated_index(plain)
+    assert index.fit is None
+
+    intensity = index.intensity_at_lactate(4.0)
+    assert np.isclose(index.lactate_at(intensity), 4.0)
+    assert np.isclose(intensity, interpolated_index(dfi).intensity_at_lactate(4.0), atol=0.1)
+    assert np.isclose(
+        index.intensity_at_lactate(1.5), grid_crossing(index.intensity, index.lactate, 1.5, index.intensity[-1])
+    )
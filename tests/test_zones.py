@@ -1,12 +1,21 @@
 import logging
 
+import numpy as np
 import pandas as pd
+import pytest
 
-from lactate_thresholds import determine
+from lactate_thresholds import determine, determine_many
 from lactate_thresholds.zones import (
+    SCHEMES,
+    ZONE_COLUMNS,
     friel_7_zones_running,
+    register_scheme,
+    render_zones,
     seiler_3_zones,
     seiler_5_zones,
+    unregister_scheme,
+    zone_table,
+    zones_many,
 )
 
 col_set = ["zone", "intensity", "heart_rate", "focus"]
@@ -32,3 +41,97 @@ def test_friel_zones(test_instances):
     zones = friel_7_zones_running(r)
     assert list(zones.columns) == col_set
     logging.info(zones)
+
+
+def test_zone_table(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    r = determine(df, lactate_col="lactate_8")
+
+    table = zone_table(r, "seiler_3")
+    assert list(table.columns) == ZONE_COLUMNS
+    assert table["intensity_lower"].tolist() == [0, r.lt1_estimate.intensity, r.lt2_estimate.intensity]
+    assert np.isnan(table["intensity_upper"].iloc[-1])
+
+    rendered = render_zones(table, "seiler_3")
+    assert rendered.equals(seiler_3_zones(r))
+    assert rendered["intensity"].iloc[1] == f"{r.lt1_estimate.intensity:.2f} - {r.lt2_estimate.intensity:.2f}"
+
+    with pytest.raises(ValueError):
+        zone_table(r, "coggan")
+
+
+def test_zones_many(test_instances):
+    dfs = [pd.DataFrame.from_dict(test_instances[name]) for name in ["cycling1", "cycling2"]]
+    results = determine_many(dfs, lactate_col="lactate_8", curves=True)
+
+    for scheme in SCHEMES:
+        many = zones_many(results, scheme)
+        assert list(many.columns) == ["test_id"] + ZONE_COLUMNS
+        for test_id, df in enumerate(dfs):
+            single = zone_table(determine(df, lactate_col="lactate_8"), scheme)
+            batch = many[many["test_id"] == test_id].reset_index(drop=True)
+            for col in ZONE_COLUMNS[1:5]:
+                np.testing.assert_allclose(batch[col], single[col], rtol=1e-3, atol=0.5)
+
+    # A test without LT2 gets NaN boundaries instead of failing the batch
+    results.loc[0, ["lt2_estimate_intensity", "lt2_estimate_heart_rate"]] = np.nan
+    many = zones_many(results, "friel_7_running")
+    assert many.loc[many["test_id"] == 0, "intensity_upper"].iloc[:6].isna().all()
+    assert many.loc[many["test_id"] == 1, "intensity_upper"].iloc[:6].notna().all()
+
+    with pytest.raises(ValueError):
+        zones_many(determine_many(dfs, lactate_col="lactate_8"))
+
+
+def test_registered_scheme(test_instances):
+    df = pd.DataFrame.from_dict(test_instances["cycling2"])
+    r = determine(df, lactate_col="lactate_8")
+    definition = {
+        "name": "club_3",
+        "zones": [
+            {"label": "Easy", "upper": {"anchor": "lt1_intensity", "multiplier": 0.95}},
+            {"label": "Steady", "upper": {"anchor": "lt2_heart_rate", "multiplier": 0.97}},
+            {"label": "Hard", "focus": "Racing."},
+        ],
+    }
+
+    register_scheme(definition)
+    try:
+        table = zone_table(r, "club_3")
+        assert table["intensity_upper"].iloc[0] == pytest.approx(0.95 * r.lt1_estimate.intensity)
+        assert table["heart_rate_upper"].iloc[1] == pytest.approx(0.97 * r.lt2_estimate.heart_rate)
+        assert table["intensity_lower"].iloc[2] == table["intensity_upper"].iloc[1]
+
+        rendered = SCHEMES["club_3"](r)
+        assert rendered["intensity"].iloc[0].startswith("up to ")
+        assert rendered["heart_rate"].iloc[2].endswith(" - max")
+
+        with pytest.raises(ValueError):
+            register_scheme(definition)
+    finally:
+        unregister_scheme("club_3")
+
+    assert "club_3" not in SCHEMES
+    assert len(zone_table(r, "coggan_7")) == len(zone_table(r, "friel_7_cycling")) == 7
+
+
+@pytest.mark.parametrize(
+    "zones",
+    [
+        [],
+        [{"label": "A"}, {"label": "B"}],
+        [{"label": "A", "upper": {"anchor": "lt1_intensity"}}, {"label": "A"}],
+        [{"label": "A", "upper": {"anchor": "lt3_intensity"}}, {"label": "B"}],
+        [{"label": "A", "upper": {"anchor": "lt1_intensity", "multiplier": -1}}, {"label": "B"}],
+        [
+            {"label": "A", "upper": {"anchor": "lt2_intensity", "multiplier": 1.1}},
+            {"label": "B", "upper": {"anchor": "lt2_intensity"}},
+            {"label": "C"},
+        ],
+        [{"label": "A", "intensity_format": "up to {top}"}],
+    ],
+)
+def test_invalid_scheme(zones):
+    with pytest.raises(ValueError):
+        register_scheme({"name": "invalid", "zones": zones})
+    assert "invalid" not in SCHEMES